@@ -4,6 +4,8 @@
 #
 #   api/gemini.py  ← Google Gemini REST API connector
 #   api/ollama.py  ← Ollama local LLM connector
+#   api/grok.py    ← xAI Grok connector
+#   api/transport.py ← pooled keep-alive HTTP sessions shared by the connectors
 #   api/index.py   ← Vercel serverless handler
 #
 # الـ Flask Blueprints الداخلية (routes بين core والواجهة) موجودة في:
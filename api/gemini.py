@@ -4,20 +4,49 @@ api/gemini.py — Google Gemini External API Connector
 Handles ALL HTTP communication with Google Gemini API.
 No Flask, no MongoDB — pure external service integration.
 
-Used by: core/ai_agent.py  (via AIAgentService._call_ai_provider)
+Used by: core/ai_agent.py  (via AIAgentService._call_ai_provider,
+         and stream() for AIAgentService.chat_stream)
 
 Env vars:
   GEMINI_API_KEY=your_key_here
 """
 
 import os
+import json
 import time
 import logging
 import requests
 
+from api import transport
+
 logger = logging.getLogger(__name__)
 
 
+def _url(method: str) -> str:
+    api_key = os.getenv("GEMINI_API_KEY", "").strip()
+    if not api_key:
+        raise RuntimeError(
+            "Missing GEMINI_API_KEY. Set it in environment variables or in .env"
+        )
+    return (
+        f"https://generativelanguage.googleapis.com/v1beta/models/"
+        f"gemini-flash-latest:{method}?key={api_key}"
+    )
+
+
+def _payload(prompt: str) -> dict:
+    return {
+        "contents": [
+            {"parts": [{"text": prompt}]}
+        ],
+        "generationConfig": {
+            "temperature": 1,
+            "topP": 0.95,
+            "maxOutputTokens": 2048,
+        },
+    }
+
+
 def call(prompt: str, retries: int = 3, delay: int = 2) -> str:
     """
     Send a prompt to Google Gemini API and return the raw text response.
@@ -40,35 +69,15 @@ def call(prompt: str, retries: int = 3, delay: int = 2) -> str:
     Raises
     ------
     RuntimeError
-        If the API key is missing, or all retries fail.
+        If the API key is missing, or all retries fail (including 503s).
     """
-    api_key = os.getenv("GEMINI_API_KEY", "").strip()
-    if not api_key:
-        raise RuntimeError(
-            "Missing GEMINI_API_KEY. Set it in environment variables or in .env"
-        )
-
-    url = (
-        f"https://generativelanguage.googleapis.com/v1beta/models/"
-        f"gemini-flash-latest:generateContent?key={api_key}"
-    )
-
+    url = _url("generateContent")
     headers = {"Content-Type": "application/json"}
-
-    payload = {
-        "contents": [
-            {"parts": [{"text": prompt}]}
-        ],
-        "generationConfig": {
-            "temperature": 1,
-            "topP": 0.95,
-            "maxOutputTokens": 2048,
-        },
-    }
+    payload = _payload(prompt)
 
     for attempt in range(retries):
         try:
-            resp = requests.post(url, json=payload, headers=headers, timeout=20)
+            resp = transport.post("gemini", url, json=payload, headers=headers)
 
             if resp.status_code == 200:
                 data = resp.json()
@@ -107,4 +116,50 @@ def call(prompt: str, retries: int = 3, delay: int = 2) -> str:
                 continue
             raise RuntimeError(f"Failed to contact Gemini: {exc}") from exc
 
-    return "السيرفر مازال مضغوطاً، جرب مرة أخرى."
\ No newline at end of file
+    raise RuntimeError("Gemini server is still overloaded (503) after all retries.")
+
+
+def stream(prompt: str, retries: int = 3, delay: int = 2):
+    """
+    Same request as call(), through streamGenerateContent (SSE): yields the
+    text of each chunk as it arrives. 503s are retried only before the
+    first chunk; any later failure raises RuntimeError.
+    """
+    url = _url("streamGenerateContent") + "&alt=sse"
+    headers = {"Content-Type": "application/json"}
+
+    for attempt in range(retries):
+        try:
+            resp = transport.post("gemini", url, json=_payload(prompt), headers=headers, stream=True)
+        except requests.exceptions.Timeout:
+            if attempt < retries - 1:
+                logger.warning("Gemini timeout, retrying...")
+                time.sleep(delay)
+                continue
+            raise RuntimeError("Gemini API timed out after all retries.")
+        except requests.exceptions.RequestException as exc:
+            raise RuntimeError(f"Cannot connect to Gemini API: {exc}") from exc
+
+        if resp.status_code == 503 and attempt < retries - 1:
+            resp.close()
+            logger.warning("Gemini server overloaded, attempt %d/%d...", attempt + 1, retries)
+            time.sleep(delay)
+            continue
+        if resp.status_code != 200:
+            logger.error("Gemini API Error %d: %s", resp.status_code, resp.text)
+            raise RuntimeError(f"Gemini API Error {resp.status_code}: {resp.text}")
+        break
+
+    resp.encoding = "utf-8"
+    try:
+        with resp:
+            for line in resp.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = json.loads(line[5:])
+                for candidate in data.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+    except (requests.exceptions.RequestException, ValueError) as exc:
+        raise RuntimeError(f"Gemini stream interrupted: {exc}") from exc
@@ -1,29 +1,38 @@
 import requests
 import os
+import json
 import time
 
-def call(prompt: str, retries=3, delay=2) -> str:
+from api import transport
+
+URL = "https://api.xai.com/v1/chat/completions"
+
+def _headers():
     api_key = os.getenv("GROK_API_KEY", "").strip()
-    url = "https://api.xai.com/v1/chat/completions"
-    
-    headers = {
+    return {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {api_key}"
     }
 
-    payload = {
+def _payload(prompt: str, stream: bool) -> dict:
+    return {
         "model": "grok-beta", # أو الإصدار الذي تملكه
         "messages": [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": prompt}
         ],
-        "stream": False,
+        "stream": stream,
         "temperature": 0.7
     }
 
+def call(prompt: str, retries=3, delay=2) -> str:
+    url = URL
+    headers = _headers()
+    payload = _payload(prompt, stream=False)
+
     for i in range(retries):
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = transport.post("grok", url, json=payload, headers=headers)
             
             if response.status_code == 200:
                 return response.json()["choices"][0]["message"]["content"]
@@ -36,4 +45,37 @@ def call(prompt: str, retries=3, delay=2) -> str:
         except Exception as e:
             if i == retries - 1: raise RuntimeError(f"Grok API Error: {str(e)}")
             
-    return "Grok server is busy, try again."
\ No newline at end of file
+    raise RuntimeError(f"Grok server is busy ({response.status_code}) after all retries.")
+
+
+def stream(prompt: str, retries=3, delay=2):
+    """Yield content deltas of a streamed completion (OpenAI-style SSE)."""
+    for i in range(retries):
+        try:
+            response = transport.post("grok", URL, json=_payload(prompt, stream=True), headers=_headers(),
+                                      stream=True)
+        except requests.exceptions.RequestException as e:
+            if i == retries - 1: raise RuntimeError(f"Grok API Error: {str(e)}")
+            continue
+        if response.status_code in [429, 503] and i < retries - 1: # التعامل مع ضغط السيرفر
+            response.close()
+            time.sleep(delay * (i + 1))
+            continue
+        if response.status_code != 200:
+            raise RuntimeError(f"Grok API Error {response.status_code}: {response.text}")
+        break
+
+    response.encoding = "utf-8"
+    try:
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                for choice in json.loads(data).get("choices", [])[:1]:
+                    if choice.get("delta", {}).get("content"):
+                        yield choice["delta"]["content"]
+    except (requests.exceptions.RequestException, ValueError) as e:
+        raise RuntimeError(f"Grok stream interrupted: {str(e)}")
@@ -4,7 +4,8 @@ api/ollama.py — Ollama Local LLM External API Connector
 Handles ALL HTTP communication with a local Ollama instance.
 No Flask, no MongoDB — pure external service integration.
 
-Used by: core/ai_agent.py  (via AIAgentService._call_ollama)
+Used by: core/ai_agent.py  (via AIAgentService._call_ai_provider,
+         and stream() for AIAgentService.chat_stream)
 
 To activate:
   1. Install Ollama: https://ollama.com
@@ -21,45 +22,25 @@ Env vars:
 """
 
 import os
+import json
 import logging
 import requests
 
+from api import transport
+
 logger = logging.getLogger(__name__)
 
 # ── Config (read once at import time) ─────────────────────────────────────
 _BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").rstrip("/")
 _MODEL    = os.getenv("OLLAMA_MODEL", "llama3")
-_TIMEOUT  = int(os.getenv("AI_REQUEST_TIMEOUT", "30"))
-
+_TIMEOUT  = int(os.getenv("AI_REQUEST_TIMEOUT", "30"))   # read timeout (connect: ai_transport)
 
-def call(prompt: str) -> str:
-    """
-    Send a prompt to a local Ollama model and return the raw text response.
-
-    Parameters
-    ----------
-    prompt : str
-        Fully assembled prompt string (system + history + user message).
-
-    Returns
-    -------
-    str
-        Raw text from the model.
-
-    Raises
-    ------
-    RuntimeError
-        If Ollama is unreachable or returns an empty response.
-    requests.exceptions.*
-        For timeout / HTTP errors — caller handles these.
-    """
-    model = os.getenv("OLLAMA_MODEL", _MODEL)
-    url   = f"{_BASE_URL}/api/generate"
 
+def _post(model: str, prompt: str, stream: bool):
     payload = {
         "model":  model,
         "prompt": prompt,
-        "stream": False,
+        "stream": stream,
         "options": {
             "temperature": 0.7,
             "num_predict": 2048,
@@ -67,7 +48,8 @@ def call(prompt: str) -> str:
     }
 
     try:
-        resp = requests.post(url, json=payload, timeout=_TIMEOUT)
+        resp = transport.post("ollama", f"{_BASE_URL}/api/generate", json=payload,
+                              read_timeout=_TIMEOUT, stream=stream)
         resp.raise_for_status()
     except requests.exceptions.Timeout:
         raise RuntimeError(
@@ -81,6 +63,32 @@ def call(prompt: str) -> str:
         )
     except requests.exceptions.RequestException as exc:
         raise RuntimeError(f"Ollama network error: {exc}") from exc
+    return resp
+
+
+def call(prompt: str) -> str:
+    """
+    Send a prompt to a local Ollama model and return the raw text response.
+
+    Parameters
+    ----------
+    prompt : str
+        Fully assembled prompt string (system + history + user message).
+
+    Returns
+    -------
+    str
+        Raw text from the model.
+
+    Raises
+    ------
+    RuntimeError
+        If Ollama is unreachable or returns an empty response.
+    requests.exceptions.*
+        For timeout / HTTP errors — caller handles these.
+    """
+    model = os.getenv("OLLAMA_MODEL", _MODEL)
+    resp = _post(model, prompt, stream=False)
 
     text = resp.json().get("response", "").strip()
     if not text:
@@ -91,13 +99,36 @@ def call(prompt: str) -> str:
     return text
 
 
+def stream(prompt: str):
+    """
+    Same request as call() with "stream": true — yields the text of each
+    NDJSON chunk as the model produces it.
+    """
+    model = os.getenv("OLLAMA_MODEL", _MODEL)
+    resp = _post(model, prompt, stream=True)
+    try:
+        with resp:
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    return
+    except (requests.exceptions.RequestException, ValueError) as exc:
+        raise RuntimeError(f"Ollama stream interrupted: {exc}") from exc
+
+
 def list_models() -> list:
     """
     Return a list of locally available Ollama models.
     Returns empty list if Ollama is not running.
     """
     try:
-        resp = requests.get(f"{_BASE_URL}/api/tags", timeout=5)
+        resp = transport.get("ollama", f"{_BASE_URL}/api/tags", read_timeout=5)
         resp.raise_for_status()
         return [m["name"] for m in resp.json().get("models", [])]
     except Exception:  # pylint: disable=broad-except
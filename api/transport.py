@@ -0,0 +1,130 @@
+"""
+api/transport.py — Pooled Keep-Alive HTTP Sessions for AI Connectors
+======================================================================
+Every connector used to call module-level `requests.post`, so each chat
+turn opened a new TCP (and TLS) connection. This module keeps one
+`requests.Session` per provider whose connection pool stays alive between
+calls — later calls to the same host reuse an open connection.
+
+Used by: api/gemini.py, api/grok.py, api/ollama.py
+
+    resp = transport.post("gemini", url, json=payload)
+
+Timeouts are (connect, read) tuples from config; a connector may pass its
+own read timeout (e.g. Ollama's AI_REQUEST_TIMEOUT). Retries stay in the
+connectors (the adapters do not retry).
+
+Settings: performance.ai_transport in configs/app_config.yaml
+(`providers.<name>` overrides the defaults per provider).
+Pool statistics: pool_stats() — shown in GET /api/status.
+Benchmark: python -m benchmarks.bench_ai_transport
+"""
+
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.config_loader import load_yaml
+
+logger = logging.getLogger(__name__)
+
+_sessions = {}                # provider → requests.Session
+_requests = {}                # provider → requests sent through it
+_lock = threading.Lock()
+
+
+def _get_config(provider: str) -> dict:
+    """Transport settings for one provider (defaults + its overrides, cached)."""
+    config = load_yaml("app_config.yaml")
+    cfg = config.get("performance", {}).get("ai_transport", {}) or {}
+    overrides = (cfg.get("providers") or {}).get(provider) or {}
+    return {**{k: v for k, v in cfg.items() if k != "providers"}, **overrides}
+
+
+def session(provider: str) -> requests.Session:
+    """The provider's shared session (created on first use)."""
+    with _lock:
+        sess = _sessions.get(provider)
+        if sess is None:
+            cfg = _get_config(provider)
+            adapter = HTTPAdapter(
+                pool_connections=int(cfg.get("pool_connections", 4)),
+                pool_maxsize=int(cfg.get("pool_maxsize", 10)),
+                max_retries=0,
+            )
+            sess = requests.Session()
+            sess.mount("https://", adapter)
+            sess.mount("http://", adapter)
+            _sessions[provider] = sess
+            _requests[provider] = 0
+        return sess
+
+
+def timeout(provider: str, read: float = None) -> tuple:
+    """(connect, read) seconds — `read` overrides the configured read timeout."""
+    cfg = _get_config(provider)
+    return (
+        float(cfg.get("connect_timeout", 5)),
+        float(read if read is not None else cfg.get("read_timeout", 30)),
+    )
+
+
+def request(provider: str, method: str, url: str, read_timeout: float = None, **kwargs) -> requests.Response:
+    """Send through the provider's pooled session; raises requests exceptions as usual."""
+    kwargs.setdefault("timeout", timeout(provider, read_timeout))
+    sess = session(provider)
+    with _lock:
+        _requests[provider] += 1
+    return sess.request(method, url, **kwargs)
+
+
+def post(provider: str, url: str, **kwargs) -> requests.Response:
+    return request(provider, "POST", url, **kwargs)
+
+
+def get(provider: str, url: str, **kwargs) -> requests.Response:
+    return request(provider, "GET", url, **kwargs)
+
+
+def pool_stats() -> dict:
+    """
+    {provider: {requests, connections_opened, connections_reused, idle,
+    pool_maxsize}} for every session in use. Counts cover the host pools
+    currently held (a pool evicted past pool_connections takes its counts
+    with it).
+    """
+    stats = {}
+    with _lock:
+        items = list(_sessions.items())
+        sent = dict(_requests)
+    for provider, sess in items:
+        opened, idle = 0, 0
+        for adapter in dict.fromkeys(sess.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                opened += pool.num_connections
+                # The queue is pre-filled with None placeholders up to maxsize
+                idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        stats[provider] = {
+            "requests":           sent.get(provider, 0),
+            "connections_opened": opened,
+            "connections_reused": max(sent.get(provider, 0) - opened, 0),
+            "idle":               idle,
+            "pool_maxsize":       int(_get_config(provider).get("pool_maxsize", 10)),
+        }
+    return stats
+
+
+def close_all():
+    """Close every pooled connection (sessions are recreated on next use)."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+        _requests.clear()
+    for sess in sessions:
+        sess.close()
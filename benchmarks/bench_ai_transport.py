@@ -0,0 +1,116 @@
+"""
+benchmarks/bench_ai_transport.py — Pooled vs. Per-Call AI Connector Connections
+================================================================================
+Starts a local stub of the Ollama /api/generate endpoint (HTTP/1.1,
+keep-alive) and times the same completion call two ways:
+
+  per-call : module-level requests.post — a new TCP connection every call
+             (the connectors before api/transport.py)
+  pooled   : api.ollama.call — the provider's pooled keep-alive session
+
+The stub can add a delay to every new connection (--handshake-ms) to
+stand in for the TCP + TLS round trips of a remote provider; reused
+connections skip it, just as they skip the real handshakes.
+
+No network or API key needed. Run from the project root:
+    python -m benchmarks.bench_ai_transport
+    python -m benchmarks.bench_ai_transport --calls 200 --handshake-ms 40
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep connections open between requests
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+    handshake_s = 0.0
+    connections = 0
+
+    def setup(self):
+        # Runs once per accepted connection — a stand-in for TCP + TLS setup
+        type(self).connections += 1
+        time.sleep(self.handshake_s)
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"response": "stub reply", "done": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _measure(fn, calls):
+    before = _StubHandler.connections
+    times = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times, _StubHandler.connections - before
+
+
+def _report(label, times, connections):
+    print(f"  {label:9s}: mean {statistics.mean(times) * 1000:7.2f} ms  "
+          f"p50 {statistics.median(times) * 1000:7.2f} ms  "
+          f"max {max(times) * 1000:7.2f} ms  {connections:5d} connections")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=20.0,
+                        help="delay added to every new connection")
+    args = parser.parse_args()
+
+    _StubHandler.handshake_s = args.handshake_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # api.ollama reads its base URL at import time
+    os.environ["OLLAMA_BASE_URL"] = base_url
+    from api import ollama, transport
+
+    payload = {"model": "stub", "prompt": "ping", "stream": False}
+
+    def per_call():
+        resp = requests.post(f"{base_url}/api/generate", json=payload, timeout=30)
+        resp.raise_for_status()
+        return resp.json()["response"]
+
+    def pooled():
+        return ollama.call("ping")
+
+    try:
+        assert per_call() == pooled() == "stub reply"
+        legacy_t, legacy_c = _measure(per_call, args.calls)
+        pooled_t, pooled_c = _measure(pooled, args.calls)
+        stats = transport.pool_stats().get("ollama", {})
+    finally:
+        transport.close_all()
+        server.shutdown()
+
+    print(f"calls={args.calls} handshake={args.handshake_ms:g} ms")
+    _report("per-call", legacy_t, legacy_c)
+    _report("pooled", pooled_t, pooled_c)
+    print(f"  speedup  : {statistics.mean(legacy_t) / statistics.mean(pooled_t):7.2f}x")
+    print(f"  pool     : {stats}")
+
+
+if __name__ == "__main__":
+    main()
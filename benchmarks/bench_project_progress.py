@@ -0,0 +1,125 @@
+"""
+benchmarks/bench_project_progress.py — Project Progress Round-Trip Benchmark
+=============================================================================
+Compares the old per-project `db.tasks.find` loop (N+1 round trips) with
+ProjectService.get_projects (one $group aggregation) and counts the
+commands each one sends to MongoDB via pymongo command monitoring.
+
+Needs a reachable MongoDB. Seeds a throwaway database and drops it after.
+
+Run from the project root:
+    python -m benchmarks.bench_project_progress
+    python -m benchmarks.bench_project_progress --projects 50 --tasks 2000
+
+Env vars:
+  MONGO_URI=mongodb://localhost:27017   optional
+"""
+
+import argparse
+import os
+import random
+import time
+from uuid import uuid4
+
+from pymongo import MongoClient, monitoring
+
+from core.task import ProjectService
+
+_BENCH_DB = "LifeOS_bench_project_progress"
+
+
+class _CommandCounter(monitoring.CommandListener):
+    """Counts commands that reach the server (find, getMore, aggregate...)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in ("ping", "endSessions", "hello", "isMaster"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def _legacy_get_projects(db, user_id):
+    """The pre-aggregation implementation, kept verbatim for comparison."""
+    query = {"user_id": user_id, "isArchived": {"$ne": True}}
+    projects = list(db.projects.find(query, {"_id": 0}).sort("order", 1))
+    for p in projects:
+        pid = p["project_id"]
+        proj_tasks = list(db.tasks.find({"project_id": pid, "user_id": user_id}))
+        total = len(proj_tasks)
+        done = sum(1 for t in proj_tasks if t.get("status") == "completed")
+        p["task_count"] = total
+        p["done_count"] = done
+        p["progress"] = round((done / total * 100) if total else 0)
+    return projects
+
+
+def _seed(db, user_id, n_projects, tasks_per_project, rng):
+    projects, tasks = [], []
+    for order in range(n_projects):
+        pid = str(uuid4())
+        projects.append({"project_id": pid, "user_id": user_id, "name": f"P{order}",
+                         "order": order, "isArchived": False})
+        for i in range(tasks_per_project):
+            tasks.append({
+                "task_id": str(uuid4()), "user_id": user_id, "project_id": pid,
+                "title": f"Task {i}", "description": "x" * 200,
+                "status": rng.choice(["pending", "completed"]),
+                "recurrence": "none", "completed_dates": [], "order": i,
+            })
+    db.projects.insert_many(projects)
+    db.tasks.insert_many(tasks)
+    db.tasks.create_index([("user_id", 1), ("project_id", 1)])
+
+
+def _measure(fn, db, user_id, counter, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        counter.count = 0
+        t0 = time.perf_counter()
+        fn(db, user_id)
+        best = min(best, time.perf_counter() - t0)
+    return best, counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=2000, help="tasks per project")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    counter = _CommandCounter()
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"),
+                         serverSelectionTimeoutMS=5000, event_listeners=[counter])
+    client.drop_database(_BENCH_DB)
+    db = client[_BENCH_DB]
+    user_id = "bench-user"
+
+    try:
+        _seed(db, user_id, args.projects, args.tasks, random.Random(42))
+
+        old = _legacy_get_projects(db, user_id)
+        new = ProjectService.get_projects(db, user_id)
+        assert [(p["task_count"], p["done_count"]) for p in old] == \
+               [(p["task_count"], p["done_count"]) for p in new], "Counts differ"
+
+        legacy_t, legacy_rt = _measure(_legacy_get_projects, db, user_id, counter, args.repeat)
+        agg_t, agg_rt = _measure(ProjectService.get_projects, db, user_id, counter, args.repeat)
+    finally:
+        client.drop_database(_BENCH_DB)
+
+    print(f"projects={args.projects} tasks/project={args.tasks} repeat={args.repeat}")
+    print(f"  legacy N+1   : {legacy_t * 1000:9.2f} ms  {legacy_rt:6d} round trips")
+    print(f"  aggregation  : {agg_t * 1000:9.2f} ms  {agg_rt:6d} round trips")
+    print(f"  speedup      : {legacy_t / agg_t:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+benchmarks/bench_recurrence.py — Recurrence Expansion Microbenchmark
+=====================================================================
+Compares the old day-by-day loop against TaskService._generate_occurrences
+(closed-form stepping from core/recurrence.py) on a synthetic workload,
+and checks that both produce identical instances.
+
+Run from the project root:
+    python -m benchmarks.bench_recurrence
+    python -m benchmarks.bench_recurrence --tasks 500 --days 365
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from core.task import TaskService
+
+
+def _legacy_generate_occurrences(task, window_start, window_end):
+    """The pre-engine implementation, kept verbatim for comparison."""
+    instances = []
+    recurrence = task.get("recurrence", "none")
+    completed_dates = task.get("completed_dates", [])
+
+    base_date_str = task.get("execution_day") or task.get("start_date")
+    if base_date_str:
+        try:
+            base_date = datetime.strptime(base_date_str, "%Y-%m-%d").date()
+        except ValueError:
+            base_date = window_start
+    else:
+        base_date = window_start
+
+    current_date = max(window_start, base_date)
+
+    while current_date <= window_end:
+        should_create = False
+
+        if recurrence == "daily":
+            should_create = True
+        elif recurrence == "weekly":
+            pattern = task.get("recurrence_pattern") or []
+            weekday_map = {0: "Mon", 1: "Tue", 2: "Wed", 3: "Thu", 4: "Fri", 5: "Sat", 6: "Sun"}
+            if isinstance(pattern, list):
+                day_name = weekday_map[current_date.weekday()]
+                if day_name in pattern:
+                    should_create = True
+        elif recurrence == "monthly":
+            if current_date.day == base_date.day:
+                should_create = True
+        elif recurrence == "custom":
+            try:
+                interval = int(task.get("recurrence_pattern") or 1)
+            except:  # noqa: E722
+                interval = 1
+            days_diff = (current_date - base_date).days
+            if days_diff % interval == 0:
+                should_create = True
+
+        if should_create:
+            date_str = current_date.strftime("%Y-%m-%d")
+            inst_status = "completed" if date_str in completed_dates else "pending"
+
+            inst = task.copy()
+            inst["task_id"] = f"{task['task_id']}|{date_str}"
+            inst["original_task_id"] = task["task_id"]
+            inst["execution_day"] = date_str
+
+            if "start_date" in inst and inst["start_date"]:
+                inst["start_date"] = date_str
+            if "end_date" in inst and inst["end_date"]:
+                inst["end_date"] = date_str
+
+            inst["status"] = inst_status
+            instances.append(inst)
+
+        current_date += timedelta(days=1)
+
+    return instances
+
+
+def _make_tasks(n: int, window_start: date, rng: random.Random) -> list:
+    """Build n recurring tasks with a realistic mix of rules and history."""
+    rules = ["daily", "weekly", "monthly", "custom"]
+    tasks = []
+    for i in range(n):
+        recurrence = rules[i % len(rules)]
+        base = window_start - timedelta(days=rng.randint(0, 400))
+        pattern = None
+        if recurrence == "weekly":
+            pattern = rng.sample(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], rng.randint(1, 4))
+        elif recurrence == "custom":
+            pattern = str(rng.randint(2, 10))
+        completed = [
+            (base + timedelta(days=d)).isoformat()
+            for d in range(0, 400 + 90, 2)
+        ]
+        tasks.append({
+            "task_id": f"task-{i}",
+            "title": f"Task {i}",
+            "recurrence": recurrence,
+            "recurrence_pattern": pattern,
+            "execution_day": base.isoformat(),
+            "start_date": base.isoformat(),
+            "end_date": "",
+            "completed_dates": completed,
+        })
+    return tasks
+
+
+def _time(fn, tasks, window_start, window_end, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for task in tasks:
+            fn(task, window_start, window_end)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=300, help="number of recurring tasks")
+    parser.add_argument("--days", type=int, default=90, help="window size in days")
+    parser.add_argument("--repeat", type=int, default=5, help="best-of-N timing runs")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    window_start = date.today() - timedelta(days=30)
+    window_end = window_start + timedelta(days=args.days)
+    tasks = _make_tasks(args.tasks, window_start, rng)
+
+    # Correctness: both implementations must agree instance-for-instance
+    for task in tasks:
+        old = _legacy_generate_occurrences(task, window_start, window_end)
+        new = TaskService._generate_occurrences(task, window_start, window_end)
+        assert old == new, f"Mismatch for {task['task_id']} ({task['recurrence']})"
+
+    legacy = _time(_legacy_generate_occurrences, tasks, window_start, window_end, args.repeat)
+    engine = _time(TaskService._generate_occurrences, tasks, window_start, window_end, args.repeat)
+
+    print(f"tasks={args.tasks} window={args.days}d repeat={args.repeat}")
+    print(f"  legacy loop : {legacy * 1000:8.2f} ms")
+    print(f"  engine      : {engine * 1000:8.2f} ms")
+    print(f"  speedup     : {legacy / engine:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
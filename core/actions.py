@@ -270,18 +270,27 @@ def create_project_with_tasks(db, user_id: str, args: dict) -> dict:
     project = ProjectService.create_project(db, user_id, data)
     pid     = project["project_id"]
 
-    # Create each task and link it to the project
+    # Create all tasks in one batch, linked to the project
     created_tasks = []
     failed_tasks  = []
 
-    for task_args in tasks_data:
-        task_input = {**task_args, "project_id": pid}
-        task, error = TaskService.create_task(db, user_id, task_input)
-        if task:
-            created_tasks.append({"id": task["task_id"], "title": task["title"]})
+    task_inputs = [
+        {**task_args, "project_id": pid} if isinstance(task_args, dict) else task_args
+        for task_args in tasks_data
+    ]
+    batch = {"results": []}
+    if task_inputs:
+        batch, error = TaskService.create_tasks(db, user_id, task_inputs)
+        if error:
+            raise ValueError(f"CREATE_PROJECT_WITH_TASKS failed: {error}")
+
+    for task_args, res in zip(tasks_data, batch["results"]):
+        if "task" in res:
+            created_tasks.append({"id": res["task"]["task_id"], "title": res["task"]["title"]})
         else:
-            failed_tasks.append({"title": task_args.get("title", "?"), "error": error})
-            logger.warning("Failed to create task '%s': %s", task_args.get("title"), error)
+            title = task_args.get("title", "?") if isinstance(task_args, dict) else "?"
+            failed_tasks.append({"title": title, "error": res["error"]})
+            logger.warning("Failed to create task '%s': %s", title, res["error"])
 
     logger.info(
         "AI created project '%s' with %d tasks (id=%s)",
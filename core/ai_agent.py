@@ -16,18 +16,33 @@ Sole responsibilities:
 Flow:
   chat()
     ├── _build_prompt()      <- reads from prompts/ and configs/ai_modes.yaml
+    ├── ResponseCache        <- core/ai_cache.py: replayed / repeated prompts, single-flight
     ├── _call_ai_provider()  <- delegates to api/gemini.py, api/grok.py, api/ollama.py
+    │                           (skipping providers whose breaker is open — core/provider_health.py;
+    │                            hedged, with a deadline — core/ai_dispatch.py)
     ├── _parse_actions()     <- extracts [ACTION:TYPE]{...}[/ACTION]
     └── _execute_actions()   <- uses core/registry.py + core/actions.py
+
+  chat_stream()              <- same steps, as events for POST /api/ai/chat?stream=1
+    ├── _stream_ai_provider()  <- each connector's stream() (provider SSE / NDJSON),
+    │                             under the dispatch limits and deadline
+    └── _ActionStream          <- holds [ACTION] blocks back from the token
+                                  stream and runs each one as soon as it closes
 """
 
 import os
 import re
 import json
 import logging
+import importlib
+import itertools
+import time
 from datetime import datetime, timezone
 
 from core.config_loader import load_yaml, load_prompt
+from core.ai_cache import ResponseCache
+from core.ai_dispatch import HedgedDispatcher
+from core.provider_health import ProviderBreaker
 from core import registry  # noqa: F401
 from core import actions   # noqa: F401 — activates action registration in the registry
 
@@ -46,6 +61,58 @@ _ACTION_PATTERN = re.compile(
     re.DOTALL,
 )
 
+_ACTION_OPEN  = "[ACTION:"
+_ACTION_CLOSE = "[/ACTION]"
+
+
+class _ActionStream:
+    """
+    Incremental splitter for a streamed reply: feed() returns, in order, the
+    text that is safe to show and every [ACTION:...]...[/ACTION] block that
+    has closed. Text that may be the start of a tag is held back until it is
+    decided.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._in_action = False
+
+    def feed(self, delta: str) -> list:
+        """Returns [("text", str) | ("action", block), ...]."""
+        self._buf += delta
+        out = []
+        while True:
+            if self._in_action:
+                end = self._buf.find(_ACTION_CLOSE)
+                if end < 0:
+                    break
+                end += len(_ACTION_CLOSE)
+                out.append(("action", self._buf[:end]))
+                self._buf = self._buf[end:]
+                self._in_action = False
+                continue
+            start = self._buf.find(_ACTION_OPEN)
+            if start >= 0:
+                if start:
+                    out.append(("text", self._buf[:start]))
+                self._buf = self._buf[start:]
+                self._in_action = True
+                continue
+            # Keep a trailing "[", "[ACT"... — the next delta may complete the tag
+            keep = next((k for k in range(min(len(_ACTION_OPEN) - 1, len(self._buf)), 0, -1)
+                         if self._buf.endswith(_ACTION_OPEN[:k])), 0)
+            cut = len(self._buf) - keep
+            if cut:
+                out.append(("text", self._buf[:cut]))
+            self._buf = self._buf[cut:]
+            break
+        return out
+
+    def flush(self) -> str:
+        """Whatever is still held back (e.g. an unclosed tag) once the reply ended."""
+        rest, self._buf, self._in_action = self._buf, "", False
+        return rest
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  SERVICE CLASS
@@ -69,11 +136,77 @@ class AIAgentService:
           3. Last resort: Ollama (local, no key needed).
 
         This means the AI never hard-fails as long as at least one
-        provider is reachable.
+        provider is reachable. Providers whose circuit breaker is open
+        (core/provider_health.py) are skipped without a call.
+
+        With performance.ai_dispatch enabled the same order goes through
+        core/ai_dispatch.py: hedged requests, per-provider concurrency
+        limits and one deadline for the whole chat.
         """
-        import os
+        chain = dict(self._provider_chain())
+        if HedgedDispatcher.is_enabled():
+            provider_name, result, last_error, skipped = HedgedDispatcher.run(
+                list(chain), lambda name: self._timed_call(name, chain[name], prompt)
+            )
+            if provider_name is None:
+                raise self._all_failed(last_error, skipped)
+            if provider_name != _AI_PROVIDER:
+                print(f"[AI] Answered by '{provider_name}' ('{_AI_PROVIDER}' unavailable or slower)")
+            return result
+
+        last_error, skipped = None, []
+        for provider_name, module_path in chain.items():
+            if not ProviderBreaker.allow(provider_name):
+                skipped.append(provider_name)
+                continue
+            try:
+                result = self._timed_call(provider_name, module_path, prompt)
+            except Exception as e:
+                last_error = e
+                print(f"[AI] Provider '{provider_name}' failed: {e}")
+                continue
+            if result and result.strip():
+                if provider_name != _AI_PROVIDER:
+                    # Log the fallback so it shows in server output
+                    print(f"[AI] Fell back to '{provider_name}' ('{_AI_PROVIDER}' unavailable)")
+                return result
+
+        raise self._all_failed(last_error, skipped)
+
+    @staticmethod
+    def _timed_call(provider_name: str, module_path: str, prompt: str) -> str:
+        """One provider call, its outcome and latency reported to the circuit breaker."""
+        started = time.monotonic()
+        try:
+            result = importlib.import_module(module_path).call(prompt)
+        except Exception as e:
+            ProviderBreaker.record(provider_name, False, time.monotonic() - started, str(e))
+            raise
+        ok = bool(result and result.strip())
+        ProviderBreaker.record(provider_name, ok, time.monotonic() - started, None if ok else "empty reply")
+        return result
+
+    @staticmethod
+    def _all_failed(last_error, skipped: list) -> RuntimeError:
+        if isinstance(last_error, TimeoutError):
+            return RuntimeError(f"The AI took too long to answer ({last_error}). Please try again.")
+        if last_error is None and skipped:
+            return RuntimeError(
+                f"AI providers temporarily unavailable ({', '.join(skipped)}). "
+                "Please try again in a moment."
+            )
+        return RuntimeError(
+            f"All AI providers failed. Last error: {last_error}. "
+            "Check your API keys and that Ollama is running."
+        )
 
-        # Build the ordered list: configured provider first, then fallbacks
+    @staticmethod
+    def _provider_chain() -> list:
+        """
+        [(provider_name, module_path), ...] in waterfall order:
+        configured provider -> all others -> ollama last, skipping any
+        provider without an API key.
+        """
         def _gemini_available(): return bool(os.getenv("GEMINI_API_KEY", "").strip())
         def _grok_available():   return bool(os.getenv("GROK_API_KEY",   "").strip())
         def _ollama_available(): return True  # local — always try last
@@ -84,55 +217,105 @@ class AIAgentService:
             "ollama": (_ollama_available,  "api.ollama"),
         }
 
-        # Ordered: configured provider -> all others -> ollama last
         order = [_AI_PROVIDER] + [p for p in ("gemini", "grok", "ollama") if p != _AI_PROVIDER]
-
-        last_error = None
+        chain = []
         for provider_name in order:
             check_fn, module_path = _providers.get(provider_name, (None, None))
-            if check_fn is None or not check_fn():
-                continue  # skip — no key or unknown provider
-            try:
-                import importlib
-                mod    = importlib.import_module(module_path)
-                result = mod.call(prompt)
-                if result and result.strip():
-                    if provider_name != _AI_PROVIDER:
-                        # Log the fallback so it shows in server output
-                        print(f"[AI] Fell back to '{provider_name}' ('{_AI_PROVIDER}' unavailable)")
-                    return result
-            except Exception as e:
-                last_error = e
-                print(f"[AI] Provider '{provider_name}' failed: {e}")
-                continue
+            if check_fn is not None and check_fn():
+                chain.append((provider_name, module_path))
+        return chain
 
-        raise RuntimeError(
-            f"All AI providers failed. Last error: {last_error}. "
-            "Check your API keys and that Ollama is running."
-        )
+    def _stream_ai_provider(self, prompt: str):
+        """
+        Streaming counterpart of _call_ai_provider(): yields text deltas.
+        Falls back to the next provider only while nothing has been yielded —
+        a failure mid-reply is raised (the client already shows the text).
+        The breaker records time to first token as the call's latency.
+
+        With performance.ai_dispatch enabled the stream is opened through
+        core/ai_dispatch.py: per-provider concurrency limits, and the chat
+        deadline bounds the wait for the first token.
+        """
+        chain = dict(self._provider_chain())
+        began = time.monotonic()
+        if HedgedDispatcher.is_enabled():
+            provider_name, deltas, last_error, skipped = HedgedDispatcher.open_stream(
+                list(chain), lambda name: self._open_stream(name, chain[name], prompt)
+            )
+        else:
+            provider_name, deltas, last_error, skipped = None, None, None, []
+            for name, module_path in chain.items():
+                if not ProviderBreaker.allow(name):
+                    skipped.append(name)
+                    continue
+                try:
+                    first, rest = self._open_stream(name, module_path, prompt)
+                except Exception as e:
+                    last_error = e
+                    print(f"[AI] Provider '{name}' failed: {e}")
+                    continue
+                provider_name, deltas = name, itertools.chain([first], rest)
+                break
+
+        if provider_name is None:
+            raise self._all_failed(last_error, skipped)
+        if provider_name != _AI_PROVIDER:
+            print(f"[AI] Fell back to '{provider_name}' ('{_AI_PROVIDER}' unavailable)")
+        try:
+            yield from deltas
+        except Exception as e:
+            ProviderBreaker.record(provider_name, False, time.monotonic() - began, str(e))
+            raise RuntimeError(f"AI provider '{provider_name}' failed mid-reply: {e}") from e
 
+    @staticmethod
+    def _open_stream(provider_name: str, module_path: str, prompt: str) -> tuple:
+        """
+        Open one provider's stream and read up to its first text.
+        Returns (first_delta, rest); time to first token goes to the breaker.
+        """
+        started = time.monotonic()
+        try:
+            mod = importlib.import_module(module_path)
+            deltas = iter(mod.stream(prompt) if hasattr(mod, "stream") else [mod.call(prompt)])
+            for delta in deltas:
+                if delta:
+                    ProviderBreaker.record(provider_name, True, time.monotonic() - started)
+                    return delta, deltas
+        except Exception as e:
+            ProviderBreaker.record(provider_name, False, time.monotonic() - started, str(e))
+            raise
+        ProviderBreaker.record(provider_name, False, time.monotonic() - started, "empty reply")
+        raise RuntimeError(f"{provider_name} returned an empty reply")
 
     # ── Prompt builder ────────────────────────────────────────────────────────
 
-    def _build_prompt(self, mode: str, messages: list) -> str:
+    @staticmethod
+    def _mode_def(mode: str) -> dict:
+        """Mode configuration from configs/ai_modes.yaml (unknown → first mode)."""
+        modes_config = load_yaml("ai_modes.yaml")
+        modes_list   = modes_config.get("modes", [])
+        mode_def     = next((m for m in modes_list if m["id"] == mode), None)
+
+        if not mode_def:
+            # Fall back to first mode (planning)
+            mode_def = modes_list[0] if modes_list else {"prompt_file": "planning.txt", "actions_enabled": True}
+        return mode_def
+
+    def _build_prompt(self, mode: str, messages: list, utc_now: str = None) -> str:
         """
         Assembles: system instructions + conversation history + latest message
         into a single string accepted by any model.
 
         Reads prompts from external files in prompts/
         and mode settings from configs/ai_modes.yaml.
+        `utc_now` overrides the clock line (default: the current minute).
         """
         # 1 — Load mode configuration
-        modes_config = load_yaml("ai_modes.yaml")
-        modes_list   = modes_config.get("modes", [])
-        mode_def     = next((m for m in modes_list if m["id"] == mode), None)
-
-        if not mode_def:
-            # Fall back to first mode (planning)
-            mode_def = modes_list[0] if modes_list else {"prompt_file": "planning.txt", "actions_enabled": True}
+        mode_def = self._mode_def(mode)
 
         # 2 — Build component parts
-        utc_now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+        if utc_now is None:
+            utc_now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
         base    = load_prompt("base_context.txt").format(utc_now=utc_now)
 
         actions_block = ""
@@ -265,32 +448,42 @@ class AIAgentService:
           messages — [{"role": "user"|"assistant", "content": "..."}]
 
         Returns:
-          {"reply": str, "actions_taken": list}
+          {"reply": str, "actions_taken": list}   (+ "cached": True from the response cache)
         """
-        # Validate mode against config
-        modes_config = load_yaml("ai_modes.yaml")
-        valid_ids    = [m["id"] for m in modes_config.get("modes", [])]
-        default_mode = load_yaml("app_config.yaml").get("ai", {}).get("default_mode", "planning")
-        mode         = mode if mode in valid_ids else default_mode
+        mode = self._resolve_mode(mode)
 
         if not messages:
             return {"reply": "Please send a message.", "actions_taken": []}
 
         # 1 — Build the prompt
         try:
-            prompt = self._build_prompt(mode, messages)
+            prompt    = self._build_prompt(mode, messages)
+            cache_key = self._cache_key(user_id, mode, messages)
         except Exception as exc:
             logger.exception("Prompt build failed: %s", exc)
             return {"reply": "Failed to prepare your message. Please try again.", "actions_taken": []}
 
+        if cache_key is None:
+            return self._answer(db, user_id, prompt)[0]
+
+        # Same conversation again (replay / double-click): served from core/ai_cache.py
+        return ResponseCache.get_or_compute(
+            cache_key,
+            ResponseCache.ttl(self._mode_def(mode).get("actions_enabled", False)),
+            lambda: self._answer(db, user_id, prompt),
+            prompt_bytes=len(prompt.encode("utf-8")),
+        )
+
+    def _answer(self, db, user_id: str, prompt: str) -> tuple:
+        """Steps 2-4 of chat(). Returns (result, cacheable) — error replies are not cacheable."""
         # 2 — Call the AI provider (errors from api/ arrive as RuntimeError only)
         try:
             raw_text = self._call_ai_provider(prompt)
         except RuntimeError as exc:
-            return {"reply": str(exc), "actions_taken": []}
+            return {"reply": str(exc), "actions_taken": []}, False
         except Exception as exc:  # pylint: disable=broad-except
             logger.exception("Unexpected provider error: %s", exc)
-            return {"reply": "An unexpected error occurred. Please try again.", "actions_taken": []}
+            return {"reply": "An unexpected error occurred. Please try again.", "actions_taken": []}, False
 
         # 3 — Extract action tags
         clean_text, parsed_actions = self._parse_actions(raw_text)
@@ -301,7 +494,113 @@ class AIAgentService:
         return {
             "reply":         clean_text or "Done! Let me know if you need anything else.",
             "actions_taken": actions_taken,
+        }, True
+
+    def _cache_key(self, user_id: str, mode: str, messages: list):
+        """
+        Response cache key, or None with the cache disabled. The clock line
+        is left out so a replay in the next minute still matches.
+        """
+        if not ResponseCache.is_enabled():
+            return None
+        return ResponseCache.key(user_id, mode, _AI_PROVIDER, self._build_prompt(mode, messages, utc_now=""))
+
+    def chat_stream(self, db, user_id: str, mode: str, messages: list):
+        """
+        Streaming variant of chat() for POST /api/ai/chat?stream=1.
+
+        Yields (event, data) pairs:
+          ("token",  {"text": str})   visible reply text, as it arrives
+          ("action", {...})           one executed action (as in actions_taken),
+                                      as soon as its [/ACTION] tag is received
+          ("done",   {"reply", "actions_taken"})   same payload as chat()
+          ("error",  {"error": str})  the reply could not be produced / finished
+
+        A cached result (core/ai_cache.py) comes back as one token + done —
+        as does the result of an identical request still streaming.
+        """
+        mode = self._resolve_mode(mode)
+
+        if not messages:
+            yield "done", {"reply": "Please send a message.", "actions_taken": []}
+            return
+
+        try:
+            prompt    = self._build_prompt(mode, messages)
+            cache_key = self._cache_key(user_id, mode, messages)
+        except Exception as exc:
+            logger.exception("Prompt build failed: %s", exc)
+            yield "error", {"error": "Failed to prepare your message. Please try again."}
+            return
+
+        flight = None
+        if cache_key is not None:
+            prompt_bytes = len(prompt.encode("utf-8"))
+            cached = ResponseCache.get(cache_key, prompt_bytes)
+            if cached is None:
+                # The same request already streaming (double-click): wait for its result
+                leader, flight = ResponseCache.join(cache_key)
+                if not leader:
+                    cached = ResponseCache.follow(flight, prompt_bytes)
+                    flight = None
+            if cached is not None:
+                yield "token", {"text": cached["reply"]}
+                yield "done", cached
+                return
+
+        result = None
+        try:
+            result = yield from self._stream_answer(db, user_id, prompt)
+        finally:
+            if flight is not None:
+                ResponseCache.land(cache_key, flight, result,
+                                   ResponseCache.ttl(self._mode_def(mode).get("actions_enabled", False)))
+
+    def _stream_answer(self, db, user_id: str, prompt: str):
+        """Events of chat_stream() for one provider reply; returns the result (None on error)."""
+        splitter      = _ActionStream()
+        raw_parts     = []
+        actions_taken = []
+        try:
+            for delta in self._stream_ai_provider(prompt):
+                raw_parts.append(delta)
+                for kind, part in splitter.feed(delta):
+                    if kind == "text":
+                        yield "token", {"text": part}
+                        continue
+                    # A block the pattern rejects (e.g. lower-case type) stays visible, as in chat()
+                    leftover, parsed = self._parse_actions(part)
+                    if leftover:
+                        yield "token", {"text": leftover}
+                    for result in self._execute_actions(db, user_id, parsed):
+                        actions_taken.append(result)
+                        yield "action", result
+            rest = splitter.flush()
+            if rest:
+                yield "token", {"text": rest}
+        except RuntimeError as exc:
+            yield "error", {"error": str(exc)}
+            return None
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Unexpected provider error: %s", exc)
+            yield "error", {"error": "An unexpected error occurred. Please try again."}
+            return None
+
+        clean_text, _ = self._parse_actions("".join(raw_parts))
+        result = {
+            "reply":         clean_text or "Done! Let me know if you need anything else.",
+            "actions_taken": actions_taken,
         }
+        yield "done", result
+        return result
+
+    @staticmethod
+    def _resolve_mode(mode: str) -> str:
+        """Validate mode against config (unknown → ai.default_mode)."""
+        modes_config = load_yaml("ai_modes.yaml")
+        valid_ids    = [m["id"] for m in modes_config.get("modes", [])]
+        default_mode = load_yaml("app_config.yaml").get("ai", {}).get("default_mode", "planning")
+        return mode if mode in valid_ids else default_mode
 
     @staticmethod
     def get_modes() -> list:
@@ -0,0 +1,183 @@
+"""
+core/ai_cache.py — Exact-Match AI Response Cache + Single-Flight
+==================================================================
+Retries after a client timeout and double-clicks used to send the same
+prompt upstream again — and, in action modes, run its actions twice.
+Chat results ({"reply", "actions_taken"}) are now cached per user under a
+hash of (mode, provider, assembled prompt), in memory with TTL and LRU
+eviction:
+
+  - action-free modes (coaching...) keep an entry for ttl_sec;
+  - modes with actions keep it only replay_ttl_sec, so a replayed request
+    gets the first answer back (actions not executed again) while a
+    deliberate repeat later on is a new request.
+
+Error replies are never stored. Concurrent identical requests share one
+upstream call (single-flight): the first computes, the others wait for
+its result — streamed ones too (AIAgentService.chat_stream leads or
+follows through join / follow / land), so a double-clicked send does not
+run its actions twice.
+
+Metrics — stats(), shown in GET /api/status: hits, misses, coalesced,
+hit_rate, bytes_saved (prompt + reply bytes not exchanged with a
+provider), entries, evictions.
+
+The cache is per process. Settings: performance.ai_cache in
+configs/app_config.yaml.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from core.config_loader import load_yaml
+
+logger = logging.getLogger(__name__)
+
+_entries = OrderedDict()      # key → {"value", "expires_at", "bytes"}   (oldest first)
+_inflight = {}                # key → {"event", "value"}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "stores": 0, "evictions": 0, "bytes_saved": 0}
+
+
+def _get_config() -> dict:
+    """Load AI response cache settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("ai_cache", {}) or {}
+
+
+def _size(value: dict) -> int:
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+class ResponseCache:
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return bool(_get_config().get("enabled", False))
+
+    @staticmethod
+    def key(user_id: str, mode: str, provider: str, prompt: str) -> str:
+        raw = json.dumps([user_id, mode, provider, prompt], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def ttl(actions_enabled: bool) -> float:
+        cfg = _get_config()
+        if actions_enabled:
+            return float(cfg.get("replay_ttl_sec", 30))
+        return float(cfg.get("ttl_sec", 600))
+
+    @staticmethod
+    def get(key: str, prompt_bytes: int = 0):
+        """Cached result (a copy, marked "cached": True) or None. Counts a hit or miss."""
+        now = time.monotonic()
+        with _lock:
+            entry = _entries.get(key)
+            if entry and entry["expires_at"] <= now:
+                del _entries[key]
+                entry = None
+            if entry is None:
+                _stats["misses"] += 1
+                return None
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            _stats["bytes_saved"] += prompt_bytes + entry["bytes"]
+            value = copy.deepcopy(entry["value"])
+        value["cached"] = True
+        return value
+
+    @staticmethod
+    def put(key: str, value: dict, ttl: float):
+        if ttl <= 0:
+            return
+        cfg = _get_config()
+        max_entries = int(cfg.get("max_entries", 1000))
+        size = _size(value)
+        with _lock:
+            _entries[key] = {"value": copy.deepcopy(value), "expires_at": time.monotonic() + ttl, "bytes": size}
+            _entries.move_to_end(key)
+            _stats["stores"] += 1
+            while len(_entries) > max_entries:
+                _entries.popitem(last=False)
+                _stats["evictions"] += 1
+
+    @staticmethod
+    def join(key: str) -> tuple:
+        """(leader, flight) — the first caller of a key leads, later ones join its flight."""
+        with _lock:
+            flight = _inflight.get(key)
+            if flight is not None:
+                return False, flight
+            flight = _inflight[key] = {"event": threading.Event(), "value": None}
+            return True, flight
+
+    @staticmethod
+    def follow(flight: dict, prompt_bytes: int = 0):
+        """Wait up to wait_sec for the leader: its result (a copy, marked "cached": True) or None."""
+        if not flight["event"].wait(float(_get_config().get("wait_sec", 60))) or flight["value"] is None:
+            return None
+        with _lock:
+            _stats["coalesced"] += 1
+            _stats["bytes_saved"] += prompt_bytes + _size(flight["value"])
+        value = copy.deepcopy(flight["value"])
+        value["cached"] = True
+        return value
+
+    @staticmethod
+    def land(key: str, flight: dict, value, ttl: float = 0):
+        """The leader's result (None if it failed): stored when ttl > 0, handed to followers."""
+        try:
+            flight["value"] = value
+            if value is not None:
+                ResponseCache.put(key, value, ttl)
+        finally:
+            with _lock:
+                _inflight.pop(key, None)
+            flight["event"].set()
+
+    @staticmethod
+    def get_or_compute(key: str, ttl: float, compute, prompt_bytes: int = 0) -> dict:
+        """
+        Cached result, else compute() -> (value, cacheable) — run once for
+        all concurrent callers of the same key. Followers wait up to
+        wait_sec for the leader, then compute on their own.
+        """
+        cached = ResponseCache.get(key, prompt_bytes)
+        if cached is not None:
+            return cached
+
+        leader, flight = ResponseCache.join(key)
+        if not leader:
+            value = ResponseCache.follow(flight, prompt_bytes)
+            if value is not None:
+                return value
+            value, _ = compute()
+            return value
+
+        value, cacheable = None, False
+        try:
+            value, cacheable = compute()
+            return value
+        finally:
+            ResponseCache.land(key, flight, value, ttl if cacheable else 0)
+
+    @staticmethod
+    def stats() -> dict:
+        with _lock:
+            lookups = _stats["hits"] + _stats["misses"]
+            return {
+                **_stats,
+                "hit_rate": round((_stats["hits"] + _stats["coalesced"]) / lookups, 3) if lookups else 0.0,
+                "entries":  len(_entries),
+                "bytes":    sum(e["bytes"] for e in _entries.values()),
+            }
+
+    @staticmethod
+    def clear():
+        with _lock:
+            _entries.clear()
@@ -0,0 +1,245 @@
+"""
+core/ai_dispatch.py — Hedged Provider Dispatch with a Per-Chat Deadline
+=========================================================================
+The waterfall in AIAgentService used to try providers strictly one after
+another, so a slow or failing provider added its whole retry budget to
+the reply time. HedgedDispatcher.run() instead:
+
+  - starts the first provider in a worker thread;
+  - if it has not answered after its hedge delay — the hedge_percentile
+    latency of its recent successful calls (core/provider_health.py), or
+    hedge_default_sec before there is any — also starts the next one;
+  - starts the next one straight away when a call fails;
+  - returns the first non-empty answer and cancels calls not yet started;
+  - gives up after deadline_sec in total.
+
+HedgedDispatcher.open_stream() is the streaming counterpart: providers
+are tried one at a time (two streams cannot be merged, so no hedging),
+under the same concurrency limits — a stream holds its provider's permit
+until it ends — and the deadline bounds the wait for the first token.
+
+At most max_in_flight calls run for one chat, and each provider has a
+concurrency limit (max_concurrency, per-provider override) — a provider
+at its limit is passed over, so one slow backend cannot take every
+worker. Calls still running when another one wins finish in the
+background; their answers are dropped (requests cannot be interrupted),
+but their outcome still feeds the circuit breaker.
+
+Settings: performance.ai_dispatch in configs/app_config.yaml.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from core.config_loader import load_yaml
+from core.provider_health import ProviderBreaker
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_semaphores = {}              # provider → BoundedSemaphore
+_lock = threading.Lock()
+
+
+def _get_config() -> dict:
+    """Load dispatch settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("ai_dispatch", {}) or {}
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(_get_config().get("max_workers", 16)),
+                thread_name_prefix="ai-dispatch",
+            )
+        return _executor
+
+
+def _semaphore(provider: str) -> threading.BoundedSemaphore:
+    with _lock:
+        sem = _semaphores.get(provider)
+        if sem is None:
+            cfg = _get_config()
+            limit = (cfg.get("providers") or {}).get(provider, {}).get("max_concurrency",
+                                                                        cfg.get("max_concurrency", 8))
+            sem = _semaphores[provider] = threading.BoundedSemaphore(int(limit))
+        return sem
+
+
+def _hedge_delay(provider: str, cfg: dict) -> float:
+    observed = ProviderBreaker.latency_percentile(provider, float(cfg.get("hedge_percentile", 95)))
+    delay = observed if observed is not None else float(cfg.get("hedge_default_sec", 8))
+    return max(delay, float(cfg.get("hedge_min_sec", 1)))
+
+
+def _run(provider: str, sem, call):
+    try:
+        return call(provider)
+    finally:
+        sem.release()
+
+
+def _cancel(pending: dict):
+    """Cancel calls that have not started — _run() will never release their permits."""
+    for future, provider in pending.items():
+        if future.cancel():
+            _semaphore(provider).release()
+
+
+def _relay(first: str, rest, sem):
+    """A provider stream that gives its permit back when it ends or is closed."""
+    try:
+        yield first
+        yield from rest
+    finally:
+        sem.release()
+        close = getattr(rest, "close", None)
+        if close:
+            close()
+
+
+def _abandon(future, sem):
+    """Done-callback for a stream start that missed the deadline: drop it, free its permit."""
+    sem.release()
+    if future.cancelled() or future.exception() is not None:
+        return
+    close = getattr(future.result()[1], "close", None)
+    if close:
+        close()
+
+
+class HedgedDispatcher:
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return bool(_get_config().get("enabled", False))
+
+    @staticmethod
+    def run(providers: list, call) -> tuple:
+        """
+        Ask `providers` (names, in preference order) via call(name) -> str,
+        which raises or returns an empty string on failure.
+
+        Returns (provider, answer, last_error, skipped) — provider is None
+        when no provider answered (skipped: passed over by the breaker or
+        the concurrency limit).
+        """
+        cfg = _get_config()
+        hedge = bool(cfg.get("hedge", True))
+        max_in_flight = max(int(cfg.get("max_in_flight", 2)), 1)
+        deadline = time.monotonic() + float(cfg.get("deadline_sec", 45))
+
+        queue = list(providers)
+        pending = {}              # future → provider
+        skipped, last_error = [], None
+        next_hedge = None
+
+        def launch() -> bool:
+            """Start the next provider that is healthy and under its limit."""
+            while queue:
+                name = queue.pop(0)
+                sem = _semaphore(name)
+                if not sem.acquire(blocking=False):
+                    skipped.append(name)
+                    continue
+                if not ProviderBreaker.allow(name):
+                    sem.release()
+                    skipped.append(name)
+                    continue
+                pending[_pool().submit(_run, name, sem, call)] = name
+                return True
+            return False
+
+        def schedule_hedge(name: str):
+            nonlocal next_hedge
+            next_hedge = time.monotonic() + _hedge_delay(name, cfg) if hedge and queue else None
+
+        if launch():
+            schedule_hedge(next(iter(pending.values())))
+
+        while pending:
+            now = time.monotonic()
+            wake = min(deadline, next_hedge) if next_hedge else deadline
+            done, _ = wait(list(pending), timeout=max(wake - now, 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    answer = future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    last_error = exc
+                    logger.warning("AI provider %s failed: %s", name, exc)
+                    continue
+                if answer and answer.strip():
+                    _cancel(pending)
+                    return name, answer, last_error, skipped
+                last_error = RuntimeError(f"{name} returned an empty reply")
+
+            now = time.monotonic()
+            if now >= deadline:
+                _cancel(pending)
+                waited = ", ".join(pending.values())
+                return None, None, TimeoutError(
+                    f"no answer within {cfg.get('deadline_sec', 45)}s (waiting on {waited})"), skipped
+
+            if len(pending) < max_in_flight:
+                failed_over = bool(done)
+                hedge_due = next_hedge is not None and now >= next_hedge
+                if (failed_over or hedge_due) and launch():
+                    if hedge_due:
+                        logger.info("AI dispatch: hedging to %s", list(pending.values())[-1])
+                    schedule_hedge(list(pending.values())[-1])
+                elif hedge_due:
+                    next_hedge = None
+            elif next_hedge is not None and now >= next_hedge:
+                next_hedge = None
+
+        return None, None, last_error, skipped
+
+    @staticmethod
+    def open_stream(providers: list, start) -> tuple:
+        """
+        Open the first provider stream that produces text. start(name) ->
+        (first_delta, rest) opens a stream and reads up to its first text,
+        raising on failure; it runs in a worker so the deadline applies.
+
+        Returns (provider, deltas, last_error, skipped) like run() — deltas
+        yields first_delta then rest and must be iterated to the end or
+        closed (that releases the provider's permit).
+        """
+        cfg = _get_config()
+        deadline_sec = float(cfg.get("deadline_sec", 45))
+        deadline = time.monotonic() + deadline_sec
+        skipped, last_error = [], None
+
+        for name in providers:
+            sem = _semaphore(name)
+            if not sem.acquire(blocking=False):
+                skipped.append(name)
+                continue
+            if not ProviderBreaker.allow(name):
+                sem.release()
+                skipped.append(name)
+                continue
+            future = _pool().submit(start, name)
+            try:
+                first, rest = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeout:
+                future.cancel()
+                future.add_done_callback(lambda f, s=sem: _abandon(f, s))
+                return None, None, TimeoutError(
+                    f"no answer within {deadline_sec:g}s (waiting on {name})"), skipped
+            except Exception as exc:  # pylint: disable=broad-except
+                sem.release()
+                last_error = exc
+                logger.warning("AI provider %s failed: %s", name, exc)
+                continue
+            return name, _relay(first, rest, sem), last_error, skipped
+
+        return None, None, last_error, skipped
@@ -3,9 +3,15 @@ core/archive.py — Archive Business Logic
 ==========================================
 Handles retrieval of all archived items across all entity types.
 Uses core/utils.py for datetime serialization.
+
+Archived notes are listed without their bodies (only `excerpt`), so the
+archive page asks search_notes() for content matches.
 """
 
+from core.note_bodies import NoteBodyStore
+from core.search_index import NoteSearchIndex, plain_text
 from core.utils import serialize_doc
+from core.write_buffer import NoteWriteBuffer
 
 
 class ArchiveService:
@@ -33,7 +39,7 @@ class ArchiveService:
         notes = [
             serialize_doc(n, date_fields)
             for n in db.notes.find(
-                {"user_id": user_id, "archived": True}, {"_id": 0}
+                {"user_id": user_id, "archived": True}, {"_id": 0, "content": 0}
             )
         ]
 
@@ -59,3 +65,33 @@ class ArchiveService:
             "note_projects": note_projects,
             "task_projects": task_projects,
         }
+
+    @staticmethod
+    def search_notes(db, user_id: str, query: str) -> list:
+        """
+        note_ids of archived notes whose content matches `query` (min 2
+        chars): ranked by the search index when it is enabled, otherwise a
+        case-insensitive substring scan of the archived bodies.
+        """
+        query = (query or "").strip()
+        if len(query) < 2:
+            return []
+        NoteWriteBuffer.flush_user(user_id)
+        scope = {"user_id": user_id, "archived": True}
+
+        ranked = NoteSearchIndex.search(db, user_id, query) if NoteSearchIndex.is_enabled() else None
+        if ranked is not None:
+            ids = [nid for nid, _ in ranked]
+            archived = {
+                n["note_id"]
+                for n in db.notes.find({**scope, "note_id": {"$in": ids}}, {"_id": 0, "note_id": 1})
+            }
+            return [nid for nid in ids if nid in archived]
+
+        needle = query.casefold()
+        notes = list(db.notes.find(scope, {"_id": 0, "note_id": 1, "body_rev": 1, "content": 1}))
+        bodies = NoteBodyStore.load_many(db, user_id, notes)
+        return [
+            n["note_id"] for n in notes
+            if needle in plain_text(bodies.get(n["note_id"], "")).casefold()
+        ]
@@ -1,5 +1,6 @@
 import re
 from uuid import uuid4
+from pymongo.errors import DuplicateKeyError
 from werkzeug.security import generate_password_hash, check_password_hash
 
 class AuthService:
@@ -40,7 +41,13 @@ class AuthService:
             "password_hash": password_hash,
         }
 
-        users.insert_one(user_doc)
+        try:
+            users.insert_one(user_doc)
+        except DuplicateKeyError:
+            # A concurrent signup took the email or username after the checks above
+            if users.find_one({"email": email}):
+                return None, "البريد الإلكتروني مسجل مسبقاً", 409
+            return None, "اسم المستخدم مسجل مسبقاً", 409
 
         user_doc.pop("password_hash", None)
         user_doc.pop("_id", None)
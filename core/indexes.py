@@ -0,0 +1,150 @@
+"""
+core/indexes.py — Index Bootstrap from configs/schemas.yaml
+=============================================================
+Derives the MongoDB indexes every collection needs from the entity schemas
+and creates them idempotently (create_index is a no-op when the index
+already exists).
+
+Declared per entity:
+  id_field  → unique index on (user_id, <id_field>) — or on <id_field>
+              alone for entities without a user_id field (users)
+  indexes:  → extra compound / unique indexes, e.g.
+
+      indexes:
+        - keys: ["user_id", "project_id", "filename"]
+        - keys: ["user_id", "-last_updated"]   # "-" = descending
+        - keys: ["email"]
+          unique: true
+
+Runs at startup when performance.indexes.ensure_on_startup is set in
+app_config.yaml (off by default), or on demand:
+
+    python manage.py ensure-indexes
+    python manage.py index-report      # missing / unused indexes
+"""
+
+import logging
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+
+from core.config_loader import load_yaml
+
+logger = logging.getLogger(__name__)
+
+
+def _get_config() -> dict:
+    """Load index settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("indexes", {}) or {}
+
+
+def _parse_keys(keys: list) -> list:
+    """["user_id", "-last_updated"] → [("user_id", 1), ("last_updated", -1)]"""
+    return [
+        (k[1:], DESCENDING) if k.startswith("-") else (k, ASCENDING)
+        for k in keys
+    ]
+
+
+class IndexManager:
+
+    @staticmethod
+    def is_startup_enabled() -> bool:
+        return bool(_get_config().get("ensure_on_startup", False))
+
+    @staticmethod
+    def declared() -> dict:
+        """
+        Return {collection: [{"keys": [(field, dir), ...], "unique": bool}, ...]}
+        for every entity in schemas.yaml.
+        """
+        schemas = load_yaml("schemas.yaml")
+        result = {}
+        for entity in schemas.values():
+            if not isinstance(entity, dict) or "collection" not in entity:
+                continue
+            specs = []
+            id_field = entity.get("id_field")
+            if id_field:
+                scoped = "user_id" in entity.get("fields", {}) and id_field != "user_id"
+                keys = [("user_id", ASCENDING), (id_field, ASCENDING)] if scoped else [(id_field, ASCENDING)]
+                specs.append({"keys": keys, "unique": True})
+            for idx in entity.get("indexes", []) or []:
+                specs.append({"keys": _parse_keys(idx["keys"]), "unique": bool(idx.get("unique", False))})
+            result.setdefault(entity["collection"], []).extend(specs)
+        return result
+
+    @staticmethod
+    def ensure(db) -> dict:
+        """
+        Create every declared index. Existing indexes are left alone; an index
+        that cannot be built (e.g. duplicates under a unique key) is logged
+        and skipped so the rest still get created.
+
+        Returns {"created": [names], "failed": {name: error}}.
+        """
+        created, failed = [], {}
+        for coll_name, specs in IndexManager.declared().items():
+            coll = db[coll_name]
+            for spec in specs:
+                try:
+                    name = coll.create_index(spec["keys"], unique=spec["unique"])
+                    created.append(f"{coll_name}.{name}")
+                except PyMongoError as exc:
+                    key = f"{coll_name}." + "_".join(f"{k}_{d}" for k, d in spec["keys"])
+                    failed[key] = str(exc)
+                    logger.warning("Could not create index %s: %s", key, exc)
+
+        # Service-owned collections that are not schema entities
+        from core.note_bodies import NoteBodyStore
+        from core.quick_notes import QuickNoteStore
+        from core.search_index import NoteSearchIndex
+        from core.trigram_index import TrigramIndex
+        from core.writing import WritingService
+        for name, ensure_fn in (("writing_tombstones", WritingService.ensure_indexes),
+                                ("quick_note_*", QuickNoteStore.ensure_indexes),
+                                ("search_*", NoteSearchIndex.ensure_indexes),
+                                ("trigram_*", TrigramIndex.ensure_indexes),
+                                ("note_bodies", NoteBodyStore.ensure_indexes)):
+            try:
+                ensure_fn(db)
+                created.append(f"{name}.*")
+            except PyMongoError as exc:
+                failed[f"{name}.*"] = str(exc)
+                logger.warning("Could not create %s indexes: %s", name, exc)
+        return {"created": created, "failed": failed}
+
+    @staticmethod
+    def report(db) -> dict:
+        """
+        Compare declared indexes with what the server has.
+
+        Returns {collection: {"missing": [...], "unused": [...], "undeclared": [...]}}
+          missing    → declared but not present
+          unused     → present but 0 ops since server start ($indexStats)
+          undeclared → present but not in schemas.yaml
+        "unused" is None when $indexStats is not available.
+        """
+        report = {}
+        for coll_name, specs in IndexManager.declared().items():
+            coll = db[coll_name]
+            existing = {
+                name: [(k, int(d)) for k, d in info["key"]]
+                for name, info in coll.index_information().items()
+                if name != "_id_"
+            }
+            wanted = [spec["keys"] for spec in specs]
+
+            try:
+                stats = {s["name"]: s["accesses"]["ops"] for s in coll.aggregate([{"$indexStats": {}}])}
+                unused = sorted(n for n in existing if stats.get(n, 0) == 0)
+            except (OperationFailure, NotImplementedError):
+                unused = None
+
+            report[coll_name] = {
+                "missing":    ["_".join(f"{k}_{d}" for k, d in keys) for keys in wanted if keys not in existing.values()],
+                "unused":     unused,
+                "undeclared": sorted(n for n, keys in existing.items() if keys not in wanted),
+            }
+        return report
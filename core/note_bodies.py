@@ -0,0 +1,384 @@
+"""
+core/note_bodies.py — Separate, Compressed Note Body Storage
+==============================================================
+Keeps note content out of the `notes` documents so list queries never
+carry bodies. A note points at its current body revision (`body_rev`);
+the body itself lives in `note_bodies`, split into chunks of at most
+chunk_chars characters:
+
+  note_bodies → {user_id, note_id, rev, seq, start, end, codec, data}
+
+`start`/`end` are the chunk's character offsets in the body, so a range
+read (load_range) fetches and decodes only the chunks it overlaps. Each
+chunk is encoded on its own: chunks of at least compress_min_bytes (UTF-8)
+are compressed with `codec` — "zlib" (stdlib) or "zstd" (needs the
+optional `zstandard` package; zlib is used if it is not installed).
+The note keeps the body's length in characters as `content_length`.
+
+A write stores the new revision first and then flips `body_rev` on the
+note together with the other note fields, so readers never see a half-
+written body; old revisions are pruned afterwards. Every write also keeps
+a short plain-text `excerpt` on the note for list views.
+
+An edit (store_patch) writes only the chunks it touches: the new revision
+gets a chunk map that points at the untouched chunks of the previous one,
+with their offsets shifted past the edit —
+
+  note_body_revs → {user_id, note_id, rev, chunks: [{id, start, end}]}
+
+Chunk docs never change; a chunk belongs to its revision (`rev`) and to
+every later revision whose map lists its _id. Revisions without a map
+(written whole by store()) are just their own chunks.
+
+Notes written before the store was enabled still have inline `content`
+and are read as-is until migrated:
+
+    python manage.py migrate-note-bodies [--user USER_ID]
+
+(run with the store disabled it only fills in `excerpt`).
+
+Disabled by default — enable in configs/app_config.yaml:
+
+    performance:
+      note_bodies:
+        enabled: true
+"""
+
+import html
+import logging
+import re
+import zlib
+from uuid import uuid4
+
+from pymongo import ASCENDING
+
+from core.config_loader import load_yaml
+
+try:
+    import zstandard
+except ImportError:  # optional — zlib is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_COLLECTION = "note_bodies"
+_REVS       = "note_body_revs"
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _get_config() -> dict:
+    """Load note body settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("note_bodies", {}) or {}
+
+
+def excerpt(content: str) -> str:
+    """First excerpt_chars characters of the note's visible text."""
+    limit = int(_get_config().get("excerpt_chars", 200))
+    plain = " ".join(html.unescape(_TAG_RE.sub(" ", content or "")).split())
+    return plain[:limit]
+
+
+def _encode(content: str) -> tuple:
+    """Return (codec, bytes) for a body."""
+    cfg = _get_config()
+    raw = (content or "").encode("utf-8")
+    if len(raw) < int(cfg.get("compress_min_bytes", 4096)):
+        return "plain", raw
+    if cfg.get("codec", "zlib") == "zstd" and zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor().compress(raw)
+    return "zlib", zlib.compress(raw, int(cfg.get("zlib_level", 6)))
+
+
+def _decode(codec: str, data: bytes) -> str:
+    if codec == "zlib":
+        data = zlib.decompress(data)
+    elif codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("note body is zstd-compressed but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return data.decode("utf-8")
+
+
+def _join(chunks: list) -> str:
+    """Body text of one revision's chunks (any order)."""
+    chunks = sorted(chunks, key=lambda c: c["start"])
+    return "".join(_decode(c["codec"], bytes(c["data"])) for c in chunks)
+
+
+def _chunk_docs(user_id: str, note_id: str, rev: str, content: str, offset: int = 0) -> list:
+    """Chunk documents for `content`, placed at `offset` in the body."""
+    size = max(int(_get_config().get("chunk_chars", 65536)), 1)
+    docs = []
+    for seq, start in enumerate(range(0, len(content), size)):
+        text = content[start:start + size]
+        codec, data = _encode(text)
+        docs.append({
+            "user_id": user_id, "note_id": note_id, "rev": rev, "seq": seq,
+            "start": offset + start, "end": offset + start + len(text), "codec": codec, "data": data,
+        })
+    return docs
+
+
+def _chunk_map(db, user_id: str, note_id: str, rev: str):
+    """[{id, start, end}] of a revision written by store_patch(), else None."""
+    doc = db[_REVS].find_one({"user_id": user_id, "note_id": note_id, "rev": rev}, {"_id": 0, "chunks": 1})
+    return doc["chunks"] if doc else None
+
+
+def _read_mapped(db, entries: list) -> list:
+    """Chunks listed in a chunk map, with the map's offsets."""
+    if not entries:
+        return []
+    found = {c["_id"]: c for c in db[_COLLECTION].find(
+        {"_id": {"$in": [e["id"] for e in entries]}}, {"codec": 1, "data": 1}
+    )}
+    return [{**found[e["id"]], "start": e["start"]} for e in entries if e["id"] in found]
+
+
+class NoteBodyStore:
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return bool(_get_config().get("enabled", False))
+
+    @staticmethod
+    def ensure_indexes(db):
+        db[_COLLECTION].create_index(
+            [("user_id", ASCENDING), ("note_id", ASCENDING), ("rev", ASCENDING), ("seq", ASCENDING)],
+            unique=True,
+        )
+        db[_REVS].create_index(
+            [("user_id", ASCENDING), ("note_id", ASCENDING), ("rev", ASCENDING)], unique=True,
+        )
+
+    # ──────────────────────────────────────────────
+    #  Write path
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def store(db, user_id: str, note_id: str, content: str) -> tuple:
+        """
+        Prepare a content write. With the store enabled the body is written
+        as a new revision; otherwise it stays inline.
+
+        Returns (set_fields, unset_fields, rev) — apply the fields to the note
+        in the same write as everything else, then call prune() with `rev`
+        (or discard() if the note write did not happen).
+        """
+        content = content or ""
+        fields = {"excerpt": excerpt(content), "content_length": len(content)}
+        if not NoteBodyStore.is_enabled():
+            return {**fields, "content": content}, {}, None
+
+        rev = uuid4().hex
+        docs = _chunk_docs(user_id, note_id, rev, content)
+        if not docs:
+            codec, data = _encode("")
+            docs = [{"user_id": user_id, "note_id": note_id, "rev": rev, "seq": 0,
+                     "start": 0, "end": 0, "codec": codec, "data": data}]
+        db[_COLLECTION].insert_many(docs)
+        stored = sum(len(d["data"]) for d in docs)
+        return {**fields, "body_rev": rev, "body_bytes": stored}, {"content": ""}, rev
+
+    @staticmethod
+    def store_patch(db, user_id: str, note: dict, span: tuple, text: str) -> tuple:
+        """
+        Prepare a write that replaces the part of a stored body returned by
+        load_span() (pass its `span` unchanged) with `text`. Only `text` is
+        encoded and inserted; the other chunks are shared with the current
+        revision. Same contract as store() — returns (set_fields,
+        unset_fields, rev).
+        """
+        note_id, old_rev = note["note_id"], note["body_rev"]
+        start, end, span_bytes = span
+        entries = _chunk_map(db, user_id, note_id, old_rev)
+        if entries is None:
+            entries = sorted(
+                ({"id": c["_id"], "start": c["start"], "end": c["end"]} for c in db[_COLLECTION].find(
+                    {"user_id": user_id, "note_id": note_id, "rev": old_rev}, {"_id": 1, "start": 1, "end": 1}
+                )),
+                key=lambda e: e["start"],
+            )
+        delta = len(text) - (end - start)
+        total = note.get("content_length", entries[-1]["end"] if entries else 0) + delta
+
+        rev = uuid4().hex
+        docs = _chunk_docs(user_id, note_id, rev, text, start)
+        if docs:
+            db[_COLLECTION].insert_many(docs)
+        chunks = [e for e in entries if e["end"] <= start and e["end"] > e["start"]]
+        chunks.extend({"id": d["_id"], "start": d["start"], "end": d["end"]} for d in docs)
+        chunks.extend({"id": e["id"], "start": e["start"] + delta, "end": e["end"] + delta}
+                      for e in entries if e["start"] >= end and e["end"] > e["start"])
+        db[_REVS].insert_one({"user_id": user_id, "note_id": note_id, "rev": rev, "chunks": chunks})
+
+        fields = {
+            "body_rev": rev, "content_length": total,
+            "body_bytes": note.get("body_bytes", 0) - span_bytes + sum(len(d["data"]) for d in docs),
+        }
+        if start == 0:
+            fields["excerpt"] = excerpt(text)
+        return fields, {}, rev
+
+    @staticmethod
+    def apply(doc: dict, set_fields: dict, unset_fields: dict) -> dict:
+        """store() result applied to an in-memory document (before insert_one)."""
+        doc.update(set_fields)
+        for key in unset_fields:
+            doc.pop(key, None)
+        return doc
+
+    @staticmethod
+    def prune(db, user_id: str, note_id: str, keep_rev: str = None):
+        """Drop every body revision of a note except `keep_rev` (and the chunks it shares)."""
+        query = {"user_id": user_id, "note_id": note_id}
+        revs = dict(query)
+        if keep_rev:
+            entries = _chunk_map(db, user_id, note_id, keep_rev)
+            if entries is None:
+                query["rev"] = {"$ne": keep_rev}
+            else:
+                query["_id"] = {"$nin": [e["id"] for e in entries]}
+            revs["rev"] = {"$ne": keep_rev}
+        db[_COLLECTION].delete_many(query)
+        db[_REVS].delete_many(revs)
+
+    @staticmethod
+    def discard(db, user_id: str, note_id: str, rev: str):
+        """Remove a revision written by store() / store_patch() whose note update was rejected."""
+        if rev:
+            db[_COLLECTION].delete_many({"user_id": user_id, "note_id": note_id, "rev": rev})
+            db[_REVS].delete_many({"user_id": user_id, "note_id": note_id, "rev": rev})
+
+    @staticmethod
+    def delete(db, user_id: str, note_ids: list):
+        if note_ids:
+            db[_COLLECTION].delete_many({"user_id": user_id, "note_id": {"$in": list(note_ids)}})
+            db[_REVS].delete_many({"user_id": user_id, "note_id": {"$in": list(note_ids)}})
+
+    # ──────────────────────────────────────────────
+    #  Read path
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def load(db, user_id: str, note: dict) -> str:
+        """Content of a note document (inline, or from its body revision)."""
+        if "content" in note:
+            return note["content"] or ""
+        return NoteBodyStore.load_many(db, user_id, [note]).get(note["note_id"], "")
+
+    @staticmethod
+    def load_many(db, user_id: str, notes: list) -> dict:
+        """{note_id: content} for several notes with one query."""
+        result = {n["note_id"]: n.get("content") or "" for n in notes if "content" in n}
+        revs = {n["note_id"]: n["body_rev"] for n in notes if "content" not in n and n.get("body_rev")}
+        if not revs:
+            return result
+
+        parts = {}
+        maps = db[_REVS].find(
+            {"user_id": user_id, "note_id": {"$in": list(revs)}, "rev": {"$in": list(revs.values())}},
+            {"_id": 0, "note_id": 1, "rev": 1, "chunks": 1},
+        )
+        for doc in maps:
+            if revs[doc["note_id"]] == doc["rev"]:
+                parts[doc["note_id"]] = _read_mapped(db, doc["chunks"])
+                del revs[doc["note_id"]]
+        cursor = db[_COLLECTION].find(
+            {"user_id": user_id, "note_id": {"$in": list(revs)}, "rev": {"$in": list(revs.values())}},
+            {"_id": 0, "note_id": 1, "rev": 1, "seq": 1, "start": 1, "codec": 1, "data": 1},
+        ) if revs else []
+        for chunk in cursor:
+            if revs[chunk["note_id"]] == chunk["rev"]:
+                parts.setdefault(chunk["note_id"], []).append(chunk)
+        for note_id, chunks in parts.items():
+            result[note_id] = _join(chunks)
+        return result
+
+    @staticmethod
+    def load_range(db, user_id: str, note: dict, offset: int, limit: int) -> tuple:
+        """
+        (text, total_length) for characters [offset, offset + limit) of a
+        note's content. Stored bodies read only the chunks in that range.
+        """
+        if "content" in note:
+            content = note["content"] or ""
+            return content[offset:offset + limit], len(content)
+        if not note.get("body_rev"):
+            return "", 0
+        total = note.get("content_length", 0)
+
+        chunks = NoteBodyStore._chunks_in(db, user_id, note, offset, offset + limit)
+        if not chunks:
+            return "", total
+        text = _join(chunks)
+        skip = offset - min(c["start"] for c in chunks)
+        return text[skip:skip + limit], total
+
+    @staticmethod
+    def load_span(db, user_id: str, note: dict, offset: int, end: int) -> tuple:
+        """
+        (text, span) of the whole chunks of a stored body that hold
+        characters [offset, end) — or touch them, so an insert at a chunk
+        edge is covered too. `span` is (start, end, stored_bytes) of that
+        text; hand it to store_patch() with the edited text.
+        """
+        chunks = NoteBodyStore._chunks_in(db, user_id, note, offset, end, touching=True)
+        if not chunks:
+            return "", (offset, offset, 0)
+        text = _join(chunks)
+        start = min(c["start"] for c in chunks)
+        return text, (start, start + len(text), sum(len(c["data"]) for c in chunks))
+
+    @staticmethod
+    def _chunks_in(db, user_id: str, note: dict, offset: int, end: int, touching: bool = False) -> list:
+        """Chunks of a note's body revision overlapping [offset, end) — or touching it."""
+        entries = _chunk_map(db, user_id, note["note_id"], note["body_rev"])
+        if entries is not None:
+            if touching:
+                return _read_mapped(db, [e for e in entries if e["start"] <= end and e["end"] >= offset])
+            return _read_mapped(db, [e for e in entries if e["start"] < end and e["end"] > offset])
+        lt, gt = ("$lte", "$gte") if touching else ("$lt", "$gt")
+        return list(db[_COLLECTION].find(
+            {"user_id": user_id, "note_id": note["note_id"], "rev": note["body_rev"],
+             "start": {lt: end}, "end": {gt: offset}},
+            {"_id": 0, "seq": 1, "start": 1, "codec": 1, "data": 1},
+        ))
+
+    # ──────────────────────────────────────────────
+    #  Migration
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def migrate(db, user_id: str = None) -> int:
+        """
+        Move inline `content` of existing notes into the store (setting
+        `excerpt` too). With the store disabled, only fills in `excerpt`
+        where it is missing. Returns notes updated.
+        """
+        query = {"content": {"$exists": True}}
+        if not NoteBodyStore.is_enabled():
+            query["excerpt"] = {"$exists": False}
+        if user_id:
+            query["user_id"] = user_id
+
+        moved = 0
+        for note in db.notes.find(query, {"_id": 1, "user_id": 1, "note_id": 1, "content": 1}):
+            set_fields, unset_fields, rev = NoteBodyStore.store(
+                db, note["user_id"], note["note_id"], note.get("content") or ""
+            )
+            update = {"$set": set_fields}
+            if unset_fields:
+                update["$unset"] = unset_fields
+            result = db.notes.update_one({"_id": note["_id"], "content": note.get("content")}, update)
+            if result.matched_count:
+                if rev is not None:
+                    NoteBodyStore.prune(db, note["user_id"], note["note_id"], rev)
+                moved += 1
+            else:
+                # edited meanwhile — the next run picks it up again
+                NoteBodyStore.discard(db, note["user_id"], note["note_id"], rev)
+        logger.info("Migrated %d notes (bodies → %s: %s)", moved, _COLLECTION, NoteBodyStore.is_enabled())
+        return moved
@@ -0,0 +1,292 @@
+"""
+core/occurrences.py — Materialized Recurring-Task Occurrences
+===============================================================
+Optional store that keeps the expanded instances of every recurring task
+in the `task_occurrences` collection for a rolling per-user horizon, so
+range reads become one indexed query instead of a Python expansion.
+
+Disabled by default — enable in configs/app_config.yaml:
+
+    performance:
+      occurrence_store:
+        enabled: true
+
+Rows are exactly what TaskService._generate_occurrences() would return
+(task_id = "<original_id>|YYYY-MM-DD"), so readers cannot tell the two
+paths apart. Each user's materialized range lives in `occurrence_horizons`.
+
+Write path (only the affected rows are touched):
+  create / update master   → sync_task()        (rows of that task only)
+  batch create             → insert_tasks()     (one insert_many)
+  completed_dates toggle   → set_status()       (one row + completed_dates)
+  delete master            → delete_task()
+  reorder                  → update_orders() / update_fields()
+  project archive / delete → update_fields()
+
+Read path:
+  TaskService.get_tasks() → read_range() → None if the window falls outside
+  the horizon (caller then expands in Python as before).
+
+Refill:
+  extend_horizon() slides the horizon forward as days pass; it runs lazily
+  on reads and periodically from start_refill_worker() (daemon thread).
+"""
+
+import logging
+import threading
+import time
+from datetime import date, timedelta
+
+from pymongo import ASCENDING, UpdateMany
+from pymongo.errors import BulkWriteError
+
+from core.config_loader import load_yaml
+
+logger = logging.getLogger(__name__)
+
+_COLLECTION = "task_occurrences"
+_HORIZONS   = "occurrence_horizons"
+
+# Fields that change which dates a task occurs on — any of them forces a resync
+_SHAPE_FIELDS = {"recurrence", "recurrence_pattern", "execution_day", "start_date", "end_date"}
+
+# Mongo equivalents of _is_expandable() — a missing field means "none"
+RECURRING_FILTER = {"recurrence": {"$nin": ["none", None]}}
+ONE_OFF_FILTER   = {"recurrence": {"$in": ["none", None]}}
+
+_refill_thread = None
+
+
+def _get_config() -> dict:
+    """Load occurrence store settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("occurrence_store", {}) or {}
+
+
+def _is_expandable(task: dict) -> bool:
+    """Same rule TaskService.get_tasks() uses to decide whether to expand."""
+    return task.get("recurrence", "none") != "none"
+
+
+def _expand(task: dict, start: date, end: date) -> list:
+    # Imported lazily — core/task.py imports this module at load time
+    from core.task import TaskService
+    return TaskService._generate_occurrences(task, start, end)
+
+
+class OccurrenceStore:
+
+    # ──────────────────────────────────────────────
+    #  Config & setup
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return bool(_get_config().get("enabled", False))
+
+    @staticmethod
+    def desired_horizon(today: date = None) -> tuple:
+        """Return the (start, end) range the store should cover today."""
+        cfg = _get_config()
+        today = today or date.today()
+        past = int(cfg.get("horizon_past_days", 30))
+        future = int(cfg.get("horizon_future_days", 120))
+        return today - timedelta(days=past), today + timedelta(days=future)
+
+    @staticmethod
+    def ensure_indexes(db):
+        coll = db[_COLLECTION]
+        coll.create_index([("user_id", ASCENDING), ("task_id", ASCENDING)], unique=True)
+        coll.create_index([("user_id", ASCENDING), ("execution_day", ASCENDING)])
+        coll.create_index([("user_id", ASCENDING), ("original_task_id", ASCENDING)])
+        db[_HORIZONS].create_index("user_id", unique=True)
+
+    # ──────────────────────────────────────────────
+    #  Horizon management
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def _get_horizon(db, user_id):
+        doc = db[_HORIZONS].find_one({"user_id": user_id}, {"_id": 0})
+        if not doc:
+            return None
+        return date.fromisoformat(doc["start"]), date.fromisoformat(doc["end"])
+
+    @staticmethod
+    def _save_horizon(db, user_id, start: date, end: date):
+        db[_HORIZONS].update_one(
+            {"user_id": user_id},
+            {"$set": {"start": start.isoformat(), "end": end.isoformat()}},
+            upsert=True,
+        )
+
+    @staticmethod
+    def _insert_rows(db, rows: list):
+        if not rows:
+            return
+        try:
+            db[_COLLECTION].insert_many(rows, ordered=False)
+        except BulkWriteError as exc:
+            # Duplicate keys mean a concurrent refill already wrote the row
+            non_dup = [e for e in exc.details.get("writeErrors", []) if e.get("code") != 11000]
+            if non_dup:
+                raise
+
+    @staticmethod
+    def _materialize(db, user_id, start: date, end: date):
+        """Expand every recurring master of the user into [start, end]."""
+        rows = []
+        for task in db.tasks.find({"user_id": user_id, **RECURRING_FILTER}, {"_id": 0}):
+            rows.extend(_expand(task, start, end))
+        OccurrenceStore._insert_rows(db, rows)
+
+    @staticmethod
+    def extend_horizon(db, user_id, today: date = None):
+        """
+        Make sure the user's horizon covers desired_horizon().
+        Builds it on first use, then only materializes the newly
+        uncovered days and trims rows that fell off the past edge.
+        """
+        want_start, want_end = OccurrenceStore.desired_horizon(today)
+        current = OccurrenceStore._get_horizon(db, user_id)
+
+        if current is None:
+            OccurrenceStore._materialize(db, user_id, want_start, want_end)
+            OccurrenceStore._save_horizon(db, user_id, want_start, want_end)
+            return want_start, want_end
+
+        start, end = current
+        if want_end > end:
+            OccurrenceStore._materialize(db, user_id, end + timedelta(days=1), want_end)
+            end = want_end
+        if want_start > start:
+            db[_COLLECTION].delete_many({
+                "user_id": user_id,
+                "execution_day": {"$lt": want_start.isoformat()},
+            })
+            start = want_start
+        if (start, end) != current:
+            OccurrenceStore._save_horizon(db, user_id, start, end)
+        return start, end
+
+    # ──────────────────────────────────────────────
+    #  Read path
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def read_range(db, user_id, query: dict, window_start: date, window_end: date, status=None):
+        """
+        Return materialized instances matching `query` in the window,
+        sorted like the Python expansion (master order, then date).
+        Returns None when the window is not fully covered by the horizon.
+        """
+        start, end = OccurrenceStore.extend_horizon(db, user_id)
+        if window_start < start or window_end > end:
+            return None
+
+        row_query = {
+            **query,
+            "execution_day": {"$gte": window_start.isoformat(), "$lte": window_end.isoformat()},
+        }
+        if status:
+            row_query["status"] = status
+        cursor = db[_COLLECTION].find(row_query, {"_id": 0})
+        return list(cursor.sort([("order", ASCENDING), ("original_task_id", ASCENDING), ("execution_day", ASCENDING)]))
+
+    # ──────────────────────────────────────────────
+    #  Write path — incremental invalidation
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def sync_task(db, user_id, task: dict):
+        """Replace the rows of one master with a fresh expansion over the horizon."""
+        horizon = OccurrenceStore._get_horizon(db, user_id)
+        if horizon is None:
+            return  # nothing materialized yet — first read builds everything
+        db[_COLLECTION].delete_many({"user_id": user_id, "original_task_id": task["task_id"]})
+        if _is_expandable(task):
+            OccurrenceStore._insert_rows(db, _expand(task, *horizon))
+
+    @staticmethod
+    def insert_tasks(db, user_id, tasks: list):
+        """Materialize rows for newly created masters in one insert_many."""
+        horizon = OccurrenceStore._get_horizon(db, user_id)
+        if horizon is None:
+            return
+        rows = []
+        for task in tasks:
+            if _is_expandable(task):
+                rows.extend(_expand(task, *horizon))
+        OccurrenceStore._insert_rows(db, rows)
+
+    @staticmethod
+    def needs_resync(fields) -> bool:
+        """True if updating `fields` can change which dates a task occurs on."""
+        return bool(_SHAPE_FIELDS.intersection(fields))
+
+    @staticmethod
+    def set_status(db, user_id, tid: str, date_str: str, completed_dates: list):
+        """Apply a completed_dates toggle to one row (and the copied list on the rest)."""
+        coll = db[_COLLECTION]
+        coll.update_many(
+            {"user_id": user_id, "original_task_id": tid},
+            {"$set": {"completed_dates": completed_dates}},
+        )
+        coll.update_one(
+            {"user_id": user_id, "task_id": f"{tid}|{date_str}"},
+            {"$set": {"status": "completed" if date_str in completed_dates else "pending"}},
+        )
+
+    @staticmethod
+    def update_fields(db, user_id, match: dict, fields: dict):
+        """Copy non-shape master field changes (order, project, archive...) onto rows."""
+        db[_COLLECTION].update_many({"user_id": user_id, **match}, {"$set": fields})
+
+    @staticmethod
+    def update_orders(db, user_id, orders: dict):
+        """Copy {task_id: order} changes from a reorder onto rows in one bulk_write."""
+        if not orders:
+            return
+        db[_COLLECTION].bulk_write([
+            UpdateMany({"user_id": user_id, "original_task_id": tid}, {"$set": {"order": order}})
+            for tid, order in orders.items()
+        ], ordered=False)
+
+    @staticmethod
+    def delete_task(db, user_id, tid: str):
+        db[_COLLECTION].delete_many({"user_id": user_id, "original_task_id": tid})
+
+
+# ──────────────────────────────────────────────
+#  Background refill
+# ──────────────────────────────────────────────
+
+def _refill_loop(db, interval: int):
+    while True:
+        time.sleep(interval)
+        want_start, want_end = OccurrenceStore.desired_horizon()
+        try:
+            stale = db[_HORIZONS].find(
+                {"$or": [{"end": {"$lt": want_end.isoformat()}},
+                         {"start": {"$lt": want_start.isoformat()}}]},
+                {"_id": 0, "user_id": 1},
+            )
+            for doc in stale:
+                OccurrenceStore.extend_horizon(db, doc["user_id"])
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Occurrence refill failed: %s", exc)
+
+
+def start_refill_worker(db):
+    """
+    Start the daemon thread that slides every user's horizon forward.
+    No-op when the store is disabled or the worker is already running.
+    """
+    global _refill_thread
+    if not OccurrenceStore.is_enabled() or _refill_thread is not None:
+        return
+    interval = int(_get_config().get("refill_interval_sec", 3600))
+    _refill_thread = threading.Thread(
+        target=_refill_loop, args=(db, interval), name="occurrence-refill", daemon=True
+    )
+    _refill_thread.start()
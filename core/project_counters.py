@@ -0,0 +1,202 @@
+"""
+core/project_counters.py — Denormalized Per-Project Task Counters
+===================================================================
+Keeps task_count / done_count / archived_count on each project document
+so ProjectService.get_projects() is a single indexed read.
+
+Stored fields (schema type "counter" in configs/schemas.yaml):
+  task_count      → all tasks in the project
+  done_count      → one-off tasks with status "completed"
+  archived_count  → tasks with isArchived = true
+  done_by_day     → {"YYYY-MM-DD": n} recurring completions per date
+
+Recurring tasks are "done" on a given day, so their completions are kept
+per date (today and later only) and read back as
+done_count + done_by_day[today]. Days that have passed are dropped from
+the map whenever a write changes it (and by repair()).
+
+Every task write calls apply_change(old, new): the old task's contribution
+is subtracted and the new one added with one atomic $inc per project.
+Batch inserts use apply_changes() (one bulk_write for all projects).
+Projects created before the counters existed have no task_count field;
+writes skip them ($exists guard) and reads fall back to aggregation until
+repair() (python manage.py repair-counters) initializes them.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("task_count", "done_count", "archived_count")
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def _is_recurring(task: dict) -> bool:
+    return task.get("recurrence", "none") != "none"
+
+
+def _prune_days(today: str) -> list:
+    """Pipeline update keeping only done_by_day entries from `today` on."""
+    return [{"$set": {"done_by_day": {"$arrayToObject": {"$filter": {
+        "input": {"$objectToArray": {"$ifNull": ["$done_by_day", {}]}},
+        "cond": {"$gte": ["$$this.k", today]},
+    }}}}}]
+
+
+class ProjectCounters:
+
+    @staticmethod
+    def contribution(task: dict, today: str = None) -> dict:
+        """Return the {counter_field: n} a single task adds to its project."""
+        today = today or _today()
+        contrib = {"task_count": 1}
+        if task.get("isArchived"):
+            contrib["archived_count"] = 1
+        if _is_recurring(task):
+            for day in set(task.get("completed_dates") or []):
+                if day >= today:
+                    contrib[f"done_by_day.{day}"] = 1
+        elif task.get("status") == "completed":
+            contrib["done_count"] = 1
+        return contrib
+
+    @staticmethod
+    def apply_change(db, user_id, old_task: dict = None, new_task: dict = None):
+        """
+        Move a task's contribution from old_task's project to new_task's.
+        Pass old_task=None for inserts and new_task=None for deletes.
+        Issues one $inc per affected project (none if nothing changed).
+        """
+        ProjectCounters.apply_changes(db, user_id, [(old_task, new_task)])
+
+    @staticmethod
+    def apply_changes(db, user_id, changes: list):
+        """
+        Batch form of apply_change(): `changes` is a list of (old_task, new_task)
+        pairs. Deltas are summed per project and sent in one bulk_write.
+        """
+        today = _today()
+        deltas = defaultdict(lambda: defaultdict(int))
+        for old_task, new_task in changes:
+            for task, sign in ((old_task, -1), (new_task, 1)):
+                if not task:
+                    continue
+                pid = task.get("project_id")
+                for field, n in ProjectCounters.contribution(task, today).items():
+                    deltas[pid][field] += sign * n
+
+        updates = []
+        for pid, fields in deltas.items():
+            inc = {f: n for f, n in fields.items() if n}
+            if inc:
+                match = {"user_id": user_id, "project_id": pid, "task_count": {"$exists": True}}
+                if any(f.startswith("done_by_day.") for f in inc):
+                    # A new day key goes in — drop the ones that have passed
+                    updates.append((match, _prune_days(today)))
+                updates.append((match, {"$inc": inc}))
+        if len(updates) == 1:
+            db.projects.update_one(*updates[0])
+        elif updates:
+            db.projects.bulk_write([UpdateOne(f, u) for f, u in updates], ordered=False)
+
+    @staticmethod
+    def add_totals(db, user_id, pid, project: dict):
+        """Add a whole project's counters to another project (e.g. on reassignment)."""
+        if "task_count" not in project:
+            return
+        today = _today()
+        inc = {f: project.get(f, 0) for f in COUNTER_FIELDS if project.get(f)}
+        for day, n in (project.get("done_by_day") or {}).items():
+            if day >= today and n:
+                inc[f"done_by_day.{day}"] = n
+        if inc:
+            db.projects.update_one(
+                {"user_id": user_id, "project_id": pid, "task_count": {"$exists": True}},
+                {"$inc": inc},
+            )
+
+    @staticmethod
+    def set_archived(db, user_id, pid, archived: bool):
+        """Archive cascade: every task in the project now shares the same flag."""
+        db.projects.update_one(
+            {"user_id": user_id, "project_id": pid, "task_count": {"$exists": True}},
+            [{"$set": {"archived_count": "$task_count" if archived else 0}}],
+        )
+
+    @staticmethod
+    def read(project: dict, today: str = None):
+        """
+        Return (task_count, done_count) from a project document and strip
+        the internal done_by_day map. Returns None if never initialized.
+        """
+        by_day = project.pop("done_by_day", None) or {}
+        if "task_count" not in project:
+            return None
+        today = today or _today()
+        return project["task_count"], project.get("done_count", 0) + by_day.get(today, 0)
+
+    # ──────────────────────────────────────────────
+    #  Repair job
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def repair(db, user_id: str = None) -> int:
+        """
+        Recompute every project's counters from the tasks collection in bulk
+        (two aggregations + one bulk_write). Optionally limited to one user.
+        Returns the number of project documents rewritten.
+        """
+        today = _today()
+        match = {"user_id": user_id} if user_id else {}
+
+        totals = defaultdict(lambda: {f: 0 for f in COUNTER_FIELDS})
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "project_id": "$project_id"},
+                "task_count": {"$sum": 1},
+                "archived_count": {"$sum": {"$cond": [{"$eq": ["$isArchived", True]}, 1, 0]}},
+                "done_count": {"$sum": {"$cond": [
+                    {"$and": [
+                        {"$eq": [{"$ifNull": ["$recurrence", "none"]}, "none"]},
+                        {"$eq": ["$status", "completed"]},
+                    ]}, 1, 0,
+                ]}},
+            }},
+        ]
+        for row in db.tasks.aggregate(pipeline):
+            key = (row["_id"]["user_id"], row["_id"]["project_id"])
+            totals[key].update({f: row[f] for f in COUNTER_FIELDS})
+
+        by_day = defaultdict(dict)
+        pipeline = [
+            {"$match": {**match, "recurrence": {"$nin": ["none", None]}}},
+            {"$unwind": "$completed_dates"},
+            {"$match": {"completed_dates": {"$gte": today}}},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "project_id": "$project_id", "day": "$completed_dates"},
+                "n": {"$sum": 1},
+            }},
+        ]
+        for row in db.tasks.aggregate(pipeline):
+            key = (row["_id"]["user_id"], row["_id"]["project_id"])
+            by_day[key][row["_id"]["day"]] = row["n"]
+
+        ops = []
+        for project in db.projects.find(match, {"_id": 0, "user_id": 1, "project_id": 1}):
+            key = (project["user_id"], project["project_id"])
+            ops.append(UpdateOne(
+                {"user_id": key[0], "project_id": key[1]},
+                {"$set": {**totals[key], "done_by_day": by_day.get(key, {})}},
+            ))
+        if ops:
+            db.projects.bulk_write(ops, ordered=False)
+        logger.info("Repaired counters on %d projects", len(ops))
+        return len(ops)
@@ -0,0 +1,192 @@
+"""
+core/provider_health.py — Circuit Breaker for the AI Provider Waterfall
+=========================================================================
+Without it every chat walks the provider list in order, so while Gemini
+is down each message first burns Gemini's whole retry budget before the
+fallback answers. Each provider now has a breaker fed with the outcome
+and latency of its calls over a rolling window (window_sec):
+
+  closed    → calls go through. Opens after failure_threshold consecutive
+              failures, or once the window holds min_calls calls and
+              error_rate of them failed / slow_rate were slower than
+              slow_call_sec.
+  open      → the provider is skipped without a call for open_sec
+              (doubled after each failed probe, up to max_open_sec).
+  half_open → one request probes the provider; success closes the
+              breaker, failure opens it again.
+
+So an outage costs one failed call, not one per message. State is per
+process (like the write buffer) and is shown in GET /api/status.
+
+Settings: performance.ai_circuit_breaker in configs/app_config.yaml.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from core.config_loader import load_yaml
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_breakers = {}                # provider → state dict (see _new_state)
+_lock = threading.Lock()
+
+
+def _get_config() -> dict:
+    """Load circuit breaker settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("ai_circuit_breaker", {}) or {}
+
+
+def _new_state() -> dict:
+    return {
+        "state": CLOSED,
+        "calls": deque(),     # (finished_at, ok, latency_sec)
+        "consecutive_failures": 0,
+        "open_until": 0.0,
+        "open_sec": 0.0,
+        "probe_started": None,
+        "last_error": None,
+    }
+
+
+def _state(provider: str) -> dict:
+    return _breakers.setdefault(provider, _new_state())
+
+
+def _trim(b: dict, now: float, cfg: dict):
+    window = float(cfg.get("window_sec", 60))
+    while b["calls"] and now - b["calls"][0][0] > window:
+        b["calls"].popleft()
+
+
+def _percentile(values: list, pct: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+class ProviderBreaker:
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return bool(_get_config().get("enabled", False))
+
+    @staticmethod
+    def allow(provider: str) -> bool:
+        """
+        Whether a call to `provider` may go out now. In half_open only one
+        caller gets True (the probe) — it must report back via record().
+        """
+        if not ProviderBreaker.is_enabled():
+            return True
+        cfg = _get_config()
+        now = time.monotonic()
+        with _lock:
+            b = _state(provider)
+            if b["state"] == CLOSED:
+                return True
+            if b["state"] == OPEN:
+                if now < b["open_until"]:
+                    return False
+                b["state"] = HALF_OPEN
+                b["probe_started"] = None
+            # half_open: one probe at a time (a probe that never reported expires)
+            probe_timeout = float(cfg.get("probe_timeout_sec", 90))
+            if b["probe_started"] is not None and now - b["probe_started"] < probe_timeout:
+                return False
+            b["probe_started"] = now
+            return True
+
+    @staticmethod
+    def record(provider: str, ok: bool, latency: float, error: str = None):
+        """Outcome of one call (latency in seconds)."""
+        if not ProviderBreaker.is_enabled():
+            return
+        cfg = _get_config()
+        now = time.monotonic()
+        with _lock:
+            b = _state(provider)
+            b["calls"].append((now, ok, latency))
+            _trim(b, now, cfg)
+            if ok:
+                b["consecutive_failures"] = 0
+            else:
+                b["consecutive_failures"] += 1
+                b["last_error"] = error
+
+            if b["state"] == HALF_OPEN:
+                if ok:
+                    logger.info("AI provider %s recovered — breaker closed", provider)
+                    b.update(state=CLOSED, calls=deque([(now, ok, latency)]), open_sec=0.0, probe_started=None)
+                else:
+                    ProviderBreaker._open(provider, b, now, cfg, backoff=True)
+            elif b["state"] == CLOSED and ProviderBreaker._should_open(b, cfg):
+                ProviderBreaker._open(provider, b, now, cfg, backoff=False)
+
+    @staticmethod
+    def _should_open(b: dict, cfg: dict) -> bool:
+        if b["consecutive_failures"] >= int(cfg.get("failure_threshold", 3)):
+            return True
+        calls = b["calls"]
+        if len(calls) < int(cfg.get("min_calls", 4)):
+            return False
+        failed = sum(1 for _, ok, _ in calls if not ok)
+        slow_call = float(cfg.get("slow_call_sec", 15))
+        slow = sum(1 for _, _, latency in calls if latency >= slow_call)
+        return (failed / len(calls) >= float(cfg.get("error_rate", 0.5))
+                or slow / len(calls) >= float(cfg.get("slow_rate", 0.8)))
+
+    @staticmethod
+    def _open(provider: str, b: dict, now: float, cfg: dict, backoff: bool):
+        base = float(cfg.get("open_sec", 30))
+        open_sec = min(b["open_sec"] * 2, float(cfg.get("max_open_sec", 300))) if backoff and b["open_sec"] else base
+        b.update(state=OPEN, open_until=now + open_sec, open_sec=open_sec, probe_started=None)
+        logger.warning("AI provider %s unhealthy — breaker open for %.0fs", provider, open_sec)
+
+    @staticmethod
+    def latency_percentile(provider: str, pct: float):
+        """pct-th percentile (seconds) of successful call latency in the window, or None."""
+        with _lock:
+            b = _breakers.get(provider)
+            if not b:
+                return None
+            _trim(b, time.monotonic(), _get_config())
+            return _percentile([latency for _, ok, latency in b["calls"] if ok], pct)
+
+    @staticmethod
+    def snapshot() -> dict:
+        """{provider: {state, calls, error_rate, p50_ms, p95_ms, retry_in_sec, ...}} for /api/status."""
+        cfg = _get_config()
+        now = time.monotonic()
+        out = {}
+        with _lock:
+            for provider, b in _breakers.items():
+                _trim(b, now, cfg)
+                calls = list(b["calls"])
+                latencies = [latency for _, ok, latency in calls if ok]
+                p50, p95 = _percentile(latencies, 50), _percentile(latencies, 95)
+                out[provider] = {
+                    "state":                b["state"],
+                    "calls":                len(calls),
+                    "error_rate":           round(sum(1 for c in calls if not c[1]) / len(calls), 3) if calls else 0.0,
+                    "p50_ms":               round(p50 * 1000) if p50 is not None else None,
+                    "p95_ms":               round(p95 * 1000) if p95 is not None else None,
+                    "consecutive_failures": b["consecutive_failures"],
+                    "retry_in_sec":         round(max(b["open_until"] - now, 0), 1) if b["state"] == OPEN else 0,
+                    "last_error":           b["last_error"],
+                }
+        return out
+
+    @staticmethod
+    def reset(provider: str = None):
+        with _lock:
+            if provider:
+                _breakers.pop(provider, None)
+            else:
+                _breakers.clear()
@@ -0,0 +1,234 @@
+"""
+core/quick_notes.py — Append-Only QuickNote Storage
+=====================================================
+Quick captures (POST /api/notes/quick, AI QUICK_NOTE) are stored one
+document per entry instead of being concatenated into QuickNote.txt, so a
+capture costs O(entry) no matter how large the QuickNote has grown.
+
+Collections:
+  quick_note_entries   → {entry_id, user_id, content, created_at}   (live)
+  quick_note_segments  → {segment_id, user_id, start, end, count,
+                          entries: [{entry_id, content, created_at}]}
+                         (compact() rolls entries older than
+                          compact_after_days into bounded segments)
+
+Entries and segments are the only copy of the captures — QuickNote.txt
+holds just what was typed into it in the editor, which shows the captures
+below it, page by page.
+
+Readers (nothing is removed on read):
+  page()    → newest first, keyset-paginated across entries then segments
+  history() → oldest first, lazily, for the legacy whole-text endpoint
+              (old "---\\n[time] text" format, see format_entry)
+
+Settings: performance.quick_notes in configs/app_config.yaml.
+Maintenance: python manage.py compact-quick-notes [--user USER_ID]
+"""
+
+import base64
+import json
+import logging
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from pymongo import ASCENDING, DESCENDING
+
+from core.config_loader import load_yaml
+
+logger = logging.getLogger(__name__)
+
+_ENTRIES  = "quick_note_entries"
+_SEGMENTS = "quick_note_segments"
+
+# Same separator and timestamp the old in-place append used
+ENTRY_SEPARATOR = "\n\n---\n"
+_TS_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def _get_config() -> dict:
+    """Load quick note settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("quick_notes", {}) or {}
+
+
+def format_entry(entry: dict) -> str:
+    """Render one entry the way it used to appear inside QuickNote.txt."""
+    return f"[{entry['created_at'].strftime(_TS_FORMAT)}] {entry['content']}"
+
+
+def _encode_cursor(entry: dict) -> str:
+    raw = json.dumps([entry["created_at"].isoformat(), entry["entry_id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    """Returns (created_at, entry_id) or None if the cursor is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, entry_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(entry_id)
+    except (ValueError, TypeError):
+        return None
+
+
+class QuickNoteStore:
+
+    @staticmethod
+    def ensure_indexes(db):
+        db[_ENTRIES].create_index([("user_id", ASCENDING), ("created_at", DESCENDING), ("entry_id", DESCENDING)])
+        db[_SEGMENTS].create_index([("user_id", ASCENDING), ("end", DESCENDING)])
+
+    @staticmethod
+    def append(db, user_id: str, content: str) -> dict:
+        """Store one capture (a single insert — the QuickNote itself is not read)."""
+        entry = {
+            "entry_id": str(uuid4()),
+            "user_id": user_id,
+            "content": content,
+            "created_at": datetime.now(),
+        }
+        db[_ENTRIES].insert_one(entry)
+        entry.pop("_id", None)
+        return entry
+
+    # ──────────────────────────────────────────────
+    #  Read path
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def page(db, user_id: str, limit: int = None, cursor: str = None):
+        """
+        Newest-first page of captures. Live entries are always newer than
+        compacted ones, so the page continues into segments only once the
+        live entries run out.
+
+        Returns ({"items": [...], "next_cursor": str|None}, error).
+        """
+        cfg = _get_config()
+        max_limit = int(cfg.get("max_page_size", 100))
+        limit = limit or int(cfg.get("default_page_size", 20))
+        if limit < 1 or limit > max_limit:
+            return None, f"limit must be between 1 and {max_limit}"
+
+        before = None
+        if cursor:
+            before = _decode_cursor(cursor)
+            if before is None:
+                return None, "Invalid cursor"
+
+        query = {"user_id": user_id}
+        if before:
+            query["$or"] = [
+                {"created_at": {"$lt": before[0]}},
+                {"created_at": before[0], "entry_id": {"$lt": before[1]}},
+            ]
+        items = list(
+            db[_ENTRIES].find(query, {"_id": 0, "user_id": 0, "claim": 0, "claimed_at": 0})
+            .sort([("created_at", DESCENDING), ("entry_id", DESCENDING)])
+            .limit(limit + 1)
+        )
+
+        if len(items) <= limit:
+            # An entry being compacted may briefly be in both collections
+            seen = {e["entry_id"] for e in items}
+            seg_query = {"user_id": user_id}
+            if before:
+                seg_query["start"] = {"$lte": before[0]}
+            for segment in db[_SEGMENTS].find(seg_query, {"_id": 0, "entries": 1}).sort("end", DESCENDING):
+                for entry in reversed(segment["entries"]):
+                    if entry["entry_id"] in seen or (before and (entry["created_at"], entry["entry_id"]) >= before):
+                        continue
+                    items.append(entry)
+                if len(items) > limit:
+                    break
+
+        next_cursor = _encode_cursor(items[limit - 1]) if len(items) > limit else None
+        return {"items": items[:limit], "next_cursor": next_cursor}, None
+
+    @staticmethod
+    def history(db, user_id: str):
+        """
+        Every capture, oldest first (segments, then live entries) — read
+        lazily, nothing is claimed or removed. For whole-document readers.
+        """
+        seen = set()
+        for segment in db[_SEGMENTS].find({"user_id": user_id}, {"_id": 0, "entries": 1}).sort("start", ASCENDING):
+            for entry in segment["entries"]:
+                seen.add(entry["entry_id"])
+                yield entry
+        cursor = (db[_ENTRIES].find({"user_id": user_id}, {"_id": 0, "user_id": 0, "claim": 0, "claimed_at": 0})
+                  .sort([("created_at", ASCENDING), ("entry_id", ASCENDING)]))
+        # An entry being compacted may briefly be in both collections
+        yield from (entry for entry in cursor if entry["entry_id"] not in seen)
+
+    @staticmethod
+    def purge(db, user_id: str):
+        """Drop every capture (the QuickNote itself was deleted)."""
+        for coll_name in (_SEGMENTS, _ENTRIES):
+            db[coll_name].delete_many({"user_id": user_id})
+
+    # ──────────────────────────────────────────────
+    #  Compaction
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def compact(db, user_id: str = None, now: datetime = None) -> int:
+        """
+        Roll live entries older than compact_after_days into segments of at
+        most segment_max_entries. Returns the number of entries compacted.
+
+        The entries are claimed first (one update), so two runs never move
+        the same entry; a run that died midway is taken over after
+        claim_timeout_sec, skipping entries it already copied.
+        """
+        cfg = _get_config()
+        now = now or datetime.now()
+        cutoff = now - timedelta(days=int(cfg.get("compact_after_days", 7)))
+        stale = now - timedelta(seconds=int(cfg.get("claim_timeout_sec", 300)))
+        per_segment = int(cfg.get("segment_max_entries", 200))
+
+        query = {"created_at": {"$lt": cutoff}}
+        if user_id:
+            query["user_id"] = user_id
+        users = [user_id] if user_id else db[_ENTRIES].distinct("user_id", query)
+
+        compacted = 0
+        for uid in users:
+            claim = str(uuid4())
+            db[_ENTRIES].update_many(
+                {**query, "user_id": uid, "$or": [{"claim": {"$exists": False}}, {"claimed_at": {"$lt": stale}}]},
+                {"$set": {"claim": claim, "claimed_at": now}},
+            )
+            entries = list(
+                db[_ENTRIES].find({"user_id": uid, "claim": claim},
+                                  {"_id": 0, "user_id": 0, "claim": 0, "claimed_at": 0})
+                .sort([("created_at", ASCENDING), ("entry_id", ASCENDING)])
+            )
+            if not entries:
+                continue
+            copied = {
+                e["entry_id"]
+                for seg in db[_SEGMENTS].find(
+                    {"user_id": uid, "entries.entry_id": {"$in": [e["entry_id"] for e in entries]}},
+                    {"_id": 0, "entries.entry_id": 1},
+                )
+                for e in seg["entries"]
+            }
+            fresh = [e for e in entries if e["entry_id"] not in copied]
+            segments = [
+                {
+                    "segment_id": str(uuid4()),
+                    "user_id": uid,
+                    "start": chunk[0]["created_at"],
+                    "end": chunk[-1]["created_at"],
+                    "count": len(chunk),
+                    "entries": chunk,
+                }
+                for chunk in (fresh[i:i + per_segment] for i in range(0, len(fresh), per_segment))
+            ]
+            if segments:
+                db[_SEGMENTS].insert_many(segments)
+            db[_ENTRIES].delete_many({"user_id": uid, "claim": claim})
+            compacted += len(entries)
+        logger.info("Compacted %d quick note entries", compacted)
+        return compacted
@@ -0,0 +1,140 @@
+"""
+core/ranking.py — Fractional Ordering Helpers
+===============================================
+Lets a drag-and-drop "move X between A and B" write only X.
+
+The existing numeric `order` field doubles as a fractional rank: moving an
+item gives it the midpoint of its new neighbours' orders, so nothing else
+has to be renumbered. Every split halves the gap; once gaps get too small
+the whole list is renumbered to 0..N-1 in one bulk_write (rebalance),
+normally in a background thread.
+
+Usage:
+    from core.ranking import move_between, rebalance
+
+    order, error = move_between(db.tasks, {"user_id": uid}, "task_id", tid,
+                                prev_id, next_id,
+                                rebalance_fn=lambda: rebalance(db.tasks, {"user_id": uid}, "task_id"))
+"""
+
+import logging
+import threading
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Below this gap a background rebalance is scheduled (float doubles give ~50 splits of 1.0)
+MIN_GAP = 1e-6
+
+_running = set()
+_running_lock = threading.Lock()
+
+
+def rank_between(prev_order=None, next_order=None):
+    """
+    Return an order value strictly between prev_order and next_order.
+    Either side may be None (move to the top / bottom).
+    Returns None if the two values are too close to split (rebalance first).
+    """
+    if prev_order is None and next_order is None:
+        return 0
+    if prev_order is None:
+        return next_order - 1
+    if next_order is None:
+        return prev_order + 1
+    mid = (prev_order + next_order) / 2
+    if not prev_order < mid < next_order:
+        return None
+    return mid
+
+
+def needs_rebalance(prev_order=None, next_order=None) -> bool:
+    """True when the gap between two neighbours is getting too dense."""
+    if prev_order is None or next_order is None:
+        return False
+    return (next_order - prev_order) < MIN_GAP
+
+
+def rebalance(collection, query: dict, id_field: str) -> dict:
+    """
+    Renumber every document matching `query` to 0..N-1, keeping the current
+    (order, id) sequence. Only documents whose order changes are written,
+    in a single bulk_write. Returns {id: new_order} for the changed ones.
+    """
+    changes = {}
+    cursor = collection.find(query, {"_id": 0, id_field: 1, "order": 1})
+    for idx, doc in enumerate(cursor.sort([("order", 1), (id_field, 1)])):
+        if doc.get("order") != idx:
+            changes[doc[id_field]] = idx
+    if changes:
+        collection.bulk_write(
+            [UpdateOne({**query, id_field: key}, {"$set": {"order": val}}) for key, val in changes.items()],
+            ordered=False,
+        )
+    return changes
+
+
+def run_in_background(key: str, fn, *args):
+    """
+    Run fn(*args) in a daemon thread, at most once at a time per key.
+    Used to rebalance a list without delaying the request that noticed it.
+    """
+    with _running_lock:
+        if key in _running:
+            return
+        _running.add(key)
+
+    def _target():
+        try:
+            fn(*args)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Background rebalance %s failed: %s", key, exc)
+        finally:
+            with _running_lock:
+                _running.discard(key)
+
+    threading.Thread(target=_target, name=f"rebalance-{key}", daemon=True).start()
+
+
+def move_between(collection, scope: dict, id_field: str, item_id: str,
+                 prev_id: str = None, next_id: str = None, rebalance_fn=None):
+    """
+    Give `item_id` an order between `prev_id` (above) and `next_id` (below)
+    and write only that document. If the neighbours are too close to split
+    (or tied), rebalance_fn() renumbers the list first; if they are merely
+    getting dense it is scheduled in the background. Neighbours in the wrong
+    order (e.g. the client list was sorted by another field) are rejected
+    without touching the list.
+
+    Returns (new_order, error).
+    """
+    def _neighbour_orders():
+        ids = [i for i in (prev_id, next_id) if i]
+        if not ids:
+            return {}
+        cursor = collection.find({**scope, id_field: {"$in": ids}}, {"_id": 0, id_field: 1, "order": 1})
+        return {d[id_field]: d.get("order") or 0 for d in cursor}
+
+    found = _neighbour_orders()
+    if any(i and i not in found for i in (prev_id, next_id)):
+        return None, "Neighbour not found"
+    if prev_id and next_id and found[prev_id] > found[next_id]:
+        return None, "prev_id must come before next_id"
+
+    order = rank_between(found.get(prev_id), found.get(next_id))
+    if order is None and rebalance_fn is not None:
+        rebalance_fn()
+        found = _neighbour_orders()
+        order = rank_between(found.get(prev_id), found.get(next_id))
+    if order is None:
+        return None, "prev_id must come before next_id"
+
+    result = collection.update_one({**scope, id_field: item_id}, {"$set": {"order": order}})
+    if result.matched_count == 0:
+        return None, "Not found"
+
+    if rebalance_fn is not None and needs_rebalance(found.get(prev_id), found.get(next_id)):
+        key = f"{collection.name}:" + "|".join(f"{k}={v}" for k, v in sorted(scope.items()))
+        run_in_background(key, rebalance_fn)
+    return order, None
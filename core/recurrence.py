@@ -0,0 +1,138 @@
+"""
+core/recurrence.py — Recurrence Expansion Engine
+==================================================
+Computes the dates on which a recurring task occurs inside a window.
+
+Instead of walking every calendar day and re-checking the rule, each rule
+jumps straight from one matching date to the next (closed-form stepping):
+
+    daily    → every day                        (step 1 day)
+    weekly   → each weekday in the pattern      (step 7 days per weekday)
+    monthly  → same day-of-month as base date   (step 1 month)
+    yearly   → same month/day as base date      (step 1 year)
+    custom   → every N days from the base date  (step N days)
+
+Months/years that do not contain the base day (e.g. the 31st, Feb 29)
+are skipped — same behaviour as the old day-by-day loop.
+
+Usage:
+    from core.recurrence import occurrence_dates
+
+    dates = occurrence_dates(task, window_start, window_end)
+"""
+
+from datetime import date, datetime, timedelta
+
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_WEEKDAY_INDEX = {name: idx for idx, name in enumerate(WEEKDAY_NAMES)}
+
+
+def parse_base_date(task: dict, fallback: date) -> date:
+    """Return the task's anchor date (execution_day or start_date) or `fallback`."""
+    base_date_str = task.get("execution_day") or task.get("start_date")
+    if not base_date_str:
+        return fallback
+    try:
+        return datetime.strptime(base_date_str, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return fallback
+
+
+def _custom_interval(pattern) -> int:
+    """Parse the custom interval (days). Invalid or non-positive values mean 1."""
+    try:
+        interval = int(pattern or 1)
+    except (TypeError, ValueError):
+        return 1
+    return interval if interval > 0 else 1
+
+
+def _add_months(year: int, month: int, n: int) -> tuple:
+    """Return (year, month) shifted by n months."""
+    total = year * 12 + (month - 1) + n
+    return total // 12, total % 12 + 1
+
+
+def _daily(first: date, last: date) -> list:
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def _every_n_days(base: date, first: date, last: date, interval: int) -> list:
+    # Jump to the first multiple of `interval` (counted from base) that is >= first
+    offset = (first - base).days % interval
+    current = first if offset == 0 else first + timedelta(days=interval - offset)
+    step = timedelta(days=interval)
+    dates = []
+    while current <= last:
+        dates.append(current)
+        current += step
+    return dates
+
+
+def _weekly(pattern, first: date, last: date) -> list:
+    if not isinstance(pattern, list):
+        return []
+    weekdays = {_WEEKDAY_INDEX[d] for d in pattern if d in _WEEKDAY_INDEX}
+    step = timedelta(days=7)
+    dates = []
+    for wd in weekdays:
+        current = first + timedelta(days=(wd - first.weekday()) % 7)
+        while current <= last:
+            dates.append(current)
+            current += step
+    dates.sort()
+    return dates
+
+
+def _monthly(base: date, first: date, last: date) -> list:
+    dates = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        try:
+            candidate = date(year, month, base.day)
+        except ValueError:
+            candidate = None  # month has no such day (e.g. 31st, Feb 30)
+        if candidate and first <= candidate <= last:
+            dates.append(candidate)
+        year, month = _add_months(year, month, 1)
+    return dates
+
+
+def _yearly(base: date, first: date, last: date) -> list:
+    dates = []
+    for year in range(first.year, last.year + 1):
+        try:
+            candidate = date(year, base.month, base.day)
+        except ValueError:
+            continue  # Feb 29 in a non-leap year
+        if first <= candidate <= last:
+            dates.append(candidate)
+    return dates
+
+
+def occurrence_dates(task: dict, window_start: date, window_end: date) -> list:
+    """
+    Return the sorted list of dates on which `task` recurs in
+    [window_start, window_end] (both inclusive).
+
+    Occurrences never start before the task's base date.
+    Unknown recurrence values produce no dates.
+    """
+    recurrence = task.get("recurrence", "none")
+    base = parse_base_date(task, window_start)
+    first = max(window_start, base)
+    if first > window_end:
+        return []
+
+    if recurrence == "daily":
+        return _daily(first, window_end)
+    if recurrence == "weekly":
+        return _weekly(task.get("recurrence_pattern") or [], first, window_end)
+    if recurrence == "monthly":
+        return _monthly(base, first, window_end)
+    if recurrence == "yearly":
+        return _yearly(base, first, window_end)
+    if recurrence == "custom":
+        interval = _custom_interval(task.get("recurrence_pattern"))
+        return _every_n_days(base, first, window_end, interval)
+    return []
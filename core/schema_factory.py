@@ -12,12 +12,27 @@ Usage:
 
     # Get allowed update fields for a project
     fields = get_updatable_fields("project")
+
+    # Build many documents, reserving their order values in one round trip
+    tasks = build_documents("task", [{"title": "A"}, {"title": "B"}], db=db, user_id="u123")
+
+    # Check an item up front (e.g. per item of a batch)
+    error = validate_document("task", {"description": "no title"}, user_id="u123")
 """
 
+import json
+from collections import defaultdict
 from uuid import uuid4
 from datetime import datetime
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
 from core.config_loader import load_yaml
 
+# Sequence counters for auto_increment fields: one document per entity + scope
+_COUNTERS_COLLECTION = "counters"
+
 
 def _get_schemas() -> dict:
     """Load schemas from YAML (cached by config_loader)."""
@@ -60,13 +75,13 @@ def get_collection_name(entity_name: str) -> str:
 def get_updatable_fields(entity_name: str) -> set:
     """
     Get the set of field names that can be updated (non-auto, non-computed fields).
-    Excludes: uuid (auto), auto_increment, computed, user_id.
+    Excludes: uuid (auto), auto_increment, computed, counter, user_id.
     """
     schema = get_schema(entity_name)
     updatable = set()
     for field_name, field_def in schema["fields"].items():
         ftype = field_def.get("type", "string")
-        if ftype in ("uuid", "auto_increment", "computed"):
+        if ftype in ("uuid", "auto_increment", "computed", "counter"):
             continue
         if field_def.get("auto"):
             continue
@@ -102,6 +117,7 @@ def build_document(entity_name: str, data: dict, db=None, user_id: str = None) -
     - Applies defaults for missing fields
     - Computes derived fields (e.g. is_recurring)
     - Calculates auto_increment order fields
+    - Initializes server-maintained counter fields
     - Validates required fields
 
     Parameters
@@ -111,7 +127,8 @@ def build_document(entity_name: str, data: dict, db=None, user_id: str = None) -
     data : dict
         Input data (partial — missing fields get defaults).
     db : optional
-        MongoDB database instance (needed for auto_increment).
+        MongoDB database instance (needed for auto_increment — values
+        come from reserve_sequence()).
     user_id : str, optional
         User ID to inject if not in data.
 
@@ -153,21 +170,24 @@ def build_document(entity_name: str, data: dict, db=None, user_id: str = None) -
             if field_name in data:
                 doc[field_name] = data[field_name]
             elif db is not None:
-                scope = field_def.get("collection_scope", "user_id")
-                collection = db[schema["collection"]]
-                query = _build_scope_query(scope, data, user_id)
-                doc[field_name] = collection.count_documents(query)
+                doc[field_name] = reserve_sequence(db, entity_name, field_name, data, user_id)
             else:
                 doc[field_name] = 0
             continue
 
-        # 4. Computed fields
+        # 4. Counters — maintained by the server, never taken from input
+        if ftype == "counter":
+            default = field_def.get("default", 0)
+            doc[field_name] = dict(default) if isinstance(default, dict) else default
+            continue
+
+        # 5. Computed fields
         if ftype == "computed":
             rule = field_def.get("rule", "")
             doc[field_name] = _evaluate_rule(rule, data, doc)
             continue
 
-        # 5. Regular fields — use data value or default
+        # 6. Regular fields — use data value or default
         if field_name in data:
             value = data[field_name]
             # Validate enum values
@@ -193,6 +213,119 @@ def build_document(entity_name: str, data: dict, db=None, user_id: str = None) -
     return doc
 
 
+def validate_document(entity_name: str, data: dict, user_id: str = None):
+    """
+    The error build_document() would raise for `data` (a missing required
+    field), or None if it would build.
+    """
+    for field_name, field_def in get_schema(entity_name)["fields"].items():
+        ftype = field_def.get("type", "string")
+        generated = field_def.get("auto") and ftype in ("uuid", "datetime")
+        if generated or ftype in ("auto_increment", "counter", "computed"):
+            continue
+        if field_name == "user_id" and user_id:
+            continue
+        if field_def.get("required") and field_name not in data and "default" not in field_def:
+            return f"Required field '{field_name}' is missing for entity '{entity_name}'."
+    return None
+
+
+def build_documents(entity_name: str, items: list, db=None, user_id: str = None) -> list:
+    """
+    Build several documents of the same entity at once.
+
+    Same as calling build_document() per item, except that auto_increment
+    values are reserved as one block per scope (a single counter round
+    trip) instead of one reservation per document.
+
+    Raises
+    ------
+    ValueError
+        If a required field is missing on any item (checked for every item
+        before anything is reserved; validate_document() checks one item).
+    """
+    schema = get_schema(entity_name)
+    prepared = [dict(item) for item in items]
+    for idx, item in enumerate(prepared):
+        error = validate_document(entity_name, item, user_id)
+        if error:
+            raise ValueError(f"Item {idx}: {error}")
+
+    if db is not None:
+        for field_name, field_def in schema["fields"].items():
+            if field_def.get("type") != "auto_increment":
+                continue
+            scope = field_def.get("collection_scope", "user_id")
+            groups = defaultdict(list)  # scope → indices of items needing a value
+            for idx, item in enumerate(prepared):
+                if field_name not in item:
+                    key = tuple(sorted(_build_scope_query(scope, item, user_id).items()))
+                    groups[key].append(idx)
+            for idxs in groups.values():
+                first = reserve_sequence(db, entity_name, field_name, prepared[idxs[0]], user_id, count=len(idxs))
+                for offset, idx in enumerate(idxs):
+                    prepared[idx][field_name] = first + offset
+
+    return [build_document(entity_name, item, db=db, user_id=user_id) for item in prepared]
+
+
+def reserve_sequence(db, entity_name: str, field_name: str, data: dict = None,
+                     user_id: str = None, count: int = 1) -> int:
+    """
+    Atomically reserve `count` consecutive values of an auto_increment field.
+
+    The counter lives in the `counters` collection, keyed by entity, field
+    and the field's collection_scope values (e.g. user_id + project_id), and
+    is advanced with a single find_one_and_update($inc) — concurrent inserts
+    never receive the same value.
+
+    The first reservation for a scope seeds the counter from the existing
+    documents (past the highest stored value).
+
+    Returns
+    -------
+    int
+        The first reserved value; the block is [first, first + count).
+    """
+    schema = get_schema(entity_name)
+    scope = schema["fields"][field_name].get("collection_scope", "user_id")
+    query = _build_scope_query(scope, data or {}, user_id)
+    key = _sequence_key(entity_name, field_name, query)
+    counters = db[_COUNTERS_COLLECTION]
+
+    doc = counters.find_one_and_update(
+        {"_id": key}, {"$inc": {"seq": count}}, return_document=ReturnDocument.AFTER
+    )
+    if doc is None:
+        _seed_sequence(db, schema, field_name, key, query)
+        doc = counters.find_one_and_update(
+            {"_id": key}, {"$inc": {"seq": count}}, return_document=ReturnDocument.AFTER
+        )
+    return doc["seq"] - count
+
+
+def _sequence_key(entity_name: str, field_name: str, scope_query: dict) -> str:
+    """Build the counters _id, e.g. 'note.order:[["project_id", "p1"], ["user_id", "u1"]]'."""
+    # JSON keeps scope values apart whatever characters they contain
+    scope = json.dumps(sorted(scope_query.items()), default=str)
+    return f"{entity_name}.{field_name}:{scope}"
+
+
+def _seed_sequence(db, schema: dict, field_name: str, key: str, scope_query: dict):
+    """Create a counter starting after the documents that already exist in the scope."""
+    collection = db[schema["collection"]]
+    start = collection.count_documents(scope_query)
+    last = collection.find_one(scope_query, {field_name: 1}, sort=[(field_name, -1)])
+    if last and isinstance(last.get(field_name), (int, float)):
+        start = max(start, int(last[field_name]) + 1)
+    try:
+        db[_COUNTERS_COLLECTION].update_one(
+            {"_id": key}, {"$setOnInsert": {"seq": start}}, upsert=True
+        )
+    except DuplicateKeyError:
+        pass  # another request seeded it first
+
+
 def _build_scope_query(scope, data: dict, user_id: str = None) -> dict:
     """Build a MongoDB query for auto_increment scope."""
     query = {}
@@ -0,0 +1,381 @@
+"""
+core/search_index.py — Per-User Inverted Index with BM25 Ranking
+==================================================================
+Backs GET /api/notes/search and GET /api/notes?search= with a word index
+instead of unanchored $regex scans.
+
+Collections:
+  search_postings → {user_id, term, note_id, tf}       one row per (term, note)
+  search_docs     → {user_id, note_id, length, tf: {term: weight}, stale?}
+  search_stats    → {user_id, state, doc_count, total_length} (N and avgdl for BM25)
+
+A note's terms come from title, tags, description and content (HTML
+stripped), each occurrence weighted by its field (field_weights). Updates
+are incremental: only postings whose weight changed are written. A note
+edited without its full text at hand (a chunk-wise patch) is only marked
+`stale` and re-indexed by the next search.
+
+The index is built lazily — the first search of a user indexes all of
+their notes; until then writes skip it (same model as core/occurrences.py).
+The stats document doubles as the build lock: it is claimed with
+state "building" (one atomic upsert) and set to "ready" at the end, so
+concurrent first searches build once — the others fall back to $regex
+until it is ready. A lock older than build_timeout_sec is taken over.
+
+Query: every word is an exact term, the last one also matches as a prefix
+(search-as-you-type). A query without any indexed word is left to $regex. Results are ranked by BM25 (k1, b) and get a
+highlighted snippet (<mark>…</mark>, HTML-escaped).
+
+Settings: performance.search_index in configs/app_config.yaml.
+Maintenance: python manage.py rebuild-search-index [--user USER_ID]
+"""
+
+import html
+import logging
+import math
+import re
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING, DeleteOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from core.config_loader import load_yaml
+from core.note_bodies import NoteBodyStore
+
+logger = logging.getLogger(__name__)
+
+_POSTINGS = "search_postings"
+_DOCS     = "search_docs"
+_STATS    = "search_stats"
+
+_TAG_RE  = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\w+")
+
+_INDEXED_FIELDS = ("title", "tags", "description", "content")
+_DEFAULT_WEIGHTS = {"title": 3.0, "tags": 2.0, "description": 1.5, "content": 1.0}
+
+
+def _get_config() -> dict:
+    """Load search index settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("search_index", {}) or {}
+
+
+def plain_text(content: str) -> str:
+    """Note content without HTML tags or entities."""
+    return html.unescape(_TAG_RE.sub(" ", content or ""))
+
+
+def tokenize(text: str) -> list:
+    """Lower-cased words; single characters are dropped unless they are digits."""
+    return [t for t in _WORD_RE.findall((text or "").casefold()) if len(t) > 1 or t.isdigit()]
+
+
+def _field_text(note: dict, field: str) -> str:
+    value = note.get(field)
+    if field == "tags":
+        return " ".join(t for t in value or [] if isinstance(t, str))
+    if field == "content":
+        return plain_text(value)
+    return value or ""
+
+
+def _term_weights(note: dict) -> dict:
+    """{term: field-weighted frequency} for one note."""
+    weights = {**_DEFAULT_WEIGHTS, **(_get_config().get("field_weights") or {})}
+    tf = Counter()
+    for field in _INDEXED_FIELDS:
+        for term in tokenize(_field_text(note, field)):
+            tf[term] += float(weights.get(field, 1.0))
+    return dict(tf)
+
+
+def _with_bodies(db, user_id: str, notes, batch_size: int):
+    """Yield notes with `content` filled in, loading stored bodies per batch."""
+    batch = []
+    for note in notes:
+        batch.append(note)
+        if len(batch) >= batch_size:
+            yield from _fill_bodies(db, user_id, batch)
+            batch = []
+    yield from _fill_bodies(db, user_id, batch)
+
+
+def _fill_bodies(db, user_id: str, batch: list) -> list:
+    bodies = NoteBodyStore.load_many(db, user_id, batch)
+    for note in batch:
+        note["content"] = bodies.get(note["note_id"], "")
+    return batch
+
+
+class NoteSearchIndex:
+
+    # ──────────────────────────────────────────────
+    #  Config & setup
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return bool(_get_config().get("enabled", False))
+
+    @staticmethod
+    def ensure_indexes(db):
+        db[_POSTINGS].create_index([("user_id", ASCENDING), ("term", ASCENDING), ("note_id", ASCENDING)], unique=True)
+        db[_POSTINGS].create_index([("user_id", ASCENDING), ("note_id", ASCENDING)])
+        db[_DOCS].create_index([("user_id", ASCENDING), ("note_id", ASCENDING)], unique=True)
+        db[_DOCS].create_index([("user_id", ASCENDING)], name="stale_docs",
+                               partialFilterExpression={"stale": True})
+        db[_STATS].create_index("user_id", unique=True)
+
+    @staticmethod
+    def _is_built(db, user_id) -> bool:
+        return db[_STATS].find_one({"user_id": user_id, "state": {"$ne": "building"}}, {"_id": 1}) is not None
+
+    @staticmethod
+    def _claim_build(db, user_id: str, rebuild: bool) -> bool:
+        """
+        Take the user's build lock. False if another build holds it (or,
+        without `rebuild`, if the index is already there).
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=float(_get_config().get("build_timeout_sec", 600)))
+        free = [{"state": "building", "build_started": {"$lt": stale}}]
+        if rebuild:
+            free.append({"state": {"$ne": "building"}})
+        try:
+            db[_STATS].update_one(
+                {"user_id": user_id, "$or": free},
+                {"$set": {"state": "building", "build_started": now}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @staticmethod
+    def build(db, user_id: str, batch_size: int = 1000):
+        """
+        (Re)index every note of a user. Returns the number of notes indexed,
+        or None if another build of this user's index is running.
+        """
+        if not NoteSearchIndex._claim_build(db, user_id, rebuild=True):
+            return None
+        return NoteSearchIndex._build(db, user_id, batch_size)
+
+    @staticmethod
+    def _build(db, user_id: str, batch_size: int = 1000) -> int:
+        """Index every note of a user — the caller holds the build lock."""
+        for coll_name in (_POSTINGS, _DOCS):
+            db[coll_name].delete_many({"user_id": user_id})
+
+        projection = {"_id": 0, "note_id": 1, "body_rev": 1, **{f: 1 for f in _INDEXED_FIELDS}}
+        doc_count, total_length = 0, 0.0
+        postings, docs = [], []
+        for note in _with_bodies(db, user_id, db.notes.find({"user_id": user_id}, projection), batch_size):
+            tf = _term_weights(note)
+            length = sum(tf.values())
+            docs.append({"user_id": user_id, "note_id": note["note_id"], "length": length, "tf": tf})
+            postings.extend(
+                {"user_id": user_id, "term": term, "note_id": note["note_id"], "tf": w}
+                for term, w in tf.items()
+            )
+            doc_count += 1
+            total_length += length
+            if len(postings) >= batch_size:
+                db[_POSTINGS].insert_many(postings, ordered=False)
+                postings = []
+            if len(docs) >= batch_size:
+                db[_DOCS].insert_many(docs, ordered=False)
+                docs = []
+        if postings:
+            db[_POSTINGS].insert_many(postings, ordered=False)
+        if docs:
+            db[_DOCS].insert_many(docs, ordered=False)
+        db[_STATS].update_one(
+            {"user_id": user_id},
+            {"$set": {"state": "ready", "doc_count": doc_count, "total_length": total_length},
+             "$unset": {"build_started": ""}},
+        )
+        return doc_count
+
+    # ──────────────────────────────────────────────
+    #  Write path — incremental
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def index_note(db, user_id: str, note: dict):
+        """
+        Bring one note's postings in line with its current fields.
+        `note` must carry note_id, title, tags, description and content.
+        No-op until the user's index has been built.
+        """
+        if not NoteSearchIndex.is_enabled() or not NoteSearchIndex._is_built(db, user_id):
+            return
+        note_id = note["note_id"]
+        new = _term_weights(note)
+        length = sum(new.values())
+        old_doc = db[_DOCS].find_one({"user_id": user_id, "note_id": note_id}, {"_id": 0, "tf": 1, "length": 1})
+        old = old_doc["tf"] if old_doc else {}
+
+        ops = [
+            UpdateOne({"user_id": user_id, "term": term, "note_id": note_id}, {"$set": {"tf": w}}, upsert=True)
+            for term, w in new.items() if old.get(term) != w
+        ]
+        ops.extend(
+            DeleteOne({"user_id": user_id, "term": term, "note_id": note_id})
+            for term in old.keys() - new.keys()
+        )
+        if ops:
+            db[_POSTINGS].bulk_write(ops, ordered=False)
+        db[_DOCS].update_one(
+            {"user_id": user_id, "note_id": note_id},
+            {"$set": {"tf": new, "length": length}},
+            upsert=True,
+        )
+        db[_STATS].update_one(
+            {"user_id": user_id},
+            {"$inc": {"doc_count": 0 if old_doc else 1,
+                      "total_length": length - (old_doc["length"] if old_doc else 0)}},
+        )
+
+    @staticmethod
+    def reindex(db, user_id: str, note_id: str):
+        """index_note() for a note that is only known by id (reads it first)."""
+        if not NoteSearchIndex.is_enabled() or not NoteSearchIndex._is_built(db, user_id):
+            return
+        note = db.notes.find_one(
+            {"user_id": user_id, "note_id": note_id},
+            {"_id": 0, "note_id": 1, "body_rev": 1, **{f: 1 for f in _INDEXED_FIELDS}},
+        )
+        if note:
+            note["content"] = NoteBodyStore.load(db, user_id, note)
+            NoteSearchIndex.index_note(db, user_id, note)
+
+    @staticmethod
+    def mark_stale(db, user_id: str, note_id: str):
+        """Flag a note whose content changed for re-indexing by the next search()."""
+        if NoteSearchIndex.is_enabled():
+            db[_DOCS].update_one({"user_id": user_id, "note_id": note_id}, {"$set": {"stale": True}})
+
+    @staticmethod
+    def _refresh_stale(db, user_id: str):
+        """Re-index the notes mark_stale() flagged."""
+        stale = [d["note_id"] for d in db[_DOCS].find({"user_id": user_id, "stale": True}, {"_id": 0, "note_id": 1})]
+        if not stale:
+            return
+        # Cleared before reading, so an edit landing meanwhile flags the note again
+        db[_DOCS].update_many({"user_id": user_id, "note_id": {"$in": stale}}, {"$unset": {"stale": ""}})
+        for note_id in stale:
+            NoteSearchIndex.reindex(db, user_id, note_id)
+
+    @staticmethod
+    def remove_notes(db, user_id: str, note_ids: list):
+        if not note_ids or not NoteSearchIndex._is_built(db, user_id):
+            return
+        match = {"user_id": user_id, "note_id": {"$in": list(note_ids)}}
+        removed = list(db[_DOCS].find(match, {"_id": 0, "length": 1}))
+        db[_POSTINGS].delete_many(match)
+        db[_DOCS].delete_many(match)
+        if removed:
+            db[_STATS].update_one(
+                {"user_id": user_id},
+                {"$inc": {"doc_count": -len(removed), "total_length": -sum(d["length"] for d in removed)}},
+            )
+
+    # ──────────────────────────────────────────────
+    #  Read path
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def query_terms(query: str) -> tuple:
+        """(exact_terms, prefix_or_None) for a raw query string."""
+        terms = tokenize(query)
+        if not terms:
+            return [], None
+        # A trailing space means the last word is complete
+        complete = query[-1:].isspace() or not _get_config().get("prefix_last_term", True)
+        prefix = None if complete else terms[-1]
+        return list(dict.fromkeys(terms)), prefix
+
+    @staticmethod
+    def search(db, user_id: str, query: str) -> list:
+        """
+        Rank the user's notes against `query`.
+        Returns [(note_id, score), ...] best first (every matching note), or
+        None while another request is building the user's index or when the
+        query has no indexed words (e.g. only single letters) — callers then
+        fall back to $regex.
+        """
+        terms, prefix = NoteSearchIndex.query_terms(query)
+        if not terms:
+            return None
+        if not NoteSearchIndex._is_built(db, user_id):
+            if NoteSearchIndex._claim_build(db, user_id, rebuild=False):
+                NoteSearchIndex._build(db, user_id)
+            elif not NoteSearchIndex._is_built(db, user_id):
+                return None
+        NoteSearchIndex._refresh_stale(db, user_id)
+
+        stats = db[_STATS].find_one({"user_id": user_id}, {"_id": 0}) or {}
+        n_docs = max(int(stats.get("doc_count", 0)), 1)
+        avgdl = (stats.get("total_length", 0) / n_docs) or 1.0
+
+        term_filter = {"$in": terms}
+        if prefix:
+            term_filter = {"$in": terms + [re.compile("^" + re.escape(prefix))]}
+        postings = list(db[_POSTINGS].find(
+            {"user_id": user_id, "term": term_filter},
+            {"_id": 0, "term": 1, "note_id": 1, "tf": 1},
+        ))
+        if not postings:
+            return []
+
+        df = Counter(p["term"] for p in postings)
+        lengths = {
+            d["note_id"]: d["length"]
+            for d in db[_DOCS].find(
+                {"user_id": user_id, "note_id": {"$in": list({p["note_id"] for p in postings})}},
+                {"_id": 0, "note_id": 1, "length": 1},
+            )
+        }
+
+        cfg = _get_config()
+        k1 = float(cfg.get("k1", 1.2))
+        b = float(cfg.get("b", 0.75))
+        scores = Counter()
+        for p in postings:
+            idf = math.log(1 + (n_docs - df[p["term"]] + 0.5) / (df[p["term"]] + 0.5))
+            norm = k1 * (1 - b + b * lengths.get(p["note_id"], avgdl) / avgdl)
+            scores[p["note_id"]] += idf * p["tf"] * (k1 + 1) / (p["tf"] + norm)
+        return sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+
+    @staticmethod
+    def snippet(note: dict, query: str) -> str:
+        """
+        Short HTML-escaped excerpt around the first match in content
+        (else description / title), matches wrapped in <mark>.
+        """
+        terms, prefix = NoteSearchIndex.query_terms(query)
+        if not terms:
+            return ""
+        words = [re.escape(t) + (r"\w*" if t == prefix else r"\b") for t in terms]
+        pattern = re.compile(r"\b(?:" + "|".join(words) + ")", re.IGNORECASE)
+        width = int(_get_config().get("snippet_chars", 160))
+
+        for field in ("content", "description", "title"):
+            text = " ".join(_field_text(note, field).split())
+            match = pattern.search(text)
+            if not match:
+                continue
+            start = max(0, match.start() - width // 3)
+            end = min(len(text), start + width)
+            excerpt = text[start:end]
+            out, pos = [], 0
+            for m in pattern.finditer(excerpt):
+                out.append(html.escape(excerpt[pos:m.start()]))
+                out.append(f"<mark>{html.escape(m.group(0))}</mark>")
+                pos = m.end()
+            out.append(html.escape(excerpt[pos:]))
+            return ("…" if start > 0 else "") + "".join(out) + ("…" if end < len(text) else "")
+        return ""
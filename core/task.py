@@ -3,12 +3,78 @@ core/task.py — Task & Project Business Logic
 ==============================================
 Uses schema_factory for document construction.
 All field definitions come from configs/schemas.yaml.
+
+Search (?search=) goes through the trigram index in core/trigram_index.py
+(substring + typo-tolerant); queries under 3 characters use an escaped $regex.
 """
 
+import base64
+import heapq
+import json
 import re
 from datetime import datetime, timedelta
+from itertools import islice
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from core.config_loader import load_yaml
+from core.occurrences import ONE_OFF_FILTER, RECURRING_FILTER, OccurrenceStore
+from core.project_counters import ProjectCounters
+from core.ranking import move_between, rebalance
+from core.recurrence import occurrence_dates
+from core.schema_factory import build_document, build_documents, get_updatable_fields, validate_document
+from core.trigram_index import TrigramIndex
+
+# Recurring-only bookkeeping is dropped from one-off task payloads
+_ONE_OFF_PROJECTION = {"_id": 0, "completed_dates": 0, "exception_dates": 0}
+
+# Listing order — also the keyset used by cursor pagination
+_TASK_SORT = [("order", 1), ("task_id", 1)]
+
+
+def _get_listing_config() -> dict:
+    """Load task listing settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("task_listing", {}) or {}
+
+
+def _get_batch_config() -> dict:
+    """Load batch creation settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("task_batch", {}) or {}
+
 
-from core.schema_factory import build_document, get_updatable_fields
+def _sort_key(task: dict) -> tuple:
+    return (task.get("order"), task.get("task_id", ""))
+
+
+def _comparable(key: tuple) -> tuple:
+    """(order, task_id) as Mongo sorts it: a null or missing order before any number."""
+    order, task_id = key
+    return (order is not None, order or 0, task_id)
+
+
+def _merge_key(task: dict) -> tuple:
+    return _comparable(_sort_key(task))
+
+
+def encode_cursor(key: tuple) -> str:
+    """Encode an (order, task_id) key (order may be None) as an opaque URL-safe cursor."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor from encode_cursor(); returns None if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        order, task_id = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if (order is not None and not isinstance(order, (int, float))) or not isinstance(task_id, str):
+        return None
+    return (order, task_id)
 
 
 class ProjectService:
@@ -18,19 +84,45 @@ class ProjectService:
         query["isArchived"] = True if archived else {"$ne": True}
         projects = list(db.projects.find(query, {"_id": 0}).sort("order", 1))
         
-        # Calculate task count and progress for each project
+        # Counters are stored on the project document (core/project_counters.py);
+        # projects never initialized by the repair job fall back to one aggregation
+        today = datetime.now().strftime("%Y-%m-%d")
+        stored = {p["project_id"]: ProjectCounters.read(p, today) for p in projects}
+        missing = [pid for pid, c in stored.items() if c is None]
+        counts = ProjectService._task_counts(db, user_id, missing)
         for p in projects:
-            pid = p["project_id"]
-            proj_tasks = list(db.tasks.find({"project_id": pid, "user_id": user_id}))
-            total = len(proj_tasks)
-            done = sum(1 for t in proj_tasks if t.get("status") == "completed")
-            
+            total, done = stored[p["project_id"]] or counts.get(p["project_id"], (0, 0))
             p["task_count"] = total
             p["done_count"] = done
             p["progress"] = round((done / total * 100) if total else 0)
             
         return projects
 
+    @staticmethod
+    def _task_counts(db, user_id, project_ids: list) -> dict:
+        """
+        Return {project_id: (task_count, done_count)} via a single $group.
+        A recurring task counts as done when today is in its completed_dates;
+        any other task when its status is "completed".
+        """
+        if not project_ids:
+            return {}
+        today = datetime.now().strftime("%Y-%m-%d")
+        is_done = {"$cond": [
+            {"$ne": [{"$ifNull": ["$recurrence", "none"]}, "none"]},
+            {"$in": [today, {"$ifNull": ["$completed_dates", []]}]},
+            {"$eq": ["$status", "completed"]},
+        ]}
+        pipeline = [
+            {"$match": {"user_id": user_id, "project_id": {"$in": project_ids}}},
+            {"$group": {
+                "_id": "$project_id",
+                "task_count": {"$sum": 1},
+                "done_count": {"$sum": {"$cond": [is_done, 1, 0]}},
+            }},
+        ]
+        return {r["_id"]: (r["task_count"], r["done_count"]) for r in db.tasks.aggregate(pipeline)}
+
     @staticmethod
     def create_project(db, user_id, data):
         project = build_document("project", data, db=db, user_id=user_id)
@@ -53,6 +145,9 @@ class ProjectService:
                 {"project_id": pid, "user_id": user_id},
                 {"$set": {"isArchived": is_archived}}
             )
+            ProjectCounters.set_archived(db, user_id, pid, bool(is_archived))
+            if OccurrenceStore.is_enabled():
+                OccurrenceStore.update_fields(db, user_id, {"project_id": pid}, {"isArchived": is_archived})
 
         result = db.projects.update_one(
             {"project_id": pid, "user_id": user_id},
@@ -67,9 +162,9 @@ class ProjectService:
 
     @staticmethod
     def delete_project(db, user_id, pid):
-        result = db.projects.delete_one({"project_id": pid, "user_id": user_id})
+        deleted = db.projects.find_one_and_delete({"project_id": pid, "user_id": user_id}, {"_id": 0})
 
-        if result.deleted_count == 0:
+        if deleted is None:
             return False, "Project not found"
 
         # Transfer orphaned tasks to "general"
@@ -77,40 +172,102 @@ class ProjectService:
             {"project_id": pid, "user_id": user_id},
             {"$set": {"project_id": "general"}},
         )
+        ProjectCounters.add_totals(db, user_id, "general", deleted)
+        if OccurrenceStore.is_enabled():
+            OccurrenceStore.update_fields(db, user_id, {"project_id": pid}, {"project_id": "general"})
         return True, None
 
     @staticmethod
     def reorder_projects(db, user_id, ordered_ids: list):
-        """Update the display order of projects by their IDs."""
+        """Update the display order of projects by their IDs (single bulk_write)."""
         if not isinstance(ordered_ids, list):
             return False, "ordered_ids array is required"
-        for idx, pid in enumerate(ordered_ids):
-            db.projects.update_one(
-                {"project_id": pid, "user_id": user_id},
-                {"$set": {"order": idx}},
-            )
+        orders = {pid: idx for idx, pid in enumerate(ordered_ids)}
+        ops = [
+            UpdateOne({"project_id": pid, "user_id": user_id}, {"$set": {"order": idx}})
+            for pid, idx in orders.items()
+        ]
+        if ops:
+            db.projects.bulk_write(ops, ordered=False)
         return True, None
 
+    @staticmethod
+    def move_project(db, user_id, pid, prev_id=None, next_id=None):
+        """
+        Move one project between two neighbours (prev above, next below).
+        Only the moved project is written — see core/ranking.py.
+        """
+        order, error = move_between(
+            db.projects, {"user_id": user_id}, "project_id", pid, prev_id, next_id,
+            rebalance_fn=lambda: rebalance(db.projects, {"user_id": user_id}, "project_id"),
+        )
+        if error:
+            return None, "Project not found" if error == "Not found" else error
+        return {"project_id": pid, "order": order}, None
+
 
 class TaskService:
     @staticmethod
     def get_tasks(db, user_id, archived=False, project_id=None, status=None, search=None, window_start=None, window_end=None):
+        return list(TaskService.iter_tasks(
+            db, user_id, archived=archived, project_id=project_id, status=status,
+            search=search, window_start=window_start, window_end=window_end,
+        ))
+
+    @staticmethod
+    def get_tasks_page(db, user_id, limit=None, cursor=None, **filters):
+        """
+        Keyset-paginated get_tasks() on (order, task_id).
+        Returns ({"items": [...], "next_cursor": str|None}, error).
+        """
+        cfg = _get_listing_config()
+        try:
+            limit = int(limit) if limit not in (None, "") else int(cfg.get("default_page_size", 100))
+        except (TypeError, ValueError):
+            return None, "limit must be an integer"
+        limit = max(1, min(limit, int(cfg.get("max_page_size", 500))))
+
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)
+            if after is None:
+                return None, "Invalid cursor"
+
+        # Fetch one extra item to know whether another page exists
+        items = list(islice(TaskService.iter_tasks(db, user_id, after=after, **filters), limit + 1))
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(_sort_key(items[-1]))
+        return {"items": items, "next_cursor": next_cursor}, None
+
+    @staticmethod
+    def iter_tasks(db, user_id, archived=False, project_id=None, status=None, search=None,
+                   window_start=None, window_end=None, after=None):
+        """
+        Generator behind get_tasks(): yields one-off tasks and recurring
+        instances lazily, in (order, task_id) order, so callers can stream
+        or paginate without building the full list.
+        `after` is an (order, task_id) key — only later items are yielded.
+        """
         query = {"user_id": user_id}
         query["isArchived"] = True if archived else {"$ne": True}
 
         if project_id:
             query["project_id"] = project_id
         if search:
-            safe_search = re.escape(search)
-            query["$or"] = [
-                {"title": {"$regex": safe_search, "$options": "i"}},
-                {"description": {"$regex": safe_search, "$options": "i"}},
-            ]
-
-        # Fetch without status first (recurring tasks have virtual status)
-        tasks = list(db.tasks.find(query, {"_id": 0}).sort("order", 1))
-        
-        processed_tasks = []
+            hits = TrigramIndex.search(db, user_id, "task", search) if TrigramIndex.is_enabled() else None
+            if hits is not None:
+                # original_task_id matches the materialized recurring rows
+                ids = [doc_id for doc_id, _ in hits]
+                query["$or"] = [{"task_id": {"$in": ids}}, {"original_task_id": {"$in": ids}}]
+            else:
+                safe_search = re.escape(search)
+                query["$or"] = [
+                    {"title": {"$regex": safe_search, "$options": "i"}},
+                    {"description": {"$regex": safe_search, "$options": "i"}},
+                ]
+
         today = datetime.now()
         
         # Parse window_start
@@ -137,82 +294,96 @@ class TaskService:
         else:
             w_end = (today + timedelta(days=60)).date()
 
-        for task in tasks:
-            is_recurring = task.get("is_recurring", False) or task.get("recurrence", "none") != "none"
-            
-            if is_recurring and task.get("recurrence", "none") != "none":
-                instances = TaskService._generate_occurrences(task, w_start, w_end)
-                for inst in instances:
-                    if status and inst.get("status") != status:
-                        continue
-                    processed_tasks.append(inst)
-            else:
-                if status and task.get("status") != status:
+        # Split query plan:
+        #   one-off tasks     → status + date window filtered inside Mongo
+        #   recurring masters → fetched separately and expanded (virtual status)
+        one_off_query = TaskService._one_off_query(
+            query, status,
+            w_start if window_start else None,
+            w_end if window_end else None,
+        )
+        if after is not None and after[0] is not None:
+            one_off_query = {**one_off_query, "order": {"$gte": after[0]}}
+        one_offs = db.tasks.find(one_off_query, _ONE_OFF_PROJECTION).sort(_TASK_SORT)
+
+        instances = None
+        if OccurrenceStore.is_enabled():
+            instances = OccurrenceStore.read_range(db, user_id, query, w_start, w_end, status)
+
+        if instances is None:
+            instances = TaskService._expand_masters(db, {**query, **RECURRING_FILTER}, w_start, w_end, status, after)
+
+        merged = heapq.merge(one_offs, instances, key=_merge_key)
+        if after is None:
+            yield from merged
+        else:
+            after = _comparable(after)
+            yield from (t for t in merged if _merge_key(t) > after)
+
+    @staticmethod
+    def _expand_masters(db, query, window_start, window_end, status=None, after=None):
+        """Lazily expand recurring masters in (order, task_id) order."""
+        if after is not None and after[0] is not None:
+            query = {**query, "order": {"$gte": after[0]}}
+        for task in db.tasks.find(query, {"_id": 0}).sort(_TASK_SORT):
+            for inst in TaskService._generate_occurrences(task, window_start, window_end):
+                if status and inst.get("status") != status:
                     continue
-                processed_tasks.append(task)
-                
-        return processed_tasks
+                yield inst
+
+    @staticmethod
+    def _one_off_query(query, status=None, window_start=None, window_end=None):
+        """
+        Build the Mongo query for non-recurring tasks.
+        The date window is only applied when the caller asked for one —
+        without it the list view still needs unscheduled tasks.
+        A task matches the window if its execution_day or start_date falls
+        inside it, or its start_date..end_date span overlaps it.
+        """
+        one_off = {**query, **ONE_OFF_FILTER}
+        if status:
+            one_off["status"] = status
+        if window_start and window_end:
+            lo, hi = window_start.isoformat(), window_end.isoformat()
+            window = {"$or": [
+                {"execution_day": {"$gte": lo, "$lte": hi}},
+                {"start_date": {"$gte": lo, "$lte": hi}},
+                {"start_date": {"$gt": "", "$lte": hi}, "end_date": {"$gte": lo}},
+            ]}
+            if "$or" in one_off:
+                # search already uses $or — combine both conditions with $and
+                search = one_off.pop("$or")
+                one_off["$and"] = [{"$or": search}, window]
+            else:
+                one_off.update(window)
+        return one_off
 
     @staticmethod
     def _generate_occurrences(task, window_start, window_end):
+        """
+        Expand a recurring task into virtual per-day instances.
+        Matching dates come from core/recurrence.py (closed-form stepping);
+        completion lookups use a set instead of scanning completed_dates.
+        """
+        completed = set(task.get("completed_dates") or [])
+        has_start = bool(task.get("start_date"))
+        has_end = bool(task.get("end_date"))
+
         instances = []
-        recurrence = task.get("recurrence", "none")
-        completed_dates = task.get("completed_dates", [])
-        
-        base_date_str = task.get("execution_day") or task.get("start_date")
-        if base_date_str:
-            try:
-                base_date = datetime.strptime(base_date_str, "%Y-%m-%d").date()
-            except ValueError:
-                base_date = window_start
-        else:
-            base_date = window_start
+        for day in occurrence_dates(task, window_start, window_end):
+            date_str = day.isoformat()
 
-        current_date = max(window_start, base_date)
+            inst = task.copy()
+            inst["task_id"] = f"{task['task_id']}|{date_str}"
+            inst["original_task_id"] = task["task_id"]
+            inst["execution_day"] = date_str
+            if has_start:
+                inst["start_date"] = date_str
+            if has_end:
+                inst["end_date"] = date_str
+            inst["status"] = "completed" if date_str in completed else "pending"
+            instances.append(inst)
 
-        while current_date <= window_end:
-            should_create = False
-            
-            if recurrence == "daily":
-                should_create = True
-            elif recurrence == "weekly":
-                pattern = task.get("recurrence_pattern") or []
-                weekday_map = {0: "Mon", 1: "Tue", 2: "Wed", 3: "Thu", 4: "Fri", 5: "Sat", 6: "Sun"}
-                if isinstance(pattern, list):
-                    day_name = weekday_map[current_date.weekday()]
-                    if day_name in pattern:
-                        should_create = True
-            elif recurrence == "monthly":
-                if current_date.day == base_date.day:
-                    should_create = True
-            elif recurrence == "custom":
-                try:
-                    interval = int(task.get("recurrence_pattern") or 1)
-                except:
-                    interval = 1
-                days_diff = (current_date - base_date).days
-                if days_diff % interval == 0:
-                    should_create = True
-
-            if should_create:
-                date_str = current_date.strftime("%Y-%m-%d")
-                inst_status = "completed" if date_str in completed_dates else "pending"
-                
-                inst = task.copy()
-                inst["task_id"] = f"{task['task_id']}|{date_str}"
-                inst["original_task_id"] = task["task_id"]
-                inst["execution_day"] = date_str
-                
-                if "start_date" in inst and inst["start_date"]:
-                    inst["start_date"] = date_str
-                if "end_date" in inst and inst["end_date"]:
-                    inst["end_date"] = date_str
-                    
-                inst["status"] = inst_status
-                instances.append(inst)
-                
-            current_date += timedelta(days=1)
-            
         return instances
 
     @staticmethod
@@ -224,8 +395,75 @@ class TaskService:
         
         db.tasks.insert_one(task)
         task.pop('_id', None)
+        ProjectCounters.apply_change(db, user_id, None, task)
+        TrigramIndex.index_docs(db, user_id, "task", [task])
+        if OccurrenceStore.is_enabled():
+            OccurrenceStore.sync_task(db, user_id, task)
         return task, None
 
+    @staticmethod
+    def create_tasks(db, user_id, items: list):
+        """
+        Create many tasks at once: inputs are validated up front, order values
+        are reserved as one block and the documents are written with a single
+        insert_many(ordered=False).
+
+        Returns ({"results": [...], "errors": [...], "created": n, "failed": m}, error).
+        Each result is {"index": i, "task": {...}} or {"index": i, "error": "..."}
+        in input order, `errors` the failed ones — one bad item does not stop
+        the others.
+        """
+        if not isinstance(items, list) or not items:
+            return None, "tasks array is required"
+        max_items = int(_get_batch_config().get("max_items", 500))
+        if len(items) > max_items:
+            return None, f"At most {max_items} tasks per batch"
+
+        results = [None] * len(items)
+        valid = []  # input indices that passed validation
+        for idx, data in enumerate(items):
+            if not isinstance(data, dict):
+                error = "Task must be an object"
+            elif not data.get("title"):
+                error = "Title is required"
+            else:
+                error = validate_document("task", data, user_id)
+            if error:
+                results[idx] = {"index": idx, "error": error}
+            else:
+                valid.append(idx)
+
+        docs = build_documents("task", [items[i] for i in valid], db=db, user_id=user_id) if valid else []
+
+        failed_docs = {}
+        if docs:
+            try:
+                db.tasks.insert_many(docs, ordered=False)
+            except BulkWriteError as exc:
+                for err in exc.details.get("writeErrors", []):
+                    failed_docs[err["index"]] = err.get("errmsg", "Insert failed")
+
+        created = []
+        for pos, (idx, task) in enumerate(zip(valid, docs)):
+            task.pop("_id", None)
+            if pos in failed_docs:
+                results[idx] = {"index": idx, "error": failed_docs[pos]}
+            else:
+                results[idx] = {"index": idx, "task": task}
+                created.append(task)
+
+        ProjectCounters.apply_changes(db, user_id, [(None, task) for task in created])
+        TrigramIndex.index_docs(db, user_id, "task", created)
+        if OccurrenceStore.is_enabled():
+            OccurrenceStore.insert_tasks(db, user_id, created)
+
+        return {
+            "results": results,
+            "errors":  [r for r in results if "error" in r],
+            "created": len(created),
+            "failed":  len(items) - len(created),
+        }, None
+
     @staticmethod
     def update_task(db, user_id, tid, data):
         date_str = None
@@ -237,12 +475,13 @@ class TaskService:
             return None, "Task not found"
 
         is_recurring = existing_task.get("is_recurring", False) or existing_task.get("recurrence", "none") != "none"
+        toggled = is_recurring and "status" in data
         
-        if is_recurring and "status" in data:
+        if toggled:
             if not date_str:
                 date_str = datetime.now().strftime("%Y-%m-%d")
                 
-            completed_dates = existing_task.get("completed_dates", [])
+            completed_dates = list(existing_task.get("completed_dates") or [])
             target_status = data.get("status")
             
             if target_status == "completed" and date_str not in completed_dates:
@@ -258,6 +497,18 @@ class TaskService:
             db.tasks.update_one({"task_id": tid, "user_id": user_id}, {"$set": data})
         
         updated_task = db.tasks.find_one({"task_id": tid, "user_id": user_id}, {"_id": 0})
+        ProjectCounters.apply_change(db, user_id, existing_task, updated_task)
+        if "title" in data or "description" in data:
+            TrigramIndex.index_docs(db, user_id, "task", [updated_task])
+
+        if OccurrenceStore.is_enabled() and updated_task:
+            if toggled:
+                OccurrenceStore.set_status(db, user_id, tid, date_str, data["completed_dates"])
+            fields = {k: v for k, v in data.items() if k != "completed_dates"}
+            if OccurrenceStore.needs_resync(fields):
+                OccurrenceStore.sync_task(db, user_id, updated_task)
+            elif fields:
+                OccurrenceStore.update_fields(db, user_id, {"original_task_id": tid}, fields)
         return updated_task, None
 
     @staticmethod
@@ -265,21 +516,53 @@ class TaskService:
         if "|" in tid:
             tid = tid.split("|")[0]
 
-        result = db.tasks.delete_one({"task_id": tid, "user_id": user_id})
-        if result.deleted_count == 0:
+        deleted = db.tasks.find_one_and_delete({"task_id": tid, "user_id": user_id}, {"_id": 0})
+        if deleted is None:
             return False, "Task not found"
+        ProjectCounters.apply_change(db, user_id, deleted, None)
+        TrigramIndex.remove(db, user_id, "task", [tid])
+        if OccurrenceStore.is_enabled():
+            OccurrenceStore.delete_task(db, user_id, tid)
         return True, None
 
     @staticmethod
     def reorder_tasks(db, user_id, ordered_ids: list):
-        """Update the display order of tasks by their IDs."""
+        """Update the display order of tasks by their IDs (single bulk_write)."""
         if not isinstance(ordered_ids, list):
             return False, "ordered_ids array is required"
-        for idx, tid in enumerate(ordered_ids):
-            if "|" in tid:
-                tid = tid.split("|", 1)[0]
-            db.tasks.update_one(
-                {"task_id": tid, "user_id": user_id},
-                {"$set": {"order": idx}},
-            )
+        # Recurring instances map to their master; the last position wins
+        orders = {tid.split("|", 1)[0]: idx for idx, tid in enumerate(ordered_ids)}
+        ops = [
+            UpdateOne({"task_id": tid, "user_id": user_id}, {"$set": {"order": idx}})
+            for tid, idx in orders.items()
+        ]
+        if ops:
+            db.tasks.bulk_write(ops, ordered=False)
+        if OccurrenceStore.is_enabled():
+            OccurrenceStore.update_orders(db, user_id, orders)
         return True, None
+
+    @staticmethod
+    def move_task(db, user_id, tid, prev_id=None, next_id=None):
+        """
+        Move one task between two neighbours (prev above, next below).
+        Only the moved task is written — see core/ranking.py.
+        Recurring instance IDs ("id|date") resolve to their master.
+        """
+        tid, prev_id, next_id = (i.split("|", 1)[0] if i else None for i in (tid, prev_id, next_id))
+        order, error = move_between(
+            db.tasks, {"user_id": user_id}, "task_id", tid, prev_id, next_id,
+            rebalance_fn=lambda: TaskService._rebalance(db, user_id),
+        )
+        if error:
+            return None, "Task not found" if error == "Not found" else error
+        if OccurrenceStore.is_enabled():
+            OccurrenceStore.update_orders(db, user_id, {tid: order})
+        return {"task_id": tid, "order": order}, None
+
+    @staticmethod
+    def _rebalance(db, user_id):
+        """Renumber the user's task orders to 0..N-1 (and their materialized rows)."""
+        changes = rebalance(db.tasks, {"user_id": user_id}, "task_id")
+        if OccurrenceStore.is_enabled():
+            OccurrenceStore.update_orders(db, user_id, changes)
@@ -9,7 +9,9 @@ from uuid import uuid4
 from datetime import datetime
 
 from core.config_loader import load_yaml
-from core.schema_factory import build_document
+from core.schema_factory import build_document, get_schema
+from core.task import TaskService
+from core.writing import WritingService
 
 
 def _load_templates() -> list:
@@ -85,18 +87,25 @@ class TemplateService:
         db.projects.insert_one(project)
         project.pop("_id", None)
 
+        # One batch: order values reserved once + a single insert_many.
+        # Tasks without a title get the schema default, as build_document gave them.
+        default_title = get_schema("task")["fields"]["title"].get("default", "New Task")
+        task_inputs = [
+            {**task_data, "title": task_data.get("title") or default_title, "project_id": project["project_id"]}
+            for task_data in data.get("tasks", [])
+        ]
         created_tasks = []
-        for idx, task_data in enumerate(data.get("tasks", [])):
-            task_input = {
-                **task_data,
-                "project_id": project["project_id"],
-            }
-            task = build_document("task", task_input, db=db, user_id=user_id)
-            # Adjust order to account for existing tasks
-            task["order"] = task["order"] + idx
-            db.tasks.insert_one(task)
-            task.pop("_id", None)
-            created_tasks.append(task)
+        if task_inputs:
+            try:
+                batch, error = TaskService.create_tasks(db, user_id, task_inputs)
+            except Exception:
+                TemplateService._discard_project(db, user_id, project["project_id"])
+                raise
+            if error:
+                # Nothing of the template stays behind
+                TemplateService._discard_project(db, user_id, project["project_id"])
+                return None, error
+            created_tasks = [r["task"] for r in batch["results"] if "task" in r]
 
         return {
             "destination": "tasks",
@@ -105,6 +114,13 @@ class TemplateService:
             "message":     f"Project '{project['name']}' with {len(created_tasks)} tasks created successfully!",
         }, None
 
+    @staticmethod
+    def _discard_project(db, user_id, project_id):
+        """Remove a half-imported project and any tasks already created in it."""
+        for task in list(db.tasks.find({"user_id": user_id, "project_id": project_id}, {"_id": 0, "task_id": 1})):
+            TaskService.delete_task(db, user_id, task["task_id"])
+        db.projects.delete_one({"user_id": user_id, "project_id": project_id})
+
     @staticmethod
     def _import_writing_note(db, user_id, data):
         """ينشئ مشروع كتابة (إن لم يكن موجوداً) + ملاحظة جديدة."""
@@ -128,15 +144,14 @@ class TemplateService:
             new_proj.pop("_id", None)
             writing_project_id = new_proj["project_id"]
 
-        # إنشاء الملاحظة
-        note_input = {
+        # إنشاء الملاحظة — same pipeline as POST /api/notes (bodies, stats, search indexes)
+        note, error, _ = WritingService.create_note(db, user_id, {
             "project_id": writing_project_id,
             "title": note_data.get("title", "New Note"),
             "content": note_data.get("content", ""),
-        }
-        note = build_document("note", note_input, db=db, user_id=user_id)
-        db.notes.insert_one(note)
-        note.pop("_id", None)
+        })
+        if error:
+            return None, error
 
         return {
             "destination":   "writing",
@@ -0,0 +1,284 @@
+"""
+core/trigram_index.py — Trigram Index for Substring & Fuzzy Search
+====================================================================
+Word indexes (core/search_index.py) cannot answer "contains `udge`" or
+"`budgte` with a typo". This index stores, per user, the normalized
+searchable text of every task (title + description) and note (title +
+tags) together with its set of character trigrams:
+
+  trigram_docs  → {user_id, kind: "task"|"note", doc_id, text, grams: [...], truncated}
+  trigram_built → {user_id, kind, state}   (index exists for this user + kind;
+                                            state "building" = build lock)
+
+Search narrows candidates with the multikey `grams` index — documents
+sharing at least max(2, |grams(q)| - 3k) trigrams with the query (k =
+allowed edits), at most fuzzy_candidates of them, most shared first — and
+then verifies each one: exact substring first, otherwise the edit distance
+between the query and its best-matching substring.
+
+Only the first max_text_chars of a document are indexed; documents cut
+there are flagged `truncated` and also checked with an escaped $regex on
+their source fields, so a match past the limit is still found (exactly,
+without typos).
+
+Like the BM25 index it is built lazily on a user's first search (once —
+concurrent searches fall back while the build lock is held) and kept in
+sync by TaskService / WritingService writes afterwards. Queries shorter
+than 3 characters return None (callers fall back to an escaped $regex).
+
+Settings: performance.trigram_index in configs/app_config.yaml.
+Maintenance: python manage.py rebuild-search-index also rebuilds this.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING, ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+from core.config_loader import load_yaml
+
+logger = logging.getLogger(__name__)
+
+_DOCS  = "trigram_docs"
+_BUILT = "trigram_built"
+
+# kind → (collection, id field, indexed fields)
+_SOURCES = {
+    "task": ("tasks", "task_id", ("title", "description")),
+    "note": ("notes", "note_id", ("title", "tags")),
+}
+
+
+def _get_config() -> dict:
+    """Load trigram index settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("trigram_index", {}) or {}
+
+
+def normalize(text: str) -> str:
+    """Case-folded text with whitespace runs collapsed to one space."""
+    return " ".join((text or "").casefold().split())
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def substring_distance(query: str, text: str, limit: int) -> int:
+    """
+    Smallest edit distance between `query` and any substring of `text`
+    (Sellers' algorithm), or limit + 1 if that is more than `limit`.
+    """
+    prev = list(range(len(query) + 1))
+    best = prev[-1]
+    for ch in text:
+        cur = [0]
+        for j, qch in enumerate(query, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (qch != ch)))
+        best = min(best, cur[-1])
+        if best == 0:
+            return 0
+        prev = cur
+    return best if best <= limit else limit + 1
+
+
+def _doc_text(kind: str, doc: dict) -> str:
+    parts = []
+    for field in _SOURCES[kind][2]:
+        value = doc.get(field)
+        if isinstance(value, list):
+            parts.extend(v for v in value if isinstance(v, str))
+        elif isinstance(value, str):
+            parts.append(value)
+    return normalize(" ".join(parts))
+
+
+def _row(user_id: str, kind: str, doc: dict) -> dict:
+    full = _doc_text(kind, doc)
+    text = full[:int(_get_config().get("max_text_chars", 2000))]
+    return {
+        "user_id": user_id,
+        "kind": kind,
+        "doc_id": doc[_SOURCES[kind][1]],
+        "text": text,
+        "grams": sorted(trigrams(text)),
+        "truncated": len(full) > len(text),
+    }
+
+
+class TrigramIndex:
+
+    # ──────────────────────────────────────────────
+    #  Config & setup
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return bool(_get_config().get("enabled", False))
+
+    @staticmethod
+    def ensure_indexes(db):
+        db[_DOCS].create_index([("user_id", ASCENDING), ("kind", ASCENDING), ("doc_id", ASCENDING)], unique=True)
+        db[_DOCS].create_index([("user_id", ASCENDING), ("kind", ASCENDING), ("grams", ASCENDING)])
+        db[_BUILT].create_index([("user_id", ASCENDING), ("kind", ASCENDING)], unique=True)
+
+    @staticmethod
+    def _is_built(db, user_id: str, kind: str) -> bool:
+        return db[_BUILT].find_one(
+            {"user_id": user_id, "kind": kind, "state": {"$ne": "building"}}, {"_id": 1}
+        ) is not None
+
+    @staticmethod
+    def _claim_build(db, user_id: str, kind: str, rebuild: bool) -> bool:
+        """
+        Take the build lock of a user + kind. False if another build holds
+        it (or, without `rebuild`, if the index is already there).
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=float(_get_config().get("build_timeout_sec", 600)))
+        free = [{"state": "building", "build_started": {"$lt": stale}}]
+        if rebuild:
+            free.append({"state": {"$ne": "building"}})
+        try:
+            db[_BUILT].update_one(
+                {"user_id": user_id, "kind": kind, "$or": free},
+                {"$set": {"state": "building", "build_started": now}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @staticmethod
+    def build(db, user_id: str, kind: str, batch_size: int = 1000):
+        """
+        (Re)index every task or note of a user. Returns documents indexed,
+        or None if another build of the same index is running.
+        """
+        if not TrigramIndex._claim_build(db, user_id, kind, rebuild=True):
+            return None
+        return TrigramIndex._build(db, user_id, kind, batch_size)
+
+    @staticmethod
+    def _build(db, user_id: str, kind: str, batch_size: int = 1000) -> int:
+        """Index every task or note of a user — the caller holds the build lock."""
+        coll_name, id_field, fields = _SOURCES[kind]
+        db[_DOCS].delete_many({"user_id": user_id, "kind": kind})
+
+        projection = {"_id": 0, id_field: 1, **{f: 1 for f in fields}}
+        count, rows = 0, []
+        for doc in db[coll_name].find({"user_id": user_id}, projection):
+            rows.append(_row(user_id, kind, doc))
+            if len(rows) >= batch_size:
+                db[_DOCS].insert_many(rows, ordered=False)
+                count += len(rows)
+                rows = []
+        if rows:
+            db[_DOCS].insert_many(rows, ordered=False)
+            count += len(rows)
+        db[_BUILT].update_one(
+            {"user_id": user_id, "kind": kind},
+            {"$set": {"state": "ready"}, "$unset": {"build_started": ""}},
+        )
+        return count
+
+    # ──────────────────────────────────────────────
+    #  Write path
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def index_docs(db, user_id: str, kind: str, docs: list):
+        """Upsert the rows of created / edited tasks or notes (one bulk_write)."""
+        docs = [d for d in docs if d]
+        if not docs or not TrigramIndex.is_enabled() or not TrigramIndex._is_built(db, user_id, kind):
+            return
+        db[_DOCS].bulk_write([
+            ReplaceOne({"user_id": user_id, "kind": kind, "doc_id": row["doc_id"]}, row, upsert=True)
+            for row in (_row(user_id, kind, d) for d in docs)
+        ], ordered=False)
+
+    @staticmethod
+    def remove(db, user_id: str, kind: str, doc_ids: list):
+        if doc_ids:
+            db[_DOCS].delete_many({"user_id": user_id, "kind": kind, "doc_id": {"$in": list(doc_ids)}})
+
+    # ──────────────────────────────────────────────
+    #  Read path
+    # ──────────────────────────────────────────────
+
+    @staticmethod
+    def search(db, user_id: str, kind: str, query: str):
+        """
+        Documents whose text contains `query`, allowing a few typos for
+        longer queries. Returns [(doc_id, edits), ...] best first
+        (0 = exact substring), or None if the query is too short to index
+        or another request is building the index.
+        """
+        q = normalize(query)
+        if len(q) < 3:
+            return None
+        if not TrigramIndex._is_built(db, user_id, kind):
+            if TrigramIndex._claim_build(db, user_id, kind, rebuild=False):
+                TrigramIndex._build(db, user_id, kind)
+            elif not TrigramIndex._is_built(db, user_id, kind):
+                return None
+
+        cfg = _get_config()
+        max_edits = 0
+        if cfg.get("fuzzy", True) and len(q) >= int(cfg.get("fuzzy_min_length", 4)):
+            max_edits = 1 if len(q) < 8 else int(cfg.get("max_edits", 2))
+
+        grams = sorted(trigrams(q))
+        if len(grams) < 2:
+            max_edits = 0
+        if max_edits == 0:
+            cursor = db[_DOCS].find(
+                {"user_id": user_id, "kind": kind, "grams": {"$all": grams}},
+                {"_id": 0, "doc_id": 1, "text": 1},
+            )
+        else:
+            # Each edit destroys at most 3 of the query's trigrams; a single
+            # shared one would make nearly every document a candidate
+            min_shared = max(2, len(grams) - 3 * max_edits)
+            cursor = db[_DOCS].aggregate([
+                {"$match": {"user_id": user_id, "kind": kind, "grams": {"$in": grams}}},
+                {"$project": {"_id": 0, "doc_id": 1, "text": 1,
+                              "shared": {"$size": {"$setIntersection": ["$grams", grams]}}}},
+                {"$match": {"shared": {"$gte": min_shared}}},
+                {"$sort": {"shared": -1, "doc_id": 1}},
+                {"$limit": int(cfg.get("fuzzy_candidates", 500))},
+            ])
+
+        hits = {}
+        for row in cursor:
+            edits = 0 if q in row["text"] else substring_distance(q, row["text"], max_edits)
+            if edits <= max_edits:
+                hits[row["doc_id"]] = edits
+        for doc_id in TrigramIndex._match_truncated(db, user_id, kind, q, hits):
+            hits[doc_id] = 0
+        return sorted(hits.items(), key=lambda h: (h[1], h[0]))
+
+    @staticmethod
+    def _match_truncated(db, user_id: str, kind: str, q: str, hits: dict) -> list:
+        """Ids of truncated documents (not in `hits`) whose full text contains `q`."""
+        long_ids = [
+            row["doc_id"]
+            for row in db[_DOCS].find({"user_id": user_id, "kind": kind, "truncated": True},
+                                      {"_id": 0, "doc_id": 1})
+            if row["doc_id"] not in hits
+        ]
+        if not long_ids:
+            return []
+        coll_name, id_field, fields = _SOURCES[kind]
+        # q is normalized: any whitespace run in the source matches its single spaces
+        pattern = r"\s+".join(re.escape(word) for word in q.split(" "))
+        return [
+            doc[id_field]
+            for doc in db[coll_name].find(
+                {"user_id": user_id, id_field: {"$in": long_ids},
+                 "$or": [{f: {"$regex": pattern, "$options": "i"}} for f in fields]},
+                {"_id": 0, id_field: 1},
+            )
+        ]
@@ -0,0 +1,191 @@
+"""
+core/write_buffer.py — Write-Behind Buffer for Note Autosaves
+===============================================================
+While someone types, the editor autosaves many times a second. With the
+buffer enabled, content-only saves (PUT content / PATCH ops) update an
+in-memory copy of the note's content fields instead of MongoDB; they are
+written with a single update_one once the note has been quiet for
+`window_ms` (or after `max_delay_ms` at the latest).
+
+Disabled by default — enable in configs/app_config.yaml:
+
+    performance:
+      note_write_buffer:
+        enabled: true
+
+Only content fields are buffered (content, stats, content_version,
+last_updated), so metadata writes (rename, move, archive...) never conflict.
+
+Consistency:
+  - get_note / patch_note_content overlay the buffered fields on the stored note
+  - a content write that bypasses the buffer flushes the note first;
+    delete discards it; get_notes (content search) flushes the user's notes
+  - flush_all() runs at interpreter exit (atexit)
+  - an entry is removed only after its write landed (and only if no newer
+    put replaced it), so readers never fall back to the older stored note
+
+The buffer is per process: run a single worker when it is enabled.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+
+from core.config_loader import load_yaml
+from core.note_bodies import NoteBodyStore
+
+logger = logging.getLogger(__name__)
+
+_entries = {}                 # (user_id, note_id) → {"db", "fields", "first_at", "last_at"}
+_lock = threading.RLock()
+_flush_locks = [threading.Lock() for _ in range(64)]   # striped by key: one flush per note at a time
+_worker = None
+
+BUFFERED_FIELDS = ("content", "word_count", "char_count", "read_time_min", "content_version", "last_updated")
+
+
+def _get_config() -> dict:
+    """Load write buffer settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("note_write_buffer", {}) or {}
+
+
+class NoteWriteBuffer:
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return bool(_get_config().get("enabled", False))
+
+    @staticmethod
+    def get(user_id: str, note_id: str):
+        """Copy of the buffered content fields, or None if nothing is pending."""
+        with _lock:
+            entry = _entries.get((user_id, note_id))
+            return dict(entry["fields"]) if entry else None
+
+    @staticmethod
+    def pending(user_id: str) -> dict:
+        """{note_id: copy of the buffered fields} for one user's pending edits."""
+        with _lock:
+            return {k[1]: dict(e["fields"]) for k, e in _entries.items() if k[0] == user_id}
+
+    @staticmethod
+    def put(db, user_id: str, note_id: str, note: dict, base_version: int = None) -> bool:
+        """
+        Buffer the content fields of `note` (the stored note with the edit
+        applied). With base_version, the put is refused (False) if another
+        request buffered a different version in the meantime.
+        """
+        now = time.monotonic()
+        with _lock:
+            entry = _entries.get((user_id, note_id))
+            if entry and base_version is not None and \
+                    entry["fields"].get("content_version", 0) != base_version:
+                return False
+            _entries[(user_id, note_id)] = {
+                "db": db,
+                "fields": {f: note[f] for f in BUFFERED_FIELDS if f in note},
+                "first_at": entry["first_at"] if entry else now,
+                "last_at": now,
+            }
+        _ensure_worker()
+        return True
+
+    @staticmethod
+    def discard(user_id: str, note_id: str):
+        with _lock:
+            _entries.pop((user_id, note_id), None)
+
+    @staticmethod
+    def flush(user_id: str, note_id: str):
+        """
+        Write one note's pending content now (no-op if nothing is buffered).
+        The entry stays readable until the write has landed, and is dropped
+        only if no newer put replaced it meanwhile — a failed write leaves
+        it for the next flush.
+        """
+        key = (user_id, note_id)
+        with _flush_locks[hash(key) % len(_flush_locks)]:
+            with _lock:
+                entry = _entries.get(key)
+            if not entry:
+                return
+            _write(user_id, note_id, entry)
+            with _lock:
+                if _entries.get(key) is entry:
+                    del _entries[key]
+
+    @staticmethod
+    def flush_user(user_id: str):
+        with _lock:
+            keys = [k for k in _entries if k[0] == user_id]
+        for key in keys:
+            NoteWriteBuffer.flush(*key)
+
+    @staticmethod
+    def flush_all():
+        with _lock:
+            keys = list(_entries)
+        for key in keys:
+            try:
+                NoteWriteBuffer.flush(*key)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.exception("Flushing note %s failed: %s", key, exc)
+
+
+def _write(user_id: str, note_id: str, entry: dict):
+    """One update_one carrying every change merged into the entry."""
+    db = entry["db"]
+    fields = dict(entry["fields"])
+    set_fields, unset_fields, rev = NoteBodyStore.store(db, user_id, note_id, fields.pop("content", ""))
+    update = {"$set": {**fields, **set_fields, "modified_at": datetime.now()}}
+    if unset_fields:
+        update["$unset"] = unset_fields
+    if "last_updated" in fields:
+        # A metadata write (rename, pin...) since the last edit keeps its newer timestamp
+        update["$max"] = {"last_updated": update["$set"].pop("last_updated")}
+    result = db.notes.update_one({"user_id": user_id, "note_id": note_id}, update)
+    if rev is not None:
+        if result.matched_count:
+            NoteBodyStore.prune(db, user_id, note_id, rev)
+        else:
+            NoteBodyStore.discard(db, user_id, note_id, rev)
+    # Imported lazily — core/writing.py imports both modules
+    from core.search_index import NoteSearchIndex
+    NoteSearchIndex.reindex(db, user_id, note_id)
+
+
+def _flush_due():
+    cfg = _get_config()
+    window = float(cfg.get("window_ms", 750)) / 1000
+    max_delay = float(cfg.get("max_delay_ms", 3000)) / 1000
+    now = time.monotonic()
+    with _lock:
+        due = [k for k, e in _entries.items()
+               if now - e["last_at"] >= window or now - e["first_at"] >= max_delay]
+    for key in due:
+        try:
+            NoteWriteBuffer.flush(*key)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Flushing note %s failed: %s", key, exc)
+
+
+def _worker_loop():
+    interval = max(float(_get_config().get("window_ms", 750)) / 2000, 0.05)
+    while True:
+        time.sleep(interval)
+        _flush_due()
+
+
+def _ensure_worker():
+    global _worker
+    with _lock:
+        if _worker is not None:
+            return
+        _worker = threading.Thread(target=_worker_loop, name="note-write-buffer", daemon=True)
+        _worker.start()
+
+
+atexit.register(NoteWriteBuffer.flush_all)
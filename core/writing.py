@@ -18,25 +18,152 @@ Changelog (V1.1 — 2026-04-29):
   - F4: update_note() supports is_favorite field
   - F5: search_notes() — full-text search across all projects
   - F6: duplicate_note() — clone a note within the same project
+
+V1.3 (Performance):
+  - get_structure() projects tree fields only (no note content)
+  - get_structure_delta() — ?since= sync: rows whose modified_at moved
+    plus tombstones (writing_tombstones) for deletes
+  - word_count / char_count / read_time_min stored on the note whenever
+    content changes; _recount_stats() updates them from a local edit window
+  - save_quick_note() appends one entry (core/quick_notes.py) instead of
+    rewriting QuickNote.txt; the editor pages through them below the note
+  - patch_note_content() — autosave sends insert/delete ops against a
+    content_version (or hash) and gets back only the new version + stats;
+    on stored bodies it reads and rewrites only the chunks around the ops
+  - content-only saves go through core/write_buffer.py when
+    performance.note_write_buffer is enabled (coalesced into one update_one)
+  - _unique_filename() finds every colliding "<title> (n).txt" in one
+    anchored-regex query instead of one find_one per suffix
+  - search_notes() / get_notes(search=) rank through the BM25 inverted
+    index in core/search_index.py (kept in sync on every note write)
+  - search_notes() adds substring / typo matches on title + tags from the
+    trigram index in core/trigram_index.py
+  - note bodies can live in core/note_bodies.py (chunked, compressed);
+    only get_note / quick note / duplicate load them, lists get `excerpt`
+  - get_note(include_content=False | content_limit=n) and
+    get_note_content() — metadata-only and character-range reads, so large
+    notes render their first screen before the rest arrives
 """
 
+import hashlib
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 from uuid import uuid4
 
-from pymongo import UpdateOne
+from pymongo import ASCENDING, UpdateOne
 
 from core.config_loader import load_yaml
+from core.note_bodies import NoteBodyStore
+from core.quick_notes import ENTRY_SEPARATOR, QuickNoteStore, format_entry
 from core.schema_factory import build_document
+from core.search_index import NoteSearchIndex
+from core.trigram_index import TrigramIndex
+from core.write_buffer import NoteWriteBuffer
 from core.utils import serialize_datetime
 
 
+_TOMBSTONES = "writing_tombstones"
+
+_QUICK_NOTE_FILENAME = "QuickNote.txt"
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+# Stats persisted on each note document (see _compute_stats)
+_STATS_FIELDS = ("word_count", "char_count", "read_time_min")
+
+# Note fields that feed the search index
+_SEARCH_FIELDS = {"title", "tags", "description", "content"}
+
+# _recount_stats() gives up and recounts everything past this window size
+_RECOUNT_MAX_WINDOW = 4096
+
+# Fields the sidebar tree needs — never the note content
+_NOTE_TREE_PROJECTION = {
+    "_id": 0, "note_id": 1, "title": 1, "filename": 1, "status": 1, "tags": 1,
+    "description": 1, "project_id": 1, "order": 1, "pinned": 1, "is_favorite": 1,
+    "created_at": 1, "last_updated": 1, "archived": 1,
+}
+
+
+class _OutsideWindow(Exception):
+    """A _TextWindow was read past the part of the content it holds."""
+
+
+class _TextWindow:
+    """
+    Characters [origin, origin + len(text)) of a note's content, addressed
+    by offsets into the whole content (`total` characters). Supports what
+    _apply_ops() and _recount_stats() read; anything that needs the rest
+    of the content raises _OutsideWindow.
+    """
+
+    def __init__(self, text: str, origin: int = 0, total: int = None):
+        self.text = text
+        self.origin = origin
+        self.total = len(text) if total is None else total
+
+    def __len__(self):
+        return self.total
+
+    def _local(self, start: int, end: int) -> tuple:
+        if start < self.origin or end > self.origin + len(self.text):
+            raise _OutsideWindow
+        return start - self.origin, end - self.origin
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            a, b = self._local(*key.indices(self.total)[:2])
+            return self.text[a:b]
+        a, _ = self._local(key, key + 1)
+        return self.text[a]
+
+    def find(self, sub: str, start: int, end: int = None) -> int:
+        end = self.total if end is None else end
+        if start < self.origin:
+            raise _OutsideWindow
+        i = self.text.find(sub, start - self.origin, end - self.origin)
+        if i == -1 and end > self.origin + len(self.text):
+            raise _OutsideWindow
+        return i if i == -1 else i + self.origin
+
+    def rfind(self, sub: str, start: int, end: int) -> int:
+        if end > self.origin + len(self.text):
+            raise _OutsideWindow
+        i = self.text.rfind(sub, max(start - self.origin, 0), end - self.origin)
+        if i == -1 and start < self.origin:
+            raise _OutsideWindow
+        return i if i == -1 else i + self.origin
+
+    def splice(self, start: int, end: int, new_text: str):
+        a, b = self._local(start, end)
+        self.text = self.text[:a] + new_text + self.text[b:]
+        self.total += len(new_text) - (end - start)
+
+
 def _get_system_project_id() -> str:
     """Get system project ID from config."""
     config = load_yaml("app_config.yaml")
     return config.get("constants", {}).get("system_project_id", "system")
 
 
+def _get_sync_config() -> dict:
+    """Load delta sync settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("writing_sync", {}) or {}
+
+
+def _get_range_config() -> dict:
+    """Load content range settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("note_ranges", {}) or {}
+
+
+def _get_search_config() -> dict:
+    """Load note search settings from app_config.yaml (cached)."""
+    config = load_yaml("app_config.yaml")
+    return config.get("performance", {}).get("search_index", {}) or {}
+
+
 class WritingService:
 
     # ──────────────────────────────────────────────
@@ -55,13 +182,160 @@ class WritingService:
         reading time (at 200 wpm average).
         F1: Word Count & Reading Time.
         """
-        plain = re.sub(r"<[^>]+>", "", content or "")
+        plain = _TAG_RE.sub("", content or "")
         plain = plain.strip()
         words = len(plain.split()) if plain else 0
         chars = len(plain)
         read_min = max(1, round(words / 200))
         return {"word_count": words, "char_count": chars, "read_time_min": read_min}
 
+    @staticmethod
+    def _stats_of(note: dict) -> dict:
+        """Stored stats of a note document; computed for notes not yet backfilled."""
+        if all(f in note for f in _STATS_FIELDS):
+            return {f: note[f] for f in _STATS_FIELDS}
+        return WritingService._compute_stats(note.get("content", ""))
+
+    @staticmethod
+    def _recount_stats(content: str, stats: dict, start: int, end: int, new_text: str) -> dict:
+        """
+        Stats after replacing content[start:end] with new_text, given the
+        stats of `content`. Only a window around the edit — widened to
+        visible whitespace on both sides — is re-counted; anything that can
+        shift tag boundaries or the document edges falls back to a full count.
+        """
+        def _full():
+            return WritingService._compute_stats(content[:start] + new_text + content[end:])
+
+        removed = content[start:end]
+        if "<" in new_text or ">" in new_text or "<" in removed or ">" in removed:
+            return _full()
+
+        def _in_tag(pos):
+            # is content[pos] removed by _TAG_RE? (a match runs from "<" to the next ">")
+            g = content.rfind(">", 0, pos)
+            if content[pos] == ">":
+                a = content.find("<", g + 1, pos)
+                return a != -1 and pos - a >= 2
+            a = content.find("<", g + 1, pos + 1)
+            h = content.find(">", pos)
+            return a != -1 and h != -1 and h - a >= 2
+
+        def _boundary(pos):
+            return content[pos].isspace() and not _in_tag(pos)
+
+        def _visible(pos, step):
+            # any counted character between pos and the document edge?
+            for _ in range(_RECOUNT_MAX_WINDOW):
+                if not 0 <= pos < len(content):
+                    return False
+                if not content[pos].isspace() and not _in_tag(pos):
+                    return True
+                pos += step
+            return False
+
+        lo = start
+        while lo > 0 and not _boundary(lo - 1):
+            lo -= 1
+            if start - lo > _RECOUNT_MAX_WINDOW:
+                return _full()
+        hi = end
+        while hi < len(content) and not _boundary(hi):
+            hi += 1
+            if hi - end > _RECOUNT_MAX_WINDOW:
+                return _full()
+
+        # strip() at the document edges would change what the window counts
+        if lo == 0 or hi == len(content) or not _visible(lo - 1, -1) or not _visible(hi, 1):
+            return _full()
+
+        old_plain = _TAG_RE.sub("", content[lo:hi])
+        new_plain = _TAG_RE.sub("", content[lo:start] + new_text + content[end:hi])
+        words = stats["word_count"] + len(new_plain.split()) - len(old_plain.split())
+        chars = stats["char_count"] + len(new_plain) - len(old_plain)
+        return {"word_count": words, "char_count": chars, "read_time_min": max(1, round(words / 200))}
+
+    @staticmethod
+    def backfill_stats(db, user_id: str = None, batch_size: int = 500) -> int:
+        """
+        Migration: store stats on notes created before they were persisted.
+        Processes notes in batches (one bulk_write each). Returns notes updated.
+        """
+        query = {"word_count": {"$exists": False}}
+        if user_id:
+            query["user_id"] = user_id
+        cursor = db.notes.find(query, {"_id": 1, "user_id": 1, "note_id": 1, "content": 1, "body_rev": 1})
+
+        updated, ops = 0, []
+        for note in cursor:
+            content = NoteBodyStore.load(db, note["user_id"], note)
+            ops.append(UpdateOne(
+                {"_id": note["_id"]},
+                {"$set": WritingService._compute_stats(content)},
+            ))
+            if len(ops) >= batch_size:
+                db.notes.bulk_write(ops, ordered=False)
+                updated += len(ops)
+                ops = []
+        if ops:
+            db.notes.bulk_write(ops, ordered=False)
+            updated += len(ops)
+        return updated
+
+    @staticmethod
+    def _add_tombstones(db, user_id: str, kind: str, ids: list):
+        """Record deletes so ?since= clients can drop them (kind: "note" | "project")."""
+        if ids:
+            now = datetime.now()
+            db[_TOMBSTONES].insert_many([
+                {"user_id": user_id, "kind": kind, "id": i, "deleted_at": now} for i in ids
+            ])
+
+    @staticmethod
+    def ensure_indexes(db):
+        """Tombstone lookups by user + time; TTL drops them after the retention window."""
+        days = int(_get_sync_config().get("tombstone_retention_days", 30))
+        coll = db[_TOMBSTONES]
+        coll.create_index([("user_id", ASCENDING), ("deleted_at", ASCENDING)])
+        coll.create_index("deleted_at", expireAfterSeconds=days * 86400, name="deleted_at_ttl")
+
+    @staticmethod
+    def sync_token() -> str:
+        """Current server time, handed to clients as the next ?since= value."""
+        return datetime.now().isoformat()
+
+    @staticmethod
+    def _tree_note(note: dict) -> dict:
+        """Sidebar entry for a note (raw datetimes — serialized after sorting)."""
+        return {
+            "note_id": note.get("note_id"),
+            "title": note.get("title", ""),
+            "filename": note.get("filename", ""),
+            "status": note.get("status", "draft"),
+            "tags": note.get("tags") or [],
+            "description": note.get("description") or "",
+            "project_id": note.get("project_id"),
+            "order": note.get("order", 999),
+            "pinned": note.get("pinned", False),
+            "is_favorite": note.get("is_favorite", False),
+            "_created_at_raw": note.get("created_at"),
+            "_last_updated_raw": note.get("last_updated"),
+        }
+
+    @staticmethod
+    def _serialize_tree_note(n: dict) -> dict:
+        n["created_at"] = WritingService._date_ser(n.pop("_created_at_raw", None))
+        n["last_updated"] = WritingService._date_ser(n.pop("_last_updated_raw", None))
+        return n
+
+    @staticmethod
+    def _tree_project(project: dict) -> dict:
+        return {
+            **project,
+            "tags": project.get("tags") or [],
+            "description": project.get("description") or "",
+        }
+
     @staticmethod
     def _unique_filename(db, user_id: str, project_id: str, base_title: str,
                          exclude_note_id: str = None) -> str:
@@ -70,21 +344,42 @@ class WritingService:
         Appends (2), (3)... if a collision is found.
         Optionally excludes a note_id (for rename on self).
         """
-        base = base_title.replace(".txt", "")
-        candidate = f"{base}.txt"
-        counter = 2
-        while True:
-            query = {
-                "user_id": user_id,
-                "project_id": project_id,
-                "filename": candidate,
-            }
-            if exclude_note_id:
-                query["note_id"] = {"$ne": exclude_note_id}
-            if not db.notes.find_one(query):
-                return candidate
-            candidate = f"{base} ({counter}).txt"
-            counter += 1
+        return WritingService._unique_filenames(
+            db, user_id, project_id, [base_title], exclude_note_id
+        )[0]
+
+    @staticmethod
+    def _unique_filenames(db, user_id: str, project_id: str, base_titles: list,
+                          exclude_note_id: str = None) -> list:
+        """
+        Resolve unique filenames for several titles with one query: an
+        anchored regex fetches every "<base>.txt" / "<base> (n).txt" already
+        in the project and the free suffixes are picked in memory, so titles
+        repeated within the batch get distinct names too.
+        """
+        bases = [t.replace(".txt", "") for t in base_titles]
+        if not bases:
+            return []
+        alternatives = "|".join(re.escape(b) for b in dict.fromkeys(bases))
+        query = {
+            "user_id": user_id,
+            "project_id": project_id,
+            "filename": {"$regex": f"^(?:{alternatives})(?: \\(\\d+\\))?\\.txt$"},
+        }
+        if exclude_note_id:
+            query["note_id"] = {"$ne": exclude_note_id}
+        taken = {d["filename"] for d in db.notes.find(query, {"_id": 0, "filename": 1})}
+
+        result = []
+        for base in bases:
+            candidate = f"{base}.txt"
+            counter = 2
+            while candidate in taken:
+                candidate = f"{base} ({counter}).txt"
+                counter += 1
+            taken.add(candidate)
+            result.append(candidate)
+        return result
 
     # ──────────────────────────────────────────────
     #  System Project
@@ -103,6 +398,7 @@ class WritingService:
                 "archived": False,
                 "is_system": True,
                 "order": 0,
+                "modified_at": datetime.now(),
             })
 
     # ──────────────────────────────────────────────
@@ -171,7 +467,7 @@ class WritingService:
         if existing:
             return None, "Project with this name already exists", 409
 
-        update_data = {"name": name}
+        update_data = {"name": name, "modified_at": datetime.now()}
         if "description" in data:
             update_data["description"] = (data.get("description") or "").strip()
         if "tags" in data and isinstance(data["tags"], list):
@@ -199,7 +495,12 @@ class WritingService:
         if result.deleted_count == 0:
             return False, "Project not found", 404
 
+        note_ids = db.notes.distinct("note_id", {"user_id": user_id, "project_id": project_id})
         db.notes.delete_many({"user_id": user_id, "project_id": project_id})
+        WritingService._add_tombstones(db, user_id, "project", [project_id])
+        NoteSearchIndex.remove_notes(db, user_id, note_ids)
+        TrigramIndex.remove(db, user_id, "note", note_ids)
+        NoteBodyStore.delete(db, user_id, note_ids)
         return True, None, 200
 
     @staticmethod
@@ -210,10 +511,11 @@ class WritingService:
         if not isinstance(project_ids, list):
             return False, "project_ids array required", 400
 
+        now = datetime.now()
         ops = [
             UpdateOne(
                 {"user_id": user_id, "project_id": pid},
-                {"$set": {"order": idx}}
+                {"$set": {"order": idx, "modified_at": now}}
             )
             for idx, pid in enumerate(project_ids)
             if pid != system_id
@@ -229,14 +531,22 @@ class WritingService:
         if project_id == system_id:
             return None, "System project cannot be archived", 403
 
+        now = datetime.now()
         result = db.note_projects.update_one(
             {"user_id": user_id, "project_id": project_id},
-            {"$set": {"archived": archived}}
+            {"$set": {"archived": archived, "modified_at": now}}
         )
 
         if result.matched_count == 0:
             return None, "Project not found", 404
 
+        if not archived:
+            # Delta clients dropped this project's notes when it was archived
+            db.notes.update_many(
+                {"user_id": user_id, "project_id": project_id},
+                {"$set": {"modified_at": now}}
+            )
+
         updated = db.note_projects.find_one({"user_id": user_id, "project_id": project_id}, {"_id": 0})
         return updated, None, 200
 
@@ -244,6 +554,15 @@ class WritingService:
     #  Notes — Structure
     # ──────────────────────────────────────────────
 
+    @staticmethod
+    def _note_sort_key(n):
+        # pinned notes always float to the top
+        pinned = 0 if n.get("pinned") else 1
+        o = n.get("order", 999)
+        lu = n.get("_last_updated_raw")
+        ts = lu.timestamp() if isinstance(lu, datetime) else 0
+        return (pinned, o, -ts)
+
     @staticmethod
     def get_structure(db, user_id):
         WritingService.ensure_system_project(db, user_id)
@@ -261,17 +580,13 @@ class WritingService:
 
         projects.sort(key=_project_sort_key)
 
-        notes = list(db.notes.find({"user_id": user_id, "archived": {"$ne": True}}, {"_id": 0}))
+        # Tree fields only — note content never leaves the database here
+        notes = db.notes.find({"user_id": user_id, "archived": {"$ne": True}}, _NOTE_TREE_PROJECTION)
 
         structure = {}
         for project in projects:
-            pid = project["project_id"]
-            structure[pid] = {
-                "project": {
-                    **project,
-                    "tags": project.get("tags") or [],
-                    "description": project.get("description") or "",
-                },
+            structure[project["project_id"]] = {
+                "project": WritingService._tree_project(project),
                 "notes": []
             }
 
@@ -279,51 +594,84 @@ class WritingService:
             project_id = note.get("project_id")
             if project_id and project_id in structure:
                 # B1: keep raw datetime for sort key; serialize afterwards
-                structure[project_id]["notes"].append({
-                    "note_id": note.get("note_id"),
-                    "title": note.get("title", ""),
-                    "filename": note.get("filename", ""),
-                    "status": note.get("status", "draft"),
-                    "tags": note.get("tags") or [],
-                    "description": note.get("description") or "",
-                    "project_id": project_id,
-                    "order": note.get("order", 999),
-                    "pinned": note.get("pinned", False),
-                    "is_favorite": note.get("is_favorite", False),
-                    # raw datetimes — used for sorting below, serialized after
-                    "_created_at_raw": note.get("created_at"),
-                    "_last_updated_raw": note.get("last_updated"),
-                })
+                structure[project_id]["notes"].append(WritingService._tree_note(note))
 
         # B1 FIX: sort BEFORE serializing datetimes
-        def _note_sort_key(n):
-            # pinned notes always float to the top
-            pinned = 0 if n.get("pinned") else 1
-            o = n.get("order", 999)
-            lu = n.get("_last_updated_raw")
-            ts = lu.timestamp() if isinstance(lu, datetime) else 0
-            return (pinned, o, -ts)
-
         for pid in structure:
-            structure[pid]["notes"].sort(key=_note_sort_key)
+            structure[pid]["notes"].sort(key=WritingService._note_sort_key)
             for n in structure[pid]["notes"]:
-                # serialize now (after sort)
-                n["created_at"] = WritingService._date_ser(n.pop("_created_at_raw", None))
-                n["last_updated"] = WritingService._date_ser(n.pop("_last_updated_raw", None))
+                WritingService._serialize_tree_note(n)
 
         return structure
 
+    @staticmethod
+    def get_structure_delta(db, user_id, since: str):
+        """
+        Changes since a previous sync token (?since=).
+
+        Returns ({"full": False, "projects": [...], "notes": [...],
+                  "deleted": {"projects": [...], "notes": [...]},
+                  "sync_token": "..."}, error, code).
+        Changed rows carry `archived` — archived ones are to be removed
+        client-side, like deleted ones. A token older than the tombstone
+        retention window gets {"full": True, "structure": {...}} instead.
+        """
+        try:
+            since_dt = datetime.fromisoformat(since)
+        except (TypeError, ValueError):
+            return None, "Invalid since — expected an ISO timestamp", 400
+
+        cfg = _get_sync_config()
+        token = WritingService.sync_token()
+        retention = timedelta(days=int(cfg.get("tombstone_retention_days", 30)))
+        if datetime.fromisoformat(token) - since_dt > retention:
+            structure = WritingService.get_structure(db, user_id)
+            return {"full": True, "structure": structure, "sync_token": token}, None, 200
+
+        changed_since = since_dt - timedelta(seconds=float(cfg.get("overlap_sec", 2)))
+        changed = {"user_id": user_id, "modified_at": {"$gte": changed_since}}
+
+        projects = [
+            WritingService._tree_project(p)
+            for p in db.note_projects.find(changed, {"_id": 0})
+        ]
+        notes = []
+        for note in db.notes.find(changed, _NOTE_TREE_PROJECTION):
+            entry = WritingService._serialize_tree_note(WritingService._tree_note(note))
+            entry["archived"] = bool(note.get("archived", False))
+            notes.append(entry)
+
+        deleted = {"projects": [], "notes": []}
+        for t in db[_TOMBSTONES].find(
+            {"user_id": user_id, "deleted_at": {"$gte": changed_since}},
+            {"_id": 0, "kind": 1, "id": 1},
+        ):
+            deleted[f"{t['kind']}s"].append(t["id"])
+
+        return {
+            "full": False,
+            "projects": projects,
+            "notes": notes,
+            "deleted": deleted,
+            "sync_token": token,
+        }, None, 200
+
     # ──────────────────────────────────────────────
     #  Notes — CRUD
     # ──────────────────────────────────────────────
 
     @staticmethod
     def get_notes(db, user_id, project_id=None, status=None,
-                  search=None, include_archived=False):
+                  search=None, include_archived=False, limit=None):
         """
         Q1: Supports filtering by project, status, search query,
-        and archived state.
+        and archived state. A search returns at most `limit` notes
+        (default performance.search_index.max_results), best first.
         """
+        pending = NoteWriteBuffer.pending(user_id)
+        if search and pending:
+            # Content search must see autosaves still sitting in the write buffer
+            NoteWriteBuffer.flush_user(user_id)
         query = {"user_id": user_id}
 
         if not include_archived:
@@ -336,25 +684,131 @@ class WritingService:
             query["status"] = status
 
         if search and len(search.strip()) >= 2:
+            if limit is None:
+                limit = int(_get_search_config().get("max_results", 100))
+            limit = max(int(limit), 1)
+            ranked = NoteSearchIndex.search(db, user_id, search) if NoteSearchIndex.is_enabled() else None
+            if ranked is not None:
+                return WritingService._ranked_notes(db, query, ranked, search, limit)
+            pattern = re.escape(search.strip())
             query["$or"] = [
-                {"title": {"$regex": search.strip(), "$options": "i"}},
-                {"content": {"$regex": search.strip(), "$options": "i"}},
-                {"tags": {"$elemMatch": {"$regex": search.strip(), "$options": "i"}}},
+                {"title": {"$regex": pattern, "$options": "i"}},
+                {"content": {"$regex": pattern, "$options": "i"}},
+                {"tags": {"$elemMatch": {"$regex": pattern, "$options": "i"}}},
             ]
+        else:
+            limit = None
+
+        # Bodies stay in the database — list views use `excerpt`
+        cursor = db.notes.find(query, {"_id": 0, "content": 0}).sort("last_updated", -1)
+        notes = list(cursor.limit(limit) if limit else cursor)
+        if pending and not search:
+            # Unflushed autosaves: their stats and version, not the body
+            for note in notes:
+                fields = pending.get(note["note_id"], {})
+                fields.pop("content", None)
+                note.update(fields)
+        return notes
 
-        return list(db.notes.find(query, {"_id": 0}).sort("last_updated", -1))
+    @staticmethod
+    def get_note(db, user_id, note_id, include_content=True, content_limit=None):
+        """
+        One note with its content. include_content=False returns metadata
+        only; content_limit=n returns just the first n characters — the rest
+        comes from get_note_content(), starting at `next_offset`.
+        """
+        if include_content and content_limit is None:
+            note = db.notes.find_one({"user_id": user_id, "note_id": note_id}, {"_id": 0})
+            if not note:
+                return None, "Note not found", 404
+            WritingService._overlay_buffered(user_id, note)
+            note["content"] = NoteBodyStore.load(db, user_id, note)
+            note["content_length"] = len(note["content"])
+        else:
+            limit = max(int(content_limit), 0) if include_content else 0
+            note = WritingService._find_note_range(db, user_id, note_id, 0, limit)
+            if not note:
+                return None, "Note not found", 404
+            WritingService._overlay_buffered(user_id, note)
+            text, total = WritingService._note_range(db, user_id, note, 0, limit)
+            note["content_length"] = total
+            if include_content:
+                note.update(content=text, next_offset=len(text) if len(text) < total else None)
+        # F1: attach stats (stored on write — no recount on read)
+        note["stats"] = WritingService._stats_of(note)
+        return note, None, 200
 
     @staticmethod
-    def get_note(db, user_id, note_id):
-        note = db.notes.find_one(
-            {"user_id": user_id, "note_id": note_id},
-            {"_id": 0}
-        )
+    def get_note_content(db, user_id, note_id, offset=0, limit=None, chunk=None, version=None):
+        """
+        A slice of a note's content, by character offset (offset + limit) or
+        by page (chunk n = characters [n * limit, (n + 1) * limit)).
+        With `version`, answers 409 once the content has changed since the
+        first slice, so a client never stitches two versions together.
+
+        Returns ({"note_id", "offset", "content", "content_length",
+        "next_offset", "content_version"}, error, code).
+        """
+        cfg = _get_range_config()
+        max_limit = int(cfg.get("max_chars", 1048576))
+        if limit is None:
+            limit = int(cfg.get("default_chars", 65536))
+        if limit < 1 or limit > max_limit:
+            return None, f"limit must be between 1 and {max_limit}", 400
+        if chunk is not None:
+            if chunk < 0:
+                return None, "chunk must be >= 0", 400
+            offset = chunk * limit
+        offset = offset or 0
+        if offset < 0:
+            return None, "offset must be >= 0", 400
+
+        note = WritingService._find_note_range(db, user_id, note_id, offset, limit)
         if not note:
             return None, "Note not found", 404
-        # F1: attach stats
-        note["stats"] = WritingService._compute_stats(note.get("content", ""))
-        return note, None, 200
+        WritingService._overlay_buffered(user_id, note)
+        current = note.get("content_version", 0)
+        if version is not None and version != current:
+            return {"content_version": current}, "Content changed since the first range", 409
+
+        text, total = WritingService._note_range(db, user_id, note, offset, limit)
+        end = offset + len(text)
+        return {
+            "note_id": note_id,
+            "offset": offset,
+            "content": text,
+            "content_length": total,
+            "next_offset": end if end < total else None,
+            "content_version": current,
+        }, None, 200
+
+    @staticmethod
+    def _find_note_range(db, user_id, note_id, offset: int, limit: int):
+        """
+        The note without its inline `content`, plus `_slice` (characters
+        [offset, offset + limit) of that content) and `_length` — cut in
+        Mongo, so an inline body never crosses the wire whole. `_length` is
+        the stored content_length; only legacy documents count it here.
+        """
+        content = {"$ifNull": ["$content", ""]}
+        pipeline = [
+            {"$match": {"user_id": user_id, "note_id": note_id}},
+            {"$limit": 1},
+            {"$addFields": {
+                "_slice": {"$substrCP": [content, offset, limit]},
+                "_length": {"$ifNull": ["$content_length", {"$strLenCP": content}]},
+            }},
+            {"$project": {"_id": 0, "content": 0}},
+        ]
+        return next(iter(db.notes.aggregate(pipeline)), None)
+
+    @staticmethod
+    def _note_range(db, user_id, note: dict, offset: int, limit: int) -> tuple:
+        """(text, total) for a note from _find_note_range(): buffered edit, stored body or inline slice."""
+        text, total = note.pop("_slice", ""), note.pop("_length", 0)
+        if "content" in note or (note.get("body_rev") and limit):
+            return NoteBodyStore.load_range(db, user_id, note, offset, limit)
+        return text, total
 
     @staticmethod
     def create_note(db, user_id, data):
@@ -386,17 +840,76 @@ class WritingService:
             "is_favorite": False,
         }
         note = build_document("note", note_data, db=db, user_id=user_id)
+        content = note["content"]
+        note.update(WritingService._compute_stats(content))
+        NoteBodyStore.apply(note, *NoteBodyStore.store(db, user_id, note["note_id"], content)[:2])
 
         db.notes.insert_one(note)
         note.pop("_id", None)
+        note["content"] = content
+        NoteSearchIndex.index_note(db, user_id, note)
+        TrigramIndex.index_docs(db, user_id, "note", [note])
         return note, None, 201
 
+    @staticmethod
+    def _content_update(db, user_id, note_id, content: str, fields: dict) -> tuple:
+        """
+        Update operators for a write that replaces the content (body stored
+        through core/note_bodies.py) plus `fields`; bumps content_version.
+        Returns (update, rev) — pass rev to _finish_content_write().
+        """
+        set_fields, unset_fields, rev = NoteBodyStore.store(db, user_id, note_id, content)
+        update = {"$set": {**fields, **set_fields}, "$inc": {"content_version": 1}}
+        if unset_fields:
+            update["$unset"] = unset_fields
+        return update, rev
+
+    @staticmethod
+    def _finish_content_write(db, user_id, note_id, rev, written: bool):
+        """Prune older body revisions, or drop the new one if the write did not match."""
+        if rev is None:
+            return
+        if written:
+            NoteBodyStore.prune(db, user_id, note_id, rev)
+        else:
+            NoteBodyStore.discard(db, user_id, note_id, rev)
+
+    @staticmethod
+    def _overlay_buffered(user_id, note: dict) -> dict:
+        """Apply content fields still pending in the write buffer, if any."""
+        note.update(NoteWriteBuffer.get(user_id, note["note_id"]) or {})
+        return note
+
+    @staticmethod
+    def _buffer_content(db, user_id, note_id, content: str):
+        """Content-only update_note with the write buffer on: one read, no write."""
+        note = db.notes.find_one({"user_id": user_id, "note_id": note_id}, {"_id": 0})
+        if not note:
+            return None, "Note not found", 404
+        WritingService._overlay_buffered(user_id, note)
+        note.update(
+            content=content,
+            last_updated=datetime.now(),
+            content_version=note.get("content_version", 0) + 1,
+            **WritingService._compute_stats(content),
+        )
+        NoteWriteBuffer.put(db, user_id, note_id, note)
+        note["stats"] = WritingService._stats_of(note)
+        return note, None, 200
+
     @staticmethod
     def update_note(db, user_id, note_id, data):
-        update_data = {"last_updated": datetime.now()}
+        if "content" in data and NoteWriteBuffer.is_enabled():
+            if set(data) == {"content"}:
+                return WritingService._buffer_content(db, user_id, note_id, data["content"])
+            # Written directly below — pending autosaves must land first
+            NoteWriteBuffer.flush(user_id, note_id)
+
+        now = datetime.now()
+        update_data = {"last_updated": now, "modified_at": now}
 
         if "content" in data:
-            update_data["content"] = data["content"]
+            update_data.update(WritingService._compute_stats(data["content"]))
 
         # B2 FIX: check filename collision before rename
         if "title" in data:
@@ -436,19 +949,215 @@ class WritingService:
         if "is_favorite" in data:
             update_data["is_favorite"] = bool(data["is_favorite"])
 
-        result = db.notes.update_one(
-            {"user_id": user_id, "note_id": note_id},
-            {"$set": update_data}
-        )
+        update, rev = {"$set": update_data}, None
+        if "content" in data:
+            update, rev = WritingService._content_update(db, user_id, note_id, data["content"], update_data)
+        result = db.notes.update_one({"user_id": user_id, "note_id": note_id}, update)
+        WritingService._finish_content_write(db, user_id, note_id, rev, result.matched_count > 0)
 
         if result.matched_count == 0:
             return None, "Note not found", 404
 
         updated = db.notes.find_one({"user_id": user_id, "note_id": note_id}, {"_id": 0})
+        if "content" in data:
+            updated["content"] = data["content"]
+        WritingService._overlay_buffered(user_id, updated)
+        if "content" in data:
+            NoteSearchIndex.index_note(db, user_id, updated)
+        elif _SEARCH_FIELDS.intersection(update_data):
+            NoteSearchIndex.reindex(db, user_id, note_id)
+        if "title" in update_data or "tags" in update_data:
+            TrigramIndex.index_docs(db, user_id, "note", [updated])
         # F1: attach stats to update response
-        updated["stats"] = WritingService._compute_stats(updated.get("content", ""))
+        updated["stats"] = WritingService._stats_of(updated)
         return updated, None, 200
 
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """sha256 of note content — an alternative base check to content_version."""
+        return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _op_fields(op) -> tuple:
+        """(pos, count, text) of one text op, or (None, None, error)."""
+        if not isinstance(op, dict) or op.get("op") not in ("insert", "delete", "replace"):
+            return None, None, "Each op needs \"op\": insert | delete | replace"
+        pos = op.get("pos")
+        count = 0 if op["op"] == "insert" else op.get("count")
+        text = "" if op["op"] == "delete" else op.get("text")
+        if not isinstance(pos, int) or not isinstance(count, int) or not isinstance(text, str):
+            return None, None, "Invalid op fields (pos/count must be integers, text a string)"
+        return pos, count, text
+
+    @staticmethod
+    def _apply_ops(content, stats: dict, ops: list):
+        """
+        Apply text ops in order; positions are code-point offsets into the
+        content as left by the previous op:
+          {"op": "insert", "pos": i, "text": "..."}
+          {"op": "delete", "pos": i, "count": n}
+          {"op": "replace", "pos": i, "count": n, "text": "..."}
+        `content` is a str, or a _TextWindow holding the part the ops touch
+        (edited in place; raises _OutsideWindow if that part is too small).
+        Returns (content, stats, error).
+        """
+        view = content if isinstance(content, _TextWindow) else _TextWindow(content)
+        for op in ops:
+            pos, count, text = WritingService._op_fields(op)
+            if pos is None:
+                return None, None, text
+            if pos < 0 or count < 0 or pos + count > len(view):
+                return None, None, "Op out of range"
+            stats = WritingService._recount_stats(view, stats, pos, pos + count, text)
+            view.splice(pos, pos + count, text)
+        return (view if view is content else view.text), stats, None
+
+    @staticmethod
+    def _ops_span(ops: list, length: int):
+        """
+        (start, end) of the part of the content the ops change, as offsets
+        into the content before them. None if an op is invalid.
+        """
+        start, tail, size = length, length, length
+        for op in ops:
+            pos, count, text = WritingService._op_fields(op)
+            if pos is None or pos < 0 or count < 0 or pos + count > size:
+                return None
+            start = min(start, pos)
+            tail = min(tail, size - pos - count)
+            size += len(text) - count
+        return start, max(length - tail, start)
+
+    @staticmethod
+    def patch_note_content(db, user_id, note_id, data):
+        """
+        Autosave with text ops instead of the full content.
+
+        Body: {"base_version": n | "base_hash": sha256, "ops": [...]}
+        The ops are applied to the stored content only if it is still at
+        base_version (or hashes to base_hash); otherwise 409 with the
+        current version, and the client falls back to a full PUT. With the
+        write buffer enabled the result is buffered instead of written.
+
+        A body in core/note_bodies.py patched against base_version is edited
+        chunk-wise (_patch_body). Inline content, base_hash checks and the
+        write buffer need the whole text, so those read and rewrite it —
+        for notes too large for that, turn note_bodies on.
+
+        Returns ({"note_id", "content_version", "stats", "last_updated"}, error, code).
+        """
+        ops = data.get("ops")
+        if not isinstance(ops, list):
+            return None, "ops array is required", 400
+        if "base_version" not in data and "base_hash" not in data:
+            return None, "base_version or base_hash is required", 400
+
+        note = db.notes.find_one(
+            {"user_id": user_id, "note_id": note_id},
+            {"_id": 0, "note_id": 1, "content": 1, "body_rev": 1, "body_bytes": 1, "content_length": 1,
+             "content_version": 1, **{f: 1 for f in _STATS_FIELDS}, **{f: 1 for f in _SEARCH_FIELDS}}
+        )
+        if not note:
+            return None, "Note not found", 404
+        WritingService._overlay_buffered(user_id, note)
+
+        version = note.get("content_version", 0)
+        if "content" not in note and "base_hash" not in data and not NoteWriteBuffer.is_enabled():
+            if data["base_version"] != version:
+                return {"content_version": version}, "Content changed since base version", 409
+            patched = WritingService._patch_body(db, user_id, note, ops)
+            if patched is not None:
+                return patched
+
+        content = NoteBodyStore.load(db, user_id, note)
+        stale = ("base_version" in data and data["base_version"] != version) or \
+                ("base_hash" in data and data["base_hash"] != WritingService.content_hash(content))
+        if stale:
+            return {"content_version": version}, "Content changed since base version", 409
+
+        content, stats, error = WritingService._apply_ops(content, WritingService._stats_of(note), ops)
+        if error:
+            return None, error, 400
+
+        now = datetime.now()
+        if NoteWriteBuffer.is_enabled():
+            note.update(content=content, last_updated=now, content_version=version + 1, **stats)
+            if not NoteWriteBuffer.put(db, user_id, note_id, note, base_version=version):
+                return {"content_version": version}, "Content changed since base version", 409
+        else:
+            update, rev = WritingService._content_update(
+                db, user_id, note_id, content, {"last_updated": now, "modified_at": now, **stats}
+            )
+            if not WritingService._write_patch(db, user_id, note_id, version, update, rev):
+                return {"content_version": version}, "Content changed since base version", 409
+            NoteSearchIndex.index_note(db, user_id, {**note, "note_id": note_id, "content": content})
+
+        return {
+            "note_id": note_id,
+            "content_version": version + 1,
+            "stats": stats,
+            "last_updated": WritingService._date_ser(now),
+        }, None, 200
+
+    @staticmethod
+    def _patch_body(db, user_id, note: dict, ops: list):
+        """
+        patch_note_content() on a stored body: read the chunks around the
+        ops (plus the margin _recount_stats() may look at), apply the ops
+        there and write those chunks as a new revision that shares the
+        rest (NoteBodyStore.store_patch). The search index entry is marked
+        stale rather than rebuilt from the full text.
+
+        Returns the patch_note_content() result, or None when the note needs
+        the whole-content path (invalid ops, stats not stored yet, or the
+        recount reaching past the chunks read).
+        """
+        note_id, version = note["note_id"], note.get("content_version", 0)
+        length = note.get("content_length")
+        span = WritingService._ops_span(ops, length) if note.get("body_rev") and length is not None else None
+        if span is None or not all(f in note for f in _STATS_FIELDS):
+            return None
+
+        margin = 2 * _RECOUNT_MAX_WINDOW + 2
+        text, chunk_span = NoteBodyStore.load_span(
+            db, user_id, note, max(span[0] - margin, 0), min(span[1] + margin, length)
+        )
+        window = _TextWindow(text, chunk_span[0], length)
+        try:
+            window, stats, error = WritingService._apply_ops(window, WritingService._stats_of(note), ops)
+        except _OutsideWindow:
+            return None
+        if error:
+            return None, error, 400
+
+        now = datetime.now()
+        set_fields, unset_fields, rev = NoteBodyStore.store_patch(db, user_id, note, chunk_span, window.text)
+        update = {"$set": {"last_updated": now, "modified_at": now, **stats, **set_fields},
+                  "$inc": {"content_version": 1}}
+        if unset_fields:
+            update["$unset"] = unset_fields
+        if not WritingService._write_patch(db, user_id, note_id, version, update, rev):
+            return {"content_version": version}, "Content changed since base version", 409
+        NoteSearchIndex.mark_stale(db, user_id, note_id)
+
+        return {
+            "note_id": note_id,
+            "content_version": version + 1,
+            "stats": stats,
+            "last_updated": WritingService._date_ser(now),
+        }, None, 200
+
+    @staticmethod
+    def _write_patch(db, user_id, note_id, version: int, update: dict, rev) -> bool:
+        """Content update guarded on the version the patch was applied to."""
+        # A concurrent write in between turns this into a 409
+        version_filter = version if version else {"$in": [0, None]}
+        result = db.notes.update_one(
+            {"user_id": user_id, "note_id": note_id, "content_version": version_filter}, update
+        )
+        WritingService._finish_content_write(db, user_id, note_id, rev, result.matched_count > 0)
+        return result.matched_count > 0
+
     @staticmethod
     def move_note(db, user_id, note_id, data):
         target_project_id = data.get("project_id")
@@ -473,9 +1182,10 @@ class WritingService:
         if collision:
             return None, "A note with this filename already exists in the target project", 409
 
+        now = datetime.now()
         db.notes.update_one(
             {"user_id": user_id, "note_id": note_id},
-            {"$set": {"project_id": target_project_id, "last_updated": datetime.now()}}
+            {"$set": {"project_id": target_project_id, "last_updated": now, "modified_at": now}}
         )
         updated = db.notes.find_one({"user_id": user_id, "note_id": note_id}, {"_id": 0})
         return updated, None, 200
@@ -489,10 +1199,11 @@ class WritingService:
         if not project_id or not isinstance(note_ids, list):
             return False, "project_id and note_ids array required", 400
 
+        now = datetime.now()
         ops = [
             UpdateOne(
                 {"user_id": user_id, "project_id": project_id, "note_id": nid},
-                {"$set": {"order": idx}}
+                {"$set": {"order": idx, "modified_at": now}}
             )
             for idx, nid in enumerate(note_ids)
         ]
@@ -502,17 +1213,28 @@ class WritingService:
 
     @staticmethod
     def delete_note(db, user_id, note_id):
-        result = db.notes.delete_one({"user_id": user_id, "note_id": note_id})
-        if result.deleted_count == 0:
+        NoteWriteBuffer.discard(user_id, note_id)
+        deleted = db.notes.find_one_and_delete(
+            {"user_id": user_id, "note_id": note_id},
+            {"_id": 0, "project_id": 1, "filename": 1}
+        )
+        if not deleted:
             return False, "Note not found", 404
+        WritingService._add_tombstones(db, user_id, "note", [note_id])
+        NoteSearchIndex.remove_notes(db, user_id, [note_id])
+        TrigramIndex.remove(db, user_id, "note", [note_id])
+        NoteBodyStore.delete(db, user_id, [note_id])
+        if WritingService._is_quick_note(deleted):
+            QuickNoteStore.purge(db, user_id)
         return True, None, 200
 
     @staticmethod
     def archive_note(db, user_id, note_id, data):
         archived = data.get("archived", True)
+        now = datetime.now()
         result = db.notes.update_one(
             {"user_id": user_id, "note_id": note_id},
-            {"$set": {"archived": archived, "last_updated": datetime.now()}}
+            {"$set": {"archived": archived, "last_updated": now, "modified_at": now}}
         )
         if result.matched_count == 0:
             return False, "Note not found", 404
@@ -525,18 +1247,37 @@ class WritingService:
     @staticmethod
     def search_notes(db, user_id, query: str, limit: int = 20):
         """
-        Full-text search across all non-archived notes.
-        Searches title, tags, and description (not content — too heavy for list).
-        Returns lightweight note cards (no content field).
+        Full-text search across all non-archived notes, ranked by BM25
+        (core/search_index.py) over title, tags, description and content,
+        followed by substring / typo matches on title + tags that the word
+        index missed (core/trigram_index.py, score 0).
+        Returns lightweight note cards (no content field) with a
+        highlighted `snippet` and the `score`.
         """
         if not query or len(query.strip()) < 2:
             return []
 
-        q = query.strip()
+        scope = {"user_id": user_id, "archived": {"$ne": True}}
+        ranked = None
+        if NoteSearchIndex.is_enabled():
+            NoteWriteBuffer.flush_user(user_id)
+            ranked = NoteSearchIndex.search(db, user_id, query)
+        hits = TrigramIndex.search(db, user_id, "note", query) if TrigramIndex.is_enabled() else None
+
+        # None = index off or still being built by another request → $regex below
+        if ranked is not None or hits is not None:
+            ranked = ranked or []
+            seen = {nid for nid, _ in ranked}
+            ranked += [(nid, 0.0) for nid, _ in hits or [] if nid not in seen]
+            results = WritingService._ranked_notes(db, scope, ranked, query, limit)
+            for note in results:
+                note.pop("content", None)  # keep responses fast
+            return results
+
+        q = re.escape(query.strip())
         results = list(db.notes.find(
             {
-                "user_id": user_id,
-                "archived": {"$ne": True},
+                **scope,
                 "$or": [
                     {"title": {"$regex": q, "$options": "i"}},
                     {"description": {"$regex": q, "$options": "i"}},
@@ -547,6 +1288,39 @@ class WritingService:
         ).limit(limit))
         return results
 
+    @staticmethod
+    def _ranked_notes(db, query: dict, ranked: list, search: str, limit: int = None) -> list:
+        """
+        Fetch the notes of a ranked [(note_id, score)] list that also match
+        `query`, best first, each with `snippet` and `score`. Reads in
+        chunks so a limited search stops once it has enough hits; bodies
+        (for the snippets) are loaded only for the notes returned.
+        """
+        scores = dict(ranked)
+        ids = [nid for nid, _ in ranked]
+        step = max(limit * 2, 50) if limit else max(len(ids), 1)
+        results = []
+        for i in range(0, len(ids), step):
+            chunk = ids[i:i + step]
+            found = {
+                n["note_id"]: n
+                for n in db.notes.find({**query, "note_id": {"$in": chunk}}, {"_id": 0})
+            }
+            page = [found[nid] for nid in chunk if nid in found]
+            if limit:
+                page = page[:limit - len(results)]
+            bodies = NoteBodyStore.load_many(db, query["user_id"], page)
+            for note in page:
+                nid = note["note_id"]
+                # Body only feeds the snippet — results carry no content
+                note.pop("content", None)
+                note["snippet"] = NoteSearchIndex.snippet({**note, "content": bodies.get(nid, "")}, search)
+                note["score"] = round(scores[nid], 4)
+                results.append(note)
+            if limit and len(results) >= limit:
+                break
+        return results
+
     # ──────────────────────────────────────────────
     #  F6: Duplicate Note
     # ──────────────────────────────────────────────
@@ -579,6 +1353,11 @@ class WritingService:
     #  Quick Note
     # ──────────────────────────────────────────────
 
+    @staticmethod
+    def _is_quick_note(note: dict) -> bool:
+        return (note.get("project_id") == _get_system_project_id()
+                and note.get("filename") == _QUICK_NOTE_FILENAME)
+
     @staticmethod
     def get_quick_note(db, user_id, args):
         note_id = args.get("note_id")
@@ -598,13 +1377,30 @@ class WritingService:
         if not note:
             return "", None, 200
 
-        return note.get("content", ""), None, 200
+        WritingService._overlay_buffered(user_id, note)
+        content = NoteBodyStore.load(db, user_id, note)
+        if WritingService._is_quick_note(note):
+            # The old whole-text view: captures appended, read-only (nothing is folded in)
+            parts = [content.strip()] + [format_entry(e) for e in QuickNoteStore.history(db, user_id)]
+            content = ENTRY_SEPARATOR.join(p for p in parts if p)
+        return content, None, 200
+
+    @staticmethod
+    def get_quick_entries(db, user_id, limit=None, cursor=None):
+        """Captures newest first, paginated — without assembling the QuickNote."""
+        page, error = QuickNoteStore.page(db, user_id, limit, cursor)
+        if error:
+            return None, error, 400
+        for item in page["items"]:
+            item["created_at"] = WritingService._date_ser(item["created_at"])
+        return page, None, 200
 
     @staticmethod
     def save_quick_note(db, user_id, data):
         """
-        B4 FIX: First creation now uses build_document for a complete schema.
-        Subsequent appends prepend a timestamped separator.
+        Append-only capture: one insert into quick_note_entries plus a
+        timestamp bump on QuickNote.txt — the note content is not read or
+        rewritten. B4: the note itself is still created with build_document.
         """
         system_id = _get_system_project_id()
         content = (data.get("content") or "").strip()
@@ -612,29 +1408,20 @@ class WritingService:
             return False, "Content is required", 400
 
         WritingService.ensure_system_project(db, user_id)
+        QuickNoteStore.append(db, user_id, content)
 
-        quick_note = db.notes.find_one({
-            "user_id": user_id,
-            "project_id": system_id,
-            "filename": "QuickNote.txt"
-        })
-
-        if quick_note:
-            existing = (quick_note.get("content") or "").strip()
-            sep = "\n\n---\n"
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-            new_content = existing + sep + f"[{timestamp}] " + content
-            db.notes.update_one(
-                {"user_id": user_id, "project_id": system_id, "filename": "QuickNote.txt"},
-                {"$set": {"content": new_content, "last_updated": datetime.now()}}
-            )
-        else:
+        now = datetime.now()
+        result = db.notes.update_one(
+            {"user_id": user_id, "project_id": system_id, "filename": _QUICK_NOTE_FILENAME},
+            {"$set": {"last_updated": now, "modified_at": now}}
+        )
+        if result.matched_count == 0:
             # B4 FIX: use build_document for a complete, schema-valid document
             note_data = {
                 "project_id": system_id,
                 "title": "QuickNote",
-                "filename": "QuickNote.txt",
-                "content": content,
+                "filename": _QUICK_NOTE_FILENAME,
+                "content": "",
                 "status": "draft",
                 "tags": [],
                 "description": "Auto-created quick capture note",
@@ -642,6 +1429,11 @@ class WritingService:
                 "is_favorite": False,
             }
             note = build_document("note", note_data, db=db, user_id=user_id)
+            note.update(WritingService._compute_stats(""))
+            NoteBodyStore.apply(note, *NoteBodyStore.store(db, user_id, note["note_id"], "")[:2])
             db.notes.insert_one(note)
+            note["content"] = ""
+            NoteSearchIndex.index_note(db, user_id, note)
+            TrigramIndex.index_docs(db, user_id, "note", [note])
 
         return True, None, 200
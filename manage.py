@@ -0,0 +1,121 @@
+"""
+manage.py — LifeOS Maintenance Commands
+========================================
+Offline jobs that talk to MongoDB directly (no Flask app, no JWT).
+Uses the same MONGO_URI / MONGO_DB_NAME environment variables as server.py.
+
+Usage:
+    python manage.py repair-counters [--user USER_ID]
+    python manage.py ensure-indexes
+    python manage.py index-report
+    python manage.py backfill-note-stats [--user USER_ID]
+    python manage.py compact-quick-notes [--user USER_ID]
+    python manage.py rebuild-search-index [--user USER_ID]
+    python manage.py migrate-note-bodies [--user USER_ID]
+"""
+
+import argparse
+import os
+
+import certifi
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+
+def _connect():
+    load_dotenv()
+    uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000, tlsCAFile=certifi.where())
+    return client[os.getenv("MONGO_DB_NAME", "LifeOS")]
+
+
+def cmd_repair_counters(db, args):
+    from core.project_counters import ProjectCounters
+    n = ProjectCounters.repair(db, user_id=args.user)
+    print(f"✓ Recomputed task counters on {n} projects")
+
+
+def cmd_ensure_indexes(db, args):
+    from core.indexes import IndexManager
+    result = IndexManager.ensure(db)
+    for name in result["created"]:
+        print(f"✓ {name}")
+    for name, error in result["failed"].items():
+        print(f"✗ {name}: {error}")
+
+
+def cmd_index_report(db, args):
+    from core.indexes import IndexManager
+    for coll, info in IndexManager.report(db).items():
+        print(f"{coll}:")
+        print(f"  missing    : {', '.join(info['missing']) or '-'}")
+        unused = "n/a ($indexStats unavailable)" if info["unused"] is None else (", ".join(info["unused"]) or "-")
+        print(f"  unused     : {unused}")
+        print(f"  undeclared : {', '.join(info['undeclared']) or '-'}")
+
+
+def cmd_backfill_note_stats(db, args):
+    from core.writing import WritingService
+    n = WritingService.backfill_stats(db, user_id=args.user)
+    print(f"✓ Stored word/char/read-time stats on {n} notes")
+
+
+def cmd_compact_quick_notes(db, args):
+    from core.quick_notes import QuickNoteStore
+    n = QuickNoteStore.compact(db, user_id=args.user)
+    print(f"✓ Rolled {n} quick note entries into segments")
+
+
+def cmd_rebuild_search_index(db, args):
+    from core.search_index import NoteSearchIndex
+    from core.trigram_index import TrigramIndex
+    users = [args.user] if args.user else sorted(set(db.notes.distinct("user_id")) | set(db.tasks.distinct("user_id")))
+    # None = a build of that user's index is already running
+    notes = sum(NoteSearchIndex.build(db, uid) or 0 for uid in users)
+    grams = sum(TrigramIndex.build(db, uid, kind) or 0 for uid in users for kind in ("task", "note"))
+    print(f"✓ Indexed {notes} notes (BM25) and {grams} tasks + notes (trigrams) for {len(users)} users")
+
+
+def cmd_migrate_note_bodies(db, args):
+    from core.note_bodies import NoteBodyStore
+    n = NoteBodyStore.migrate(db, user_id=args.user)
+    where = "into note_bodies" if NoteBodyStore.is_enabled() else "(excerpt only — note_bodies disabled)"
+    print(f"✓ Migrated {n} notes {where}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LifeOS maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("repair-counters", help="recompute per-project task counters")
+    p.add_argument("--user", help="only repair this user's projects")
+    p.set_defaults(func=cmd_repair_counters)
+
+    p = sub.add_parser("ensure-indexes", help="create the indexes declared in configs/schemas.yaml")
+    p.set_defaults(func=cmd_ensure_indexes)
+
+    p = sub.add_parser("index-report", help="list missing / unused / undeclared indexes")
+    p.set_defaults(func=cmd_index_report)
+
+    p = sub.add_parser("backfill-note-stats", help="store word/char stats on notes saved before V1.3")
+    p.add_argument("--user", help="only backfill this user's notes")
+    p.set_defaults(func=cmd_backfill_note_stats)
+
+    p = sub.add_parser("compact-quick-notes", help="roll old quick note entries into archived segments")
+    p.add_argument("--user", help="only compact this user's entries")
+    p.set_defaults(func=cmd_compact_quick_notes)
+
+    p = sub.add_parser("rebuild-search-index", help="rebuild the BM25 note index and the task/note trigram index")
+    p.add_argument("--user", help="only rebuild this user's index")
+    p.set_defaults(func=cmd_rebuild_search_index)
+
+    p = sub.add_parser("migrate-note-bodies", help="move inline note content into note_bodies")
+    p.add_argument("--user", help="only migrate this user's notes")
+    p.set_defaults(func=cmd_migrate_note_bodies)
+
+    args = parser.parse_args()
+    args.func(_connect(), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 """
 routes/ai.py — LifeOS AI Agent Blueprint
 =========================================
-POST /api/ai/chat  → send a message and get a reply (+ any actions taken)
-GET  /api/ai/modes → list available AI modes
+POST /api/ai/chat            → send a message and get a reply (+ any actions taken)
+POST /api/ai/chat?stream=1   → same, as Server-Sent Events (token / action / done / error)
+GET  /api/ai/modes           → list available AI modes
 """
 
-from flask import Blueprint, request, jsonify, current_app
+import json
+
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from core.ai_agent import ai_agent_service
 
@@ -40,6 +43,12 @@ def chat():
         "reply":        "AI response text",
         "actions_taken": [{"type": "task_created", "id": "...", "title": "..."}]
     }
+
+    With ?stream=1 the response is text/event-stream:
+        event: token   data: {"text": "..."}         (repeated)
+        event: action  data: {"type": ..., "success": ...}
+        event: done    data: {"reply", "actions_taken"}   (as above)
+        event: error   data: {"error": "..."}
     """
     db = get_db()
     user_id = get_jwt_identity()
@@ -55,6 +64,15 @@ def chat():
     if messages[-1].get("role") != "user":
         return jsonify({"error": "Last message must be from 'user'"}), 400
 
+    if request.args.get("stream", "").lower() in ("1", "true"):
+        events = ai_agent_service.chat_stream(db=db, user_id=user_id, mode=mode, messages=messages)
+        return Response(
+            stream_with_context(_sse(events)),
+            mimetype="text/event-stream",
+            # No proxy buffering — tokens must reach the client as they arrive
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     try:
         result = ai_agent_service.chat(
             db=db,
@@ -71,3 +89,9 @@ def chat():
     except Exception as exc:  # pylint: disable=broad-except
         current_app.logger.exception("AI chat error: %s", exc)
         return jsonify({"error": "AI service error. Please try again."}), 500
+
+
+def _sse(events):
+    """Format (event, data) pairs as Server-Sent Events frames."""
+    for event, data in events:
+        yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
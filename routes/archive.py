@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, jsonify, current_app, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from core.archive import ArchiveService
 
@@ -16,3 +16,11 @@ def get_all_archived():
 
     data = ArchiveService.get_all_archived(db, user_id)
     return jsonify(data)
+
+
+@archive_bp.route("/archive/notes/search", methods=["GET"])
+@jwt_required()
+def search_archived_notes():
+    """?q=keyword — ids of archived notes whose content matches (list payloads carry no bodies)."""
+    note_ids = ArchiveService.search_notes(get_db(), get_jwt_identity(), request.args.get("q", ""))
+    return jsonify({"note_ids": note_ids})
@@ -43,9 +43,10 @@ def get_dashboard():
 
     projects = ProjectService.get_projects(db, user_id, archived=False)
 
-    # Fetch all tasks via TaskService to properly expand recurring tasks
+    # Fetch today's window via TaskService to properly expand recurring tasks
+    # (one-off tasks are date-filtered in Mongo, recurring ones expanded for today only)
     from core.task import TaskService
-    all_tasks = TaskService.get_tasks(db, user_id, archived=False)
+    all_tasks = TaskService.get_tasks(db, user_id, archived=False, window_start=today, window_end=today)
 
     # Today's tasks: strictly tasks scheduled for today
     today_tasks = [
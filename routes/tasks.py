@@ -1,12 +1,25 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from core.task import ProjectService, TaskService
+from core.task import ProjectService, TaskService, decode_cursor
 
 tasks_bp = Blueprint("tasks", __name__)
 
+NDJSON_MIMETYPE = "application/x-ndjson"
+
 def get_db():
     return current_app.config["db"]
 
+def _wants_ndjson():
+    if request.args.get("format", "").lower() == "ndjson":
+        return True
+    # Only an explicit Accept entry counts — "*/*" keeps the JSON array
+    return any(mime == NDJSON_MIMETYPE and q > 0 for mime, q in request.accept_mimetypes)
+
+def _ndjson_lines(items):
+    """Serialize each item as one JSON line, as soon as it is produced."""
+    for item in items:
+        yield current_app.json.dumps(item) + "\n"
+
 # ══════════════════════════════════════════════
 #  PROJECT ROUTES
 # ══════════════════════════════════════════════
@@ -70,6 +83,22 @@ def reorder_projects():
 
     return jsonify({"success": True})
 
+@tasks_bp.route("/projects/<string:pid>/move", methods=["POST"])
+@jwt_required()
+def move_project(pid):
+    """Body: {"prev_id": id-above|null, "next_id": id-below|null} — writes only this project."""
+    db = get_db()
+    user_id = get_jwt_identity()
+    payload = request.get_json() or {}
+
+    result, error = ProjectService.move_project(
+        db, user_id, pid, payload.get("prev_id"), payload.get("next_id")
+    )
+    if error:
+        return jsonify({"error": error}), 404 if "not found" in error.lower() else 400
+
+    return jsonify(result)
+
 # ══════════════════════════════════════════════
 #  TASK ROUTES
 # ══════════════════════════════════════════════
@@ -77,26 +106,44 @@ def reorder_projects():
 @tasks_bp.route("/tasks", methods=["GET"])
 @jwt_required()
 def get_tasks():
+    """
+    Query params (all optional):
+      ?project_id= ?status= ?search= ?archived= ?start= ?end=  — filters
+      ?limit=N&cursor=...  — keyset pagination → {"items": [...], "next_cursor": ...}
+      ?format=ndjson (or Accept: application/x-ndjson) — stream one task per line
+    Without limit/cursor/ndjson the full JSON array is returned (legacy shape).
+    """
     db = get_db()
     user_id = get_jwt_identity()
     
-    archived = request.args.get("archived", "").strip().lower() in ("1", "true", "yes")
-    project_id = request.args.get("project_id")
-    status = request.args.get("status")
-    search = request.args.get("search", "").strip().lower()
-    start = request.args.get("start")
-    end = request.args.get("end")
-
-    tasks = TaskService.get_tasks(
-        db, 
-        user_id, 
-        archived=archived, 
-        project_id=project_id, 
-        status=status, 
-        search=search,
-        window_start=start,
-        window_end=end
-    )
+    filters = {
+        "archived": request.args.get("archived", "").strip().lower() in ("1", "true", "yes"),
+        "project_id": request.args.get("project_id"),
+        "status": request.args.get("status"),
+        "search": request.args.get("search", "").strip().lower(),
+        "window_start": request.args.get("start"),
+        "window_end": request.args.get("end"),
+    }
+    cursor = request.args.get("cursor")
+
+    if _wants_ndjson():
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)
+            if after is None:
+                return jsonify({"error": "Invalid cursor"}), 400
+        tasks = TaskService.iter_tasks(db, user_id, after=after, **filters)
+        return Response(stream_with_context(_ndjson_lines(tasks)), mimetype=NDJSON_MIMETYPE)
+
+    if cursor or request.args.get("limit"):
+        page, error = TaskService.get_tasks_page(
+            db, user_id, limit=request.args.get("limit"), cursor=cursor, **filters
+        )
+        if error:
+            return jsonify({"error": error}), 400
+        return jsonify(page)
+
+    tasks = TaskService.get_tasks(db, user_id, **filters)
     return jsonify(tasks)
 
 @tasks_bp.route("/tasks", methods=["POST"])
@@ -112,6 +159,26 @@ def create_task():
 
     return jsonify(task), 201
 
+@tasks_bp.route("/tasks/batch", methods=["POST"])
+@jwt_required()
+def create_tasks():
+    """
+    Body: {"tasks": [{...}, ...]} — per-item results in input order; the
+    valid items are created even if others fail (listed in "errors" with
+    their index). 400 if none could be created.
+    """
+    db = get_db()
+    user_id = get_jwt_identity()
+    payload = request.get_json() or {}
+
+    result, error = TaskService.create_tasks(db, user_id, payload.get("tasks"))
+    if error:
+        return jsonify({"error": error}), 400
+    if not result["created"]:
+        return jsonify({"error": "No task was created", **result}), 400
+
+    return jsonify(result), 201
+
 @tasks_bp.route("/tasks/<string:tid>", methods=["PUT"])
 @jwt_required()
 def update_task(tid):
@@ -149,4 +216,20 @@ def reorder_tasks():
     if not success:
         return jsonify({"error": error}), 400
 
-    return jsonify({"success": True})
\ No newline at end of file
+    return jsonify({"success": True})
+
+@tasks_bp.route("/tasks/<string:tid>/move", methods=["POST"])
+@jwt_required()
+def move_task(tid):
+    """Body: {"prev_id": id-above|null, "next_id": id-below|null} — writes only this task."""
+    db = get_db()
+    user_id = get_jwt_identity()
+    payload = request.get_json() or {}
+
+    result, error = TaskService.move_task(
+        db, user_id, tid, payload.get("prev_id"), payload.get("next_id")
+    )
+    if error:
+        return jsonify({"error": error}), 404 if "not found" in error.lower() else 400
+
+    return jsonify(result)
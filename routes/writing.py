@@ -6,6 +6,11 @@ V1.1 additions:
   - GET /api/notes now accepts ?search= ?status= ?archived=
   - GET /api/notes/search  — global full-text search (F5)
   - POST /api/notes/:id/duplicate — clone note (F6)
+
+V1.3 additions:
+  - GET /api/notes/structure?since= — delta sync (X-Sync-Token header)
+  - GET /api/notes/quick — paginated quick captures (newest first)
+  - PATCH /api/notes/:id/content — op-based autosave (content_version)
 """
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
@@ -90,7 +95,25 @@ def archive_project(project_id):
 @writing_bp.route("/notes/structure", methods=["GET"])
 @jwt_required()
 def get_structure():
-    return jsonify(WritingService.get_structure(get_db(), get_jwt_identity()))
+    """
+    Full tree, or ?since=<sync token> for only what changed / was deleted.
+    The X-Sync-Token header (and "sync_token" in delta bodies) is the next `since`.
+    """
+    since = request.args.get("since")
+    if since:
+        delta, error, status_code = WritingService.get_structure_delta(
+            get_db(), get_jwt_identity(), since
+        )
+        if error:
+            return jsonify({"error": error}), status_code
+        response = jsonify(delta)
+        response.headers["X-Sync-Token"] = delta["sync_token"]
+        return response
+
+    token = WritingService.sync_token()
+    response = jsonify(WritingService.get_structure(get_db(), get_jwt_identity()))
+    response.headers["X-Sync-Token"] = token
+    return response
 
 
 @writing_bp.route("/notes", methods=["GET"])
@@ -100,7 +123,9 @@ def get_notes():
     Query params (all optional):
       ?project_id=uuid      — filter by project
       ?status=draft         — filter by status (draft|complete|in_review)
-      ?search=keyword       — search title, content, tags (min 2 chars)
+      ?search=keyword       — search title, content, tags (min 2 chars);
+                              results are BM25-ranked and carry a `snippet`
+      ?limit=50             — most search results returned (default: config)
       ?archived=true        — include archived notes
     """
     project_id = request.args.get("project_id")
@@ -114,6 +139,7 @@ def get_notes():
         status=status,
         search=search,
         include_archived=include_archived,
+        limit=request.args.get("limit", type=int),
     ))
 
 
@@ -123,7 +149,8 @@ def search_notes():
     """
     F5: Global full-text search across all non-archived notes.
     GET /api/notes/search?q=keyword
-    Returns lightweight note cards (no content field).
+    Returns lightweight note cards (no content field), best match first,
+    each with a highlighted `snippet`.
     """
     q = request.args.get("q", "").strip()
     if len(q) < 2:
@@ -135,14 +162,36 @@ def search_notes():
 @writing_bp.route("/notes/<string:note_id>", methods=["GET"])
 @jwt_required()
 def get_note(note_id):
+    """
+    ?meta=true            → metadata only (content_length, no content)
+    ?content_limit=n      → first n characters; the rest via /content
+    """
     note, error, status_code = WritingService.get_note(
-        get_db(), get_jwt_identity(), note_id
+        get_db(), get_jwt_identity(), note_id,
+        include_content=request.args.get("meta", "false").lower() != "true",
+        content_limit=request.args.get("content_limit", type=int),
     )
     if error:
         return jsonify({"error": error}), status_code
     return jsonify(note)
 
 
+@writing_bp.route("/notes/<string:note_id>/content", methods=["GET"])
+@jwt_required()
+def get_note_content_range(note_id):
+    """?offset=&limit= or ?chunk=&limit=, plus &version= to pin the content version."""
+    result, error, status_code = WritingService.get_note_content(
+        get_db(), get_jwt_identity(), note_id,
+        offset=request.args.get("offset", 0, type=int),
+        limit=request.args.get("limit", type=int),
+        chunk=request.args.get("chunk", type=int),
+        version=request.args.get("version", type=int),
+    )
+    if error:
+        return jsonify({"error": error, **(result or {})}), status_code
+    return jsonify(result)
+
+
 @writing_bp.route("/notes", methods=["POST"])
 @jwt_required()
 def create_note():
@@ -165,6 +214,18 @@ def update_note(note_id):
     return jsonify(updated)
 
 
+@writing_bp.route("/notes/<string:note_id>/content", methods=["PATCH"])
+@jwt_required()
+def patch_note_content(note_id):
+    """Body: {"base_version": n, "ops": [{"op": "insert", "pos": 0, "text": "..."}]}"""
+    result, error, status_code = WritingService.patch_note_content(
+        get_db(), get_jwt_identity(), note_id, request.get_json() or {}
+    )
+    if error:
+        return jsonify({"error": error, **(result or {})}), status_code
+    return jsonify(result)
+
+
 @writing_bp.route("/notes/<string:note_id>/move", methods=["PUT"])
 @jwt_required()
 def move_note(note_id):
@@ -241,6 +302,19 @@ def get_note_content():
     return jsonify({"content": content})
 
 
+@writing_bp.route("/notes/quick", methods=["GET"])
+@jwt_required()
+def get_quick_entries():
+    """Quick captures newest first: ?limit=20&cursor=<next_cursor>."""
+    limit = request.args.get("limit", type=int)
+    page, error, status_code = WritingService.get_quick_entries(
+        get_db(), get_jwt_identity(), limit, request.args.get("cursor")
+    )
+    if error:
+        return jsonify({"error": error}), status_code
+    return jsonify(page)
+
+
 @writing_bp.route("/notes/quick", methods=["POST"])
 @jwt_required()
 def save_quick_note():
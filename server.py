@@ -112,6 +112,18 @@ def _connect_mongo(uri, db_name):
 db = _connect_mongo(MONGO_URI, MONGO_DB_NAME)
 app.config["db"] = db
 
+# إنشاء الفهارس المعرّفة في schemas.yaml (idempotent — performance.indexes في app_config.yaml)
+from core.indexes import IndexManager
+if IndexManager.is_startup_enabled():
+    _index_result = IndexManager.ensure(db)
+    print(f"✓ Indexes ensured ({len(_index_result['created'])} ok, {len(_index_result['failed'])} failed)")
+
+# مخزن التكرارات المُجسَّدة (اختياري — performance.occurrence_store في app_config.yaml)
+from core.occurrences import OccurrenceStore, start_refill_worker
+if OccurrenceStore.is_enabled():
+    OccurrenceStore.ensure_indexes(db)
+    start_refill_worker(db)
+
 # --- 5. المسارات الأساسية (SPA Routing) ---
 @app.route('/')
 @app.route('/tasks')
@@ -135,9 +147,12 @@ def test_db():
 
 @app.route('/api/status')
 def api_status():
-    """Dev diagnostic endpoint — shows DB, JWT, blueprint, and action registry status."""
+    """Dev diagnostic endpoint — shows DB, JWT, blueprint, action registry, AI connection pool, provider breaker and response cache status."""
     import sys
     from core.registry import get_registry_stats
+    from api.transport import pool_stats
+    from core.provider_health import ProviderBreaker
+    from core.ai_cache import ResponseCache
 
     blueprints     = list(app.blueprints.keys())
     db_ok          = False
@@ -165,6 +180,9 @@ def api_status():
         "jwt_ok":          bool(app.config.get("JWT_SECRET_KEY")),
         "ai_provider":     os.getenv("AI_PROVIDER", "not set"),
         "action_registry": registry_stats,
+        "ai_transport":    pool_stats(),
+        "ai_providers":    ProviderBreaker.snapshot(),
+        "ai_cache":        ResponseCache.stats(),
     })
 
 if __name__ == '__main__':
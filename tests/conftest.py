@@ -0,0 +1,100 @@
+"""
+Shared fixtures — run from the project root:
+    python -m pytest -q
+
+MongoDB is replaced by mongomock; nothing here needs a network or API keys.
+"""
+
+import copy
+import os
+import sys
+
+import mongomock
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import config_loader  # noqa: E402
+
+
+def _drop_sort(add):
+    # pymongo >= 4.11 passes `sort` for UpdateOne/ReplaceOne; mongomock 4.3 predates it
+    def wrapper(self, *args, sort=None, **kwargs):
+        return add(self, *args, **kwargs)
+    return wrapper
+
+
+for _name in ("add_update", "add_replace"):
+    setattr(mongomock.collection.BulkOperationBuilder, _name,
+            _drop_sort(getattr(mongomock.collection.BulkOperationBuilder, _name)))
+
+
+_handle_set_operator = mongomock.aggregate._Parser._handle_set_operator
+
+
+def _set_operator(self, operator, values):
+    # mongomock 4.3 does not implement $setIntersection (core/trigram_index.py fuzzy search)
+    if operator == "$setIntersection":
+        arrays = [self.parse(v) for v in values]
+        common = set(arrays[0]).intersection(*arrays[1:])
+        return [v for v in dict.fromkeys(arrays[0]) if v in common]
+    return _handle_set_operator(self, operator, values)
+
+
+mongomock.aggregate._Parser._handle_set_operator = _set_operator
+
+
+_handle_string_operator = mongomock.aggregate._Parser._handle_string_operator
+
+
+def _string_operator(self, operator, values):
+    # mongomock 4.3 lists but does not implement these (core/writing.py range reads)
+    if operator == "$substrCP":
+        string, start, length = (self.parse(v) for v in values)
+        return (string or "")[start:start + length]
+    if operator == "$strLenCP":
+        return len(self.parse(values))
+    return _handle_string_operator(self, operator, values)
+
+
+mongomock.aggregate._Parser._handle_string_operator = _string_operator
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient(tz_aware=True)["lifeos_test"]
+
+
+@pytest.fixture
+def perf_config(monkeypatch):
+    """
+    Override performance settings for one test:
+
+        perf_config("ai_cache", enabled=True, ttl_sec=5)
+    """
+    config = copy.deepcopy(config_loader.load_yaml("app_config.yaml"))
+    monkeypatch.setitem(config_loader._yaml_cache, "app_config.yaml", config)
+
+    def override(section: str, **values):
+        config.setdefault("performance", {}).setdefault(section, {}).update(values)
+        return config["performance"][section]
+
+    return override
+
+
+@pytest.fixture
+def ai_state(monkeypatch):
+    """Fresh per-process AI state: breakers, dispatcher pool and semaphores, response cache."""
+    from core import ai_cache, ai_dispatch
+    from core.provider_health import ProviderBreaker
+
+    ProviderBreaker.reset()
+    monkeypatch.setattr(ai_cache, "_entries", ai_cache.OrderedDict())
+    monkeypatch.setattr(ai_cache, "_inflight", {})
+    monkeypatch.setattr(ai_cache, "_stats", dict.fromkeys(ai_cache._stats, 0))
+    monkeypatch.setattr(ai_dispatch, "_executor", None)
+    monkeypatch.setattr(ai_dispatch, "_semaphores", {})
+    yield
+    if ai_dispatch._executor is not None:
+        ai_dispatch._executor.shutdown(wait=True)
+    ProviderBreaker.reset()
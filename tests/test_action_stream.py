@@ -0,0 +1,54 @@
+"""core/ai_agent.py — _ActionStream, the splitter for streamed replies."""
+
+import pytest
+
+from core.ai_agent import _ActionStream
+
+BLOCK = '[ACTION:CREATE_TASK]{"title": "x"}[/ACTION]'
+
+
+def _split(deltas):
+    stream, out = _ActionStream(), []
+    for delta in deltas:
+        out += stream.feed(delta)
+    return out, stream.flush()
+
+
+def _joined(parts):
+    """Merge adjacent text parts — only the order of text and actions matters."""
+    merged = []
+    for kind, value in parts:
+        if merged and kind == "text" and merged[-1][0] == "text":
+            merged[-1] = ("text", merged[-1][1] + value)
+        else:
+            merged.append((kind, value))
+    return merged
+
+
+def test_plain_text_passes_through():
+    assert _split(["Hello ", "world"]) == ([("text", "Hello "), ("text", "world")], "")
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 100])
+def test_action_split_across_deltas(size):
+    reply = f"Sure. {BLOCK} Done."
+    parts, rest = _split([reply[i:i + size] for i in range(0, len(reply), size)])
+    assert _joined(parts) == [("text", "Sure. "), ("action", BLOCK), ("text", " Done.")]
+    assert rest == ""
+
+
+def test_possible_tag_start_is_held_back():
+    stream = _ActionStream()
+    assert stream.feed("a [AC") == [("text", "a ")]
+    assert stream.feed("ME] b") == [("text", "[ACME] b")]
+
+
+def test_unclosed_action_is_returned_by_flush():
+    parts, rest = _split(["text ", "[ACTION:CREATE_TASK]{\"title\""])
+    assert parts == [("text", "text ")]
+    assert rest == "[ACTION:CREATE_TASK]{\"title\""
+
+
+def test_consecutive_actions():
+    parts, _ = _split([BLOCK + BLOCK])
+    assert parts == [("action", BLOCK), ("action", BLOCK)]
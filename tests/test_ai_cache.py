@@ -0,0 +1,124 @@
+"""core/ai_cache.py — TTL/LRU cache and single-flight, for chat() and chat_stream()."""
+
+import threading
+import time
+
+import pytest
+
+from core import ai_cache
+from core.ai_agent import AIAgentService
+from core.ai_cache import ResponseCache
+
+
+def _wait_for_flight():
+    deadline = time.monotonic() + 2
+    while not ai_cache._inflight:
+        assert time.monotonic() < deadline, "no request in flight"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def cache(perf_config, ai_state):
+    return perf_config("ai_cache", enabled=True, ttl_sec=600, replay_ttl_sec=30, max_entries=2, wait_sec=5)
+
+
+def test_put_get_returns_a_marked_copy(cache):
+    ResponseCache.put("k", {"reply": "hi", "actions_taken": []}, ttl=60)
+    first = ResponseCache.get("k")
+    first["reply"] = "changed"
+    assert ResponseCache.get("k") == {"reply": "hi", "actions_taken": [], "cached": True}
+    assert ResponseCache.stats()["hits"] == 2
+
+
+def test_entries_expire(cache, monkeypatch):
+    ResponseCache.put("k", {"reply": "hi"}, ttl=10)
+    now = time.monotonic()
+    monkeypatch.setattr(ai_cache.time, "monotonic", lambda: now + 11)
+    assert ResponseCache.get("k") is None
+
+
+def test_least_recently_used_is_evicted(cache):
+    ResponseCache.put("a", {"reply": "a"}, ttl=60)
+    ResponseCache.put("b", {"reply": "b"}, ttl=60)
+    ResponseCache.get("a")
+    ResponseCache.put("c", {"reply": "c"}, ttl=60)
+    assert ResponseCache.get("b") is None
+    assert ResponseCache.get("a") is not None
+    assert ResponseCache.stats()["evictions"] == 1
+
+
+def test_uncacheable_results_are_not_stored(cache):
+    assert ResponseCache.get_or_compute("k", 60, lambda: ({"reply": "error"}, False)) == {"reply": "error"}
+    assert ResponseCache.get("k") is None
+
+
+def test_concurrent_callers_share_one_computation(cache):
+    gate, calls, results = threading.Event(), [], []
+
+    def compute():
+        calls.append(1)
+        gate.wait(2)
+        return {"reply": "once"}, True
+
+    threads = [threading.Thread(target=lambda: results.append(ResponseCache.get_or_compute("k", 60, compute)))
+               for _ in range(3)]
+    for t in threads:
+        t.start()
+    _wait_for_flight()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(r.get("cached", False) for r in results) == [False, True, True]
+    assert ResponseCache.stats()["coalesced"] == 2
+
+
+def test_leader_failure_lets_followers_compute(cache):
+    leader, flight = ResponseCache.join("k")
+    assert leader
+    ResponseCache.land("k", flight, None)
+    assert ResponseCache.follow(flight) is None
+    assert ResponseCache.join("k")[0]
+
+
+@pytest.fixture
+def agent(cache, monkeypatch):
+    monkeypatch.setattr(AIAgentService, "_build_prompt",
+                        lambda self, mode, messages, utc_now=None: f"{mode}|{messages}|{utc_now}")
+    return AIAgentService()
+
+
+def test_double_clicked_stream_runs_actions_once(agent, monkeypatch):
+    gate, executed = threading.Event(), []
+
+    def stream(prompt):
+        yield "Adding it. "
+        gate.wait(2)
+        yield '[ACTION:CREATE_TASK]{"title": "x"}[/ACTION]'
+
+    monkeypatch.setattr(AIAgentService, "_stream_ai_provider", lambda self, prompt: stream(prompt))
+    monkeypatch.setattr(AIAgentService, "_execute_actions",
+                        lambda self, db, user_id, parsed: executed.extend(parsed) or
+                        [{"type": t, "success": True} for t, _ in parsed])
+
+    messages = [{"role": "user", "content": "add x"}]
+    results = {}
+
+    def run(name):
+        results[name] = list(agent.chat_stream(None, "u1", "tasks", messages))
+
+    first = threading.Thread(target=run, args=("first",))
+    first.start()
+    _wait_for_flight()
+    second = threading.Thread(target=run, args=("second",))
+    second.start()
+    time.sleep(0.05)
+    gate.set()
+    first.join()
+    second.join()
+
+    assert len(executed) == 1
+    assert [e for e, _ in results["second"]] == ["token", "done"]
+    assert results["second"][-1][1]["cached"] is True
+    assert results["second"][-1][1]["actions_taken"] == results["first"][-1][1]["actions_taken"]
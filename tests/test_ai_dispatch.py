@@ -0,0 +1,93 @@
+"""core/ai_dispatch.py — hedging, deadline and per-provider permits."""
+
+import threading
+import time
+
+import pytest
+
+from core import ai_dispatch
+from core.ai_dispatch import HedgedDispatcher
+
+
+@pytest.fixture
+def dispatch(perf_config, ai_state):
+    perf_config("ai_circuit_breaker", enabled=True)
+    return perf_config("ai_dispatch", enabled=True, hedge=True, max_in_flight=2, max_workers=4,
+                       max_concurrency=2, deadline_sec=5, hedge_default_sec=0.05, hedge_min_sec=0.01)
+
+
+def _permits(provider):
+    return ai_dispatch._semaphore(provider)._value
+
+
+def test_first_provider_answers(dispatch):
+    provider, answer, _, skipped = HedgedDispatcher.run(["a", "b"], lambda name: f"from {name}")
+    assert (provider, answer, skipped) == ("a", "from a", [])
+
+
+def test_fails_over_to_next_provider(dispatch):
+    def call(name):
+        if name == "a":
+            raise RuntimeError("down")
+        return "ok"
+
+    provider, answer, last_error, _ = HedgedDispatcher.run(["a", "b"], call)
+    assert (provider, answer) == ("b", "ok")
+    assert str(last_error) == "down"
+
+
+def test_hedges_a_slow_provider(dispatch):
+    release = threading.Event()
+
+    def call(name):
+        if name == "a":
+            release.wait(2)
+            return "slow"
+        return "fast"
+
+    try:
+        provider, answer, _, _ = HedgedDispatcher.run(["a", "b"], call)
+    finally:
+        release.set()
+    assert (provider, answer) == ("b", "fast")
+
+
+def test_deadline(dispatch):
+    dispatch.update(deadline_sec=0.1, hedge=False)
+    release = threading.Event()
+    try:
+        provider, _, last_error, _ = HedgedDispatcher.run(["a"], lambda name: release.wait(2) and "late")
+    finally:
+        release.set()
+    assert provider is None
+    assert isinstance(last_error, TimeoutError)
+
+
+def test_provider_at_its_limit_is_skipped(dispatch):
+    dispatch.update(providers={"a": {"max_concurrency": 1}})
+    ai_dispatch._semaphore("a").acquire()
+    try:
+        provider, _, _, skipped = HedgedDispatcher.run(["a", "b"], lambda name: name)
+    finally:
+        ai_dispatch._semaphore("a").release()
+    assert provider == "b"
+    assert skipped == ["a"]
+
+
+def test_cancelled_hedge_returns_its_permit(dispatch):
+    # One worker busy with "a": the hedge to "b" stays queued and is cancelled at the deadline
+    dispatch.update(max_workers=1, deadline_sec=0.3)
+    release = threading.Event()
+    calls = []
+
+    def call(name):
+        calls.append(name)
+        release.wait(2)
+        return name
+
+    provider, _, last_error, _ = HedgedDispatcher.run(["a", "b"], call)
+    release.set()
+    ai_dispatch._pool().shutdown(wait=True)
+    assert provider is None and isinstance(last_error, TimeoutError)
+    assert calls == ["a"]
+    assert _permits("a") == _permits("b") == 2
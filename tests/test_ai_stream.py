@@ -0,0 +1,104 @@
+"""AIAgentService._stream_ai_provider — failover, permits and deadline (core/ai_dispatch.py)."""
+
+import sys
+import threading
+import types
+
+import pytest
+
+from core import ai_dispatch
+from core.ai_agent import AIAgentService
+from core.provider_health import ProviderBreaker
+
+
+def _provider(monkeypatch, name, stream):
+    mod = types.ModuleType(f"fake_{name}")
+    mod.stream = stream
+    monkeypatch.setitem(sys.modules, mod.__name__, mod)
+    return name, mod.__name__
+
+
+@pytest.fixture
+def agent(perf_config, ai_state):
+    perf_config("ai_circuit_breaker", enabled=True)
+    perf_config("ai_dispatch", enabled=True, max_concurrency=2, max_workers=4, deadline_sec=5)
+    return AIAgentService()
+
+
+def _chain(monkeypatch, *providers):
+    monkeypatch.setattr(AIAgentService, "_provider_chain", staticmethod(lambda: list(providers)))
+
+
+def test_falls_back_before_the_first_token(agent, monkeypatch):
+    def broken(prompt):
+        raise RuntimeError("down")
+        yield  # pragma: no cover
+
+    _chain(monkeypatch, _provider(monkeypatch, "a", broken),
+           _provider(monkeypatch, "b", lambda prompt: iter(["", "Hel", "lo"])))
+    assert "".join(agent._stream_ai_provider("hi")) == "Hello"
+    assert ProviderBreaker.snapshot()["a"]["consecutive_failures"] == 1
+
+
+def test_stream_holds_its_permit_until_it_ends(agent, monkeypatch):
+    _chain(monkeypatch, _provider(monkeypatch, "a", lambda prompt: iter(["one", "two"])))
+    deltas = agent._stream_ai_provider("hi")
+    assert next(deltas) == "one"
+    assert ai_dispatch._semaphore("a")._value == 1
+    assert list(deltas) == ["two"]
+    assert ai_dispatch._semaphore("a")._value == 2
+
+
+def test_closing_a_stream_releases_its_permit(agent, monkeypatch):
+    _chain(monkeypatch, _provider(monkeypatch, "a", lambda prompt: iter(["one", "two"])))
+    deltas = agent._stream_ai_provider("hi")
+    next(deltas)
+    deltas.close()
+    assert ai_dispatch._semaphore("a")._value == 2
+
+
+def test_provider_at_its_limit_is_skipped(agent, monkeypatch, perf_config):
+    perf_config("ai_dispatch", providers={"a": {"max_concurrency": 1}})
+    _chain(monkeypatch, _provider(monkeypatch, "a", lambda prompt: iter(["from a"])),
+           _provider(monkeypatch, "b", lambda prompt: iter(["from b"])))
+    first = agent._stream_ai_provider("hi")
+    assert next(first) == "from a"
+    assert list(agent._stream_ai_provider("hi")) == ["from b"]
+    first.close()
+
+
+def test_deadline_bounds_the_first_token(agent, monkeypatch, perf_config):
+    perf_config("ai_dispatch", deadline_sec=0.1)
+    release = threading.Event()
+
+    def hanging(prompt):
+        release.wait(2)
+        yield "late"
+
+    _chain(monkeypatch, _provider(monkeypatch, "a", hanging))
+    with pytest.raises(RuntimeError, match="took too long"):
+        list(agent._stream_ai_provider("hi"))
+    release.set()
+    ai_dispatch._pool().shutdown(wait=True)
+    assert ai_dispatch._semaphore("a")._value == 2
+
+
+def test_failure_mid_reply_is_raised(agent, monkeypatch):
+    def breaks(prompt):
+        yield "partial"
+        raise ConnectionError("reset")
+
+    _chain(monkeypatch, _provider(monkeypatch, "a", breaks),
+           _provider(monkeypatch, "b", lambda prompt: iter(["unused"])))
+    deltas = agent._stream_ai_provider("hi")
+    assert next(deltas) == "partial"
+    with pytest.raises(RuntimeError, match="mid-reply"):
+        next(deltas)
+    assert ai_dispatch._semaphore("a")._value == 2
+
+
+def test_without_dispatch_streams_sequentially(agent, monkeypatch, perf_config):
+    perf_config("ai_dispatch", enabled=False)
+    _chain(monkeypatch, _provider(monkeypatch, "a", lambda prompt: iter([])),
+           _provider(monkeypatch, "b", lambda prompt: iter(["x", "y"])))
+    assert list(agent._stream_ai_provider("hi")) == ["x", "y"]
@@ -0,0 +1,37 @@
+"""core/archive.py — archived notes are searched by content, not just the excerpt."""
+
+import pytest
+
+from core.archive import ArchiveService
+from core.note_bodies import NoteBodyStore
+
+
+@pytest.fixture(params=[True, False], ids=["search-index", "scan"])
+def archive(request, db, perf_config, monkeypatch):
+    perf_config("search_index", enabled=request.param)
+    perf_config("note_bodies", enabled=True, excerpt_chars=20)
+    from core.write_buffer import NoteWriteBuffer
+    monkeypatch.setattr(NoteWriteBuffer, "flush_user", staticmethod(lambda user_id: None))
+    for note_id, archived, content in [("a1", True, "intro " * 10 + "hidden treasure map"),
+                                       ("a2", True, "nothing here"),
+                                       ("live", False, "treasure in a live note")]:
+        note = {"user_id": "u1", "note_id": note_id, "title": note_id, "archived": archived}
+        set_fields, unset_fields, _ = NoteBodyStore.store(db, "u1", note_id, content)
+        db.notes.insert_one(NoteBodyStore.apply(note, set_fields, unset_fields))
+    return db
+
+
+def test_matches_beyond_the_excerpt(archive):
+    note = archive.notes.find_one({"note_id": "a1"})
+    assert "treasure" not in note["excerpt"]
+    assert ArchiveService.search_notes(archive, "u1", "treasure") == ["a1"]
+
+
+def test_short_query(archive):
+    assert ArchiveService.search_notes(archive, "u1", "t") == []
+
+
+def test_archive_listing_has_no_bodies(archive):
+    notes = ArchiveService.get_all_archived(archive, "u1")["notes"]
+    assert sorted(n["note_id"] for n in notes) == ["a1", "a2"]
+    assert all("content" not in n for n in notes)
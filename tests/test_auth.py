@@ -0,0 +1,30 @@
+"""core/auth.py — signup conflicts."""
+
+import pytest
+
+from core.auth import AuthService
+
+
+def _signup(db, username, email):
+    return AuthService.signup(db, {"username": username, "email": email, "password": "secret1"})
+
+
+@pytest.mark.parametrize("username, email, message", [
+    ("sara", "other@example.com", "اسم المستخدم مسجل مسبقاً"),
+    ("sara2", "sara@example.com", "البريد الإلكتروني مسجل مسبقاً"),
+])
+def test_signup_losing_a_race_is_a_conflict(db, monkeypatch, username, email, message):
+    db.users.create_index("username", unique=True)
+    db.users.create_index("email", unique=True)
+    assert _signup(db, "sara", "sara@example.com")[2] == 201
+
+    # The other signup lands between the existence checks and the insert
+    find_one, checks = db.users.find_one, []
+
+    def racing(*args, **kwargs):
+        checks.append(args)
+        return None if len(checks) <= 2 else find_one(*args, **kwargs)
+
+    monkeypatch.setattr(db.users, "find_one", racing)
+    assert _signup(db, username, email) == (None, message, 409)
+    assert db.users.count_documents({}) == 1
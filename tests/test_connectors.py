@@ -0,0 +1,38 @@
+"""api/ connectors — exhausted retries raise (a busy message must not become the reply)."""
+
+import pytest
+
+from api import gemini, grok
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = "busy"
+
+
+@pytest.fixture
+def busy(monkeypatch):
+    calls = []
+
+    def post(provider, url, **kwargs):
+        calls.append(provider)
+        return _Response(503)
+
+    monkeypatch.setattr("api.transport.post", post)
+    monkeypatch.setattr("time.sleep", lambda sec: None)
+    return calls
+
+
+def test_gemini_raises_when_still_overloaded(busy, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    with pytest.raises(RuntimeError, match="503"):
+        gemini.call("hi", retries=2, delay=0)
+    assert busy == ["gemini", "gemini"]
+
+
+def test_grok_raises_when_still_busy(busy, monkeypatch):
+    monkeypatch.setenv("GROK_API_KEY", "test")
+    with pytest.raises(RuntimeError, match="busy"):
+        grok.call("hi", retries=2, delay=0)
+    assert busy == ["grok", "grok"]
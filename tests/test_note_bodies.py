@@ -0,0 +1,117 @@
+"""core/note_bodies.py — chunked body storage and range reads."""
+
+import pytest
+
+from core.note_bodies import NoteBodyStore, excerpt
+
+
+@pytest.fixture
+def store(db, perf_config):
+    perf_config("note_bodies", enabled=True, chunk_chars=10, compress_min_bytes=8, codec="zlib")
+    NoteBodyStore.ensure_indexes(db)
+    return db
+
+
+def _save(db, content, note_id="n1"):
+    set_fields, unset_fields, rev = NoteBodyStore.store(db, "u1", note_id, content)
+    note = NoteBodyStore.apply({"user_id": "u1", "note_id": note_id, "content": "inline"}, set_fields, unset_fields)
+    return note, rev
+
+
+def test_excerpt_strips_markup():
+    assert excerpt("<p>Hello &amp; <b>world</b></p>") == "Hello & world"
+
+
+def test_body_round_trip(store):
+    text = "ünïcode " * 20
+    note, _ = _save(store, text)
+    assert "content" not in note and note["content_length"] == len(text)
+    assert NoteBodyStore.load(store, "u1", note) == text
+    assert {c["codec"] for c in store.note_bodies.find()} == {"zlib"}
+
+
+def test_load_range_reads_only_overlapping_chunks(store, monkeypatch):
+    text = "".join(chr(ord("a") + i % 26) for i in range(95))
+    note, _ = _save(store, text)
+    read = []
+    find = store.note_bodies.find
+
+    def spy(*args, **kwargs):
+        chunks = list(find(*args, **kwargs))
+        read.append(sorted(c["seq"] for c in chunks))
+        return iter(chunks)
+
+    monkeypatch.setattr(store.note_bodies, "find", spy)
+    assert NoteBodyStore.load_range(store, "u1", note, 0, 5) == (text[:5], 95)
+    assert NoteBodyStore.load_range(store, "u1", note, 18, 15) == (text[18:33], 95)
+    assert NoteBodyStore.load_range(store, "u1", note, 90, 50) == (text[90:], 95)
+    assert NoteBodyStore.load_range(store, "u1", note, 200, 10) == ("", 95)
+    # 10-character chunks: 0-9, 10-19, ... 90-94
+    assert read == [[0], [1, 2, 3], [9], []]
+
+
+def test_load_range_of_inline_and_empty_notes(store):
+    assert NoteBodyStore.load_range(store, "u1", {"note_id": "x", "content": "abcdef"}, 2, 2) == ("cd", 6)
+    note, _ = _save(store, "")
+    assert NoteBodyStore.load_range(store, "u1", note, 0, 10) == ("", 0)
+
+
+def test_prune_keeps_only_the_current_revision(store):
+    _save(store, "first version")
+    note, rev = _save(store, "second version")
+    NoteBodyStore.prune(store, "u1", "n1", rev)
+    assert {c["rev"] for c in store.note_bodies.find()} == {rev}
+    assert NoteBodyStore.load(store, "u1", note) == "second version"
+
+
+def test_patch_revision_shares_untouched_chunks(store):
+    text = "".join(chr(ord("a") + i % 26) for i in range(45))
+    note, rev = _save(store, text)
+    span_text, span = NoteBodyStore.load_span(store, "u1", note, 22, 24)
+    assert (span_text, span[:2]) == (text[20:30], (20, 30))
+
+    edited = span_text[:2] + "XYZ" + span_text[4:]
+    set_fields, _, new_rev = NoteBodyStore.store_patch(store, "u1", note, span, edited)
+    patched = {**note, **set_fields}
+    expected = text[:22] + "XYZ" + text[24:]
+    assert patched["content_length"] == len(expected)
+    assert sorted(c["start"] for c in store.note_bodies.find({"rev": new_rev})) == [20, 30]
+
+    # the discarded revision leaves the current one whole
+    NoteBodyStore.discard(store, "u1", "n1", NoteBodyStore.store_patch(store, "u1", note, span, "!")[2])
+    NoteBodyStore.prune(store, "u1", "n1", new_rev)
+    assert sorted(c["seq"] for c in store.note_bodies.find({"rev": rev})) == [0, 1, 3, 4]
+    assert NoteBodyStore.load(store, "u1", patched) == expected
+    assert NoteBodyStore.load_range(store, "u1", patched, 30, 8) == (expected[30:38], len(expected))
+    assert store.note_body_revs.count_documents({}) == 1
+
+
+def test_migrate_moves_inline_content(store):
+    store.notes.insert_one({"user_id": "u1", "note_id": "n1", "content": "x" * 25})
+    assert NoteBodyStore.migrate(store) == 1
+    note = store.notes.find_one({"note_id": "n1"}, {"_id": 0})
+    assert "content" not in note and note["excerpt"] == "x" * 25
+    assert NoteBodyStore.load(store, "u1", note) == "x" * 25
+
+
+def test_note_content_pages_and_version_check(store, perf_config):
+    from core.writing import WritingService
+
+    perf_config("note_write_buffer", enabled=False)
+    text = "0123456789" * 5 + "end"
+    note, _ = _save(store, text)
+    store.notes.insert_one({**note, "content_version": 2})
+
+    parts, offset = [], 0
+    while offset is not None:
+        page, error, _ = WritingService.get_note_content(store, "u1", "n1", offset=offset, limit=16, version=2)
+        assert error is None and page["content_length"] == len(text)
+        parts.append(page["content"])
+        offset = page["next_offset"]
+    assert "".join(parts) == text
+    assert WritingService.get_note_content(store, "u1", "n1", chunk=3, limit=16)[0]["content"] == "89end"
+
+    store.notes.update_one({"note_id": "n1"}, {"$set": {"content_version": 3}})
+    assert WritingService.get_note_content(store, "u1", "n1", offset=16, limit=16, version=2)[1:] == \
+        ("Content changed since the first range", 409)
+    assert WritingService.get_note_content(store, "u1", "n1", limit=0)[2] == 400
@@ -0,0 +1,130 @@
+"""core/writing.py — patch-based autosave (PATCH /api/notes/:id/content)."""
+
+import pytest
+
+from core import write_buffer, writing
+from core.note_bodies import NoteBodyStore
+from core.search_index import NoteSearchIndex
+from core.writing import WritingService
+
+
+@pytest.fixture(params=[False, True], ids=["direct", "buffered"])
+def note(request, db, perf_config, monkeypatch):
+    perf_config("note_write_buffer", enabled=request.param)
+    perf_config("note_bodies", enabled=False)
+    perf_config("search_index", enabled=False)
+    monkeypatch.setattr(write_buffer, "_entries", {})
+    monkeypatch.setattr(write_buffer, "_ensure_worker", lambda: None)
+    db.notes.insert_one({"user_id": "u1", "note_id": "n1", "content": "hello world", "content_version": 3,
+                         "word_count": 2, "char_count": 11})
+    return db
+
+
+def _patch(db, ops, **base):
+    return WritingService.patch_note_content(db, "u1", "n1", {"ops": ops, **base})
+
+
+def _content(db):
+    return WritingService.get_note_content(db, "u1", "n1")[0]["content"]
+
+
+def test_ops_apply_on_the_current_version(note):
+    ops = [{"op": "replace", "pos": 0, "count": 5, "text": "goodbye"},
+           {"op": "insert", "pos": 13, "text": "!"},
+           {"op": "delete", "pos": 7, "count": 1}]
+    result, error, code = _patch(note, ops, base_version=3)
+    assert (error, code, result["content_version"]) == (None, 200, 4)
+    assert result["stats"]["word_count"] == 1
+    assert _content(note) == "goodbyeworld!"
+
+
+def test_stale_base_version_conflicts(note):
+    assert _patch(note, [{"op": "insert", "pos": 0, "text": "a"}], base_version=3)[2] == 200
+    result, error, code = _patch(note, [{"op": "insert", "pos": 0, "text": "b"}], base_version=3)
+    assert (code, result) == (409, {"content_version": 4})
+    assert _content(note) == "ahello world"
+
+
+def test_base_hash(note):
+    fresh = WritingService.content_hash("hello world")
+    assert _patch(note, [{"op": "delete", "pos": 5, "count": 6}], base_hash=fresh)[2] == 200
+    assert _patch(note, [{"op": "insert", "pos": 0, "text": "x"}], base_hash=fresh)[2] == 409
+    assert _content(note) == "hello"
+
+
+def test_concurrent_write_after_the_read_conflicts(note, perf_config, monkeypatch):
+    # Another save lands between the version check and the guarded update
+    perf_config("note_write_buffer", enabled=False)
+    apply_ops = WritingService._apply_ops
+
+    def racing(content, stats, ops):
+        note.notes.update_one({"note_id": "n1"}, {"$set": {"content": "theirs", "content_version": 4}})
+        return apply_ops(content, stats, ops)
+
+    monkeypatch.setattr(WritingService, "_apply_ops", staticmethod(racing))
+    result, _, code = _patch(note, [{"op": "insert", "pos": 0, "text": "mine "}], base_version=3)
+    assert (code, result) == (409, {"content_version": 3})
+    assert note.notes.find_one({"note_id": "n1"})["content"] == "theirs"
+
+
+@pytest.mark.parametrize("data, message", [
+    ({"base_version": 3}, "ops array is required"),
+    ({"ops": []}, "base_version or base_hash is required"),
+    ({"ops": [{"op": "move"}], "base_version": 3}, "Each op needs \"op\": insert | delete | replace"),
+    ({"ops": [{"op": "delete", "pos": 5, "count": 50}], "base_version": 3}, "Op out of range"),
+])
+def test_invalid_patches(note, data, message):
+    assert WritingService.patch_note_content(note, "u1", "n1", data)[1:] == (message, 400)
+
+
+@pytest.fixture
+def stored(db, perf_config, monkeypatch):
+    perf_config("note_write_buffer", enabled=False)
+    perf_config("note_bodies", enabled=True, chunk_chars=16, compress_min_bytes=1 << 20)
+    perf_config("search_index", enabled=True)
+    monkeypatch.setattr(writing, "_RECOUNT_MAX_WINDOW", 8)
+    NoteBodyStore.ensure_indexes(db)
+    NoteSearchIndex.ensure_indexes(db)
+    content = "".join(f"<p>w{i:03d} w{i + 1:03d}</p>\n" for i in range(0, 100, 2))
+    note = {"user_id": "u1", "note_id": "n1", "title": "Words", "content_version": 3,
+            **WritingService._compute_stats(content)}
+    db.notes.insert_one(NoteBodyStore.apply(note, *NoteBodyStore.store(db, "u1", "n1", content)[:2]))
+    NoteSearchIndex.build(db, "u1")
+    return db, content
+
+
+def test_stored_body_patch_rewrites_only_the_touched_chunks(stored):
+    db, content = stored
+    old_rev = db.notes.find_one({"note_id": "n1"})["body_rev"]
+    chunks_before = db.note_bodies.count_documents({})
+    pos = content.index("w050")
+    ops = [{"op": "replace", "pos": pos, "count": 4, "text": "hello there"},
+           {"op": "delete", "pos": pos + 11, "count": 5}]
+    result, error, code = _patch(db, ops, base_version=3)
+
+    expected = content[:pos] + "hello there" + content[pos + 9:]
+    assert (error, code, result["content_version"]) == (None, 200, 4)
+    assert result["stats"] == WritingService._compute_stats(expected)
+    assert _content(db) == expected
+
+    note = db.notes.find_one({"note_id": "n1"})
+    assert note["content_length"] == len(expected)
+    # the ops plus the recount margin (2 * 8 + 2 each side) cover 5 of the 54 16-character chunks
+    assert chunks_before == 54
+    assert db.note_bodies.count_documents({"rev": note["body_rev"]}) <= 5
+    assert db.note_bodies.count_documents({"rev": old_rev}) >= chunks_before - 5
+    assert WritingService.get_note_content(db, "u1", "n1", pos, 11)[0]["content"] == "hello there"
+
+
+def test_stored_body_patches_stack_and_stay_searchable(stored):
+    db, content = stored
+    assert _patch(db, [{"op": "insert", "pos": 3, "text": "zebra "}], base_version=3)[2] == 200
+    end = len(content) + 6 - len("</p>\n")
+    assert _patch(db, [{"op": "insert", "pos": end, "text": " yak"}], base_version=4)[2] == 200
+    assert _patch(db, [{"op": "insert", "pos": 0, "text": "x"}], base_version=4)[2] == 409
+
+    expected = "<p>zebra " + content[3:end - 6] + " yak</p>\n"
+    assert _content(db) == expected
+    assert db.notes.find_one({"note_id": "n1"})["excerpt"].startswith("zebra w000")
+    assert [nid for nid, _ in NoteSearchIndex.search(db, "u1", "zebra yak ")] == ["n1"]
+    assert db.search_docs.count_documents({"stale": True}) == 0
@@ -0,0 +1,76 @@
+"""core/writing.py — range and metadata reads of inline note content."""
+
+import pytest
+
+from core import write_buffer
+from core.writing import WritingService
+
+TEXT = "ünïcode " * 40
+
+
+@pytest.fixture
+def notes(db, perf_config, monkeypatch):
+    perf_config("note_bodies", enabled=False)
+    perf_config("note_write_buffer", enabled=False)
+    monkeypatch.setattr(write_buffer, "_entries", {})
+    db.notes.insert_one({"user_id": "u1", "note_id": "n1", "content": TEXT, "content_length": len(TEXT),
+                         "content_version": 2, "word_count": 40, "char_count": len(TEXT), "read_time_min": 1})
+    # Written before content_length was stored
+    db.notes.insert_one({"user_id": "u1", "note_id": "legacy", "content": "abcdef"})
+
+    fetched = []
+    aggregate = db.notes.aggregate
+
+    def spy(pipeline, *args, **kwargs):
+        docs = list(aggregate(pipeline, *args, **kwargs))
+        fetched.extend(dict(doc) for doc in docs)
+        return iter(docs)
+
+    def no_full_read(*args, **kwargs):
+        raise AssertionError("range reads must not fetch the whole note")
+
+    monkeypatch.setattr(db.notes, "aggregate", spy)
+    monkeypatch.setattr(db.notes, "find_one", no_full_read)
+    return db, fetched
+
+
+def test_ranges_are_cut_in_the_database(notes):
+    db, fetched = notes
+    parts, offset = [], 0
+    while offset is not None:
+        page, error, _ = WritingService.get_note_content(db, "u1", "n1", offset=offset, limit=50, version=2)
+        assert error is None and page["content_length"] == len(TEXT)
+        parts.append(page["content"])
+        offset = page["next_offset"]
+    assert "".join(parts) == TEXT
+    assert all("content" not in doc and len(doc["_slice"]) <= 50 for doc in fetched)
+
+
+def test_first_screen(notes):
+    db, _ = notes
+    note, _, _ = WritingService.get_note(db, "u1", "n1", content_limit=10)
+    assert (note["content"], note["content_length"], note["next_offset"]) == (TEXT[:10], len(TEXT), 10)
+    assert note["stats"]["word_count"] == 40
+
+
+def test_metadata_only(notes):
+    db, fetched = notes
+    note, _, _ = WritingService.get_note(db, "u1", "n1", include_content=False)
+    assert "content" not in note and note["content_length"] == len(TEXT)
+    assert fetched[-1]["_slice"] == ""
+    legacy, _, _ = WritingService.get_note(db, "u1", "legacy", include_content=False)
+    assert legacy["content_length"] == 6
+
+
+def test_buffered_edit_is_served(notes, perf_config):
+    db, _ = notes
+    perf_config("note_write_buffer", enabled=True)
+    write_buffer._entries[("u1", "n1")] = {"fields": {"content": "buffered", "content_version": 3}}
+    note, _, _ = WritingService.get_note(db, "u1", "n1", content_limit=4)
+    assert (note["content"], note["content_length"]) == ("buff", 8)
+
+
+def test_missing_note(notes):
+    db, _ = notes
+    assert WritingService.get_note_content(db, "u1", "nope")[2] == 404
+    assert WritingService.get_note(db, "u1", "nope", include_content=False)[2] == 404
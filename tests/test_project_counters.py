@@ -0,0 +1,76 @@
+"""core/project_counters.py — denormalized per-project counters."""
+
+import pytest
+
+from core import project_counters
+from core.project_counters import ProjectCounters
+
+
+@pytest.fixture
+def db_with_project(db, monkeypatch):
+    monkeypatch.setattr(project_counters, "_today", lambda: "2026-10-17")
+    db.projects.insert_one({"user_id": "u1", "project_id": "p1", "task_count": 0, "done_count": 0,
+                            "archived_count": 0, "done_by_day": {"2026-10-01": 3}})
+    return db
+
+
+def _project(db):
+    return db.projects.find_one({"project_id": "p1"}, {"_id": 0})
+
+
+def test_contribution():
+    task = {"project_id": "p1", "status": "completed", "isArchived": True}
+    assert ProjectCounters.contribution(task, "2026-10-17") == {"task_count": 1, "archived_count": 1, "done_count": 1}
+    recurring = {"recurrence": "daily", "completed_dates": ["2026-10-16", "2026-10-17", "2026-10-17"]}
+    assert ProjectCounters.contribution(recurring, "2026-10-17") == {"task_count": 1, "done_by_day.2026-10-17": 1}
+
+
+def test_insert_update_delete(db_with_project):
+    db = db_with_project
+    task = {"project_id": "p1", "status": "pending"}
+    ProjectCounters.apply_change(db, "u1", None, task)
+    done = {**task, "status": "completed"}
+    ProjectCounters.apply_change(db, "u1", task, done)
+    assert (_project(db)["task_count"], _project(db)["done_count"]) == (1, 1)
+    ProjectCounters.apply_change(db, "u1", done, None)
+    assert (_project(db)["task_count"], _project(db)["done_count"]) == (0, 0)
+
+
+def test_move_between_projects(db_with_project):
+    db = db_with_project
+    db.projects.insert_one({"user_id": "u1", "project_id": "p2", "task_count": 0})
+    task = {"project_id": "p1", "status": "completed"}
+    ProjectCounters.apply_change(db, "u1", None, task)
+    ProjectCounters.apply_change(db, "u1", task, {**task, "project_id": "p2"})
+    assert _project(db)["task_count"] == 0
+    assert db.projects.find_one({"project_id": "p2"})["done_count"] == 1
+
+
+def test_recurring_completion_prunes_past_days(db_with_project):
+    db = db_with_project
+    task = {"project_id": "p1", "recurrence": "daily", "completed_dates": []}
+    ProjectCounters.apply_change(db, "u1", None, task)
+    ProjectCounters.apply_change(db, "u1", task, {**task, "completed_dates": ["2026-10-17"]})
+    project = _project(db)
+    assert project["done_by_day"] == {"2026-10-17": 1}
+    assert ProjectCounters.read(project) == (1, 1)
+
+
+def test_uninitialized_projects_are_skipped(db):
+    db.projects.insert_one({"user_id": "u1", "project_id": "old"})
+    ProjectCounters.apply_change(db, "u1", None, {"project_id": "old"})
+    project = db.projects.find_one({"project_id": "old"}, {"_id": 0})
+    assert "task_count" not in project and ProjectCounters.read(project) is None
+
+
+def test_repair_recomputes_everything(db_with_project):
+    db = db_with_project
+    db.tasks.insert_many([
+        {"user_id": "u1", "project_id": "p1", "status": "completed"},
+        {"user_id": "u1", "project_id": "p1", "status": "pending", "isArchived": True},
+        {"user_id": "u1", "project_id": "p1", "recurrence": "daily", "completed_dates": ["2026-10-10", "2026-10-17"]},
+    ])
+    assert ProjectCounters.repair(db, "u1") == 1
+    project = _project(db)
+    assert (project["task_count"], project["done_count"], project["archived_count"]) == (3, 1, 1)
+    assert project["done_by_day"] == {"2026-10-17": 1}
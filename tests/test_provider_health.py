@@ -0,0 +1,116 @@
+"""core/provider_health.py — per-provider circuit breaker."""
+
+import types
+
+import pytest
+
+from core import provider_health
+from core.provider_health import ProviderBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = types.SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(provider_health, "time", types.SimpleNamespace(monotonic=lambda: now.t))
+    return now
+
+
+@pytest.fixture
+def breaker(perf_config, ai_state, clock):
+    return perf_config("ai_circuit_breaker", enabled=True, window_sec=60, failure_threshold=3, min_calls=4,
+                       error_rate=0.5, slow_call_sec=15, slow_rate=0.8, open_sec=30, max_open_sec=100,
+                       probe_timeout_sec=90)
+
+
+def _state(provider="p"):
+    return ProviderBreaker.snapshot()[provider]["state"]
+
+
+def test_disabled_breaker_always_allows(perf_config, ai_state):
+    perf_config("ai_circuit_breaker", enabled=False)
+    for _ in range(10):
+        ProviderBreaker.record("p", False, 1.0)
+    assert ProviderBreaker.allow("p") and ProviderBreaker.snapshot() == {}
+
+
+def test_opens_after_consecutive_failures(breaker):
+    for _ in range(2):
+        ProviderBreaker.record("p", False, 0.1, "boom")
+    assert _state() == "closed" and ProviderBreaker.allow("p")
+    ProviderBreaker.record("p", False, 0.1, "boom")
+    assert _state() == "open" and not ProviderBreaker.allow("p")
+    assert ProviderBreaker.snapshot()["p"]["last_error"] == "boom"
+
+
+def test_a_success_resets_the_streak(breaker, perf_config):
+    perf_config("ai_circuit_breaker", min_calls=10)
+    for ok in (False, False, True, False, False):
+        ProviderBreaker.record("p", ok, 0.1)
+    assert _state() == "closed"
+
+
+def test_opens_on_error_rate_in_the_window(breaker):
+    # Never 3 failures in a row, but half the window failed
+    for ok in (False, True, False, True, False, True):
+        ProviderBreaker.record("p", ok, 0.1)
+        if _state() == "open":
+            break
+    assert _state() == "open"
+
+
+def test_old_calls_leave_the_window(breaker, clock):
+    for ok in (False, True, False):
+        ProviderBreaker.record("p", ok, 0.1)
+    clock.t += 61
+    for _ in range(3):
+        ProviderBreaker.record("p", True, 0.1)
+    ProviderBreaker.record("p", False, 0.1)
+    assert _state() == "closed"
+    assert ProviderBreaker.snapshot()["p"]["calls"] == 4
+
+
+def test_opens_when_calls_are_slow(breaker):
+    for _ in range(4):
+        ProviderBreaker.record("p", True, 20.0)
+    assert _state() == "open"
+
+
+def test_half_open_allows_a_single_probe(breaker, clock):
+    for _ in range(3):
+        ProviderBreaker.record("p", False, 0.1)
+    clock.t += 30
+    assert ProviderBreaker.allow("p")
+    assert not ProviderBreaker.allow("p")
+    # A probe that never reports back frees the slot after probe_timeout_sec
+    clock.t += 90
+    assert ProviderBreaker.allow("p")
+    ProviderBreaker.record("p", True, 0.1)
+    assert _state() == "closed" and ProviderBreaker.allow("p")
+
+
+def test_failed_probes_back_off(breaker, clock):
+    for _ in range(3):
+        ProviderBreaker.record("p", False, 0.1)
+    waits = []
+    for _ in range(4):
+        waits.append(ProviderBreaker.snapshot()["p"]["retry_in_sec"])
+        clock.t += waits[-1]
+        assert ProviderBreaker.allow("p")
+        ProviderBreaker.record("p", False, 0.1)
+    assert waits == [30, 60, 100, 100]
+
+
+def test_latency_percentile_uses_successful_calls(breaker):
+    assert ProviderBreaker.latency_percentile("p", 95) is None
+    for latency in (1.0, 2.0, 3.0):
+        ProviderBreaker.record("p", True, latency)
+    ProviderBreaker.record("p", False, 50.0)
+    assert ProviderBreaker.latency_percentile("p", 50) == 2.0
+    assert ProviderBreaker.latency_percentile("p", 95) == 3.0
+
+
+def test_single_failure_does_not_open_by_default(breaker):
+    del breaker["failure_threshold"]
+    ProviderBreaker.record("p", False, 0.1)
+    ProviderBreaker.record("p", False, 0.1)
+    assert _state() == "closed"
@@ -0,0 +1,90 @@
+"""core/quick_notes.py — captures stay the source of truth; compaction claims what it moves."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.quick_notes import QuickNoteStore
+from core.writing import WritingService, _get_system_project_id
+
+
+@pytest.fixture
+def quick_note(db, perf_config):
+    perf_config("note_write_buffer", enabled=False)
+    perf_config("quick_notes", compact_after_days=7, segment_max_entries=2, claim_timeout_sec=300)
+    db.notes.insert_one({"user_id": "u1", "note_id": "q1", "project_id": _get_system_project_id(),
+                         "filename": "QuickNote.txt", "title": "QuickNote", "content": "typed",
+                         "content_version": 1})
+    return db
+
+
+def _capture(db, content, days_ago=0):
+    entry = QuickNoteStore.append(db, "u1", content)
+    created = datetime.now() - timedelta(days=days_ago, minutes=len(content))
+    db.quick_note_entries.update_one({"entry_id": entry["entry_id"]}, {"$set": {"created_at": created}})
+    return entry
+
+
+def _page_all(db, limit):
+    contents, cursor = [], None
+    while True:
+        page, error = QuickNoteStore.page(db, "u1", limit, cursor)
+        assert error is None
+        contents += [e["content"] for e in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return contents
+
+
+def test_opening_the_note_leaves_captures_in_place(quick_note):
+    _capture(quick_note, "one")
+    note, _, _ = WritingService.get_note(quick_note, "u1", "q1")
+    assert note["content"] == "typed"
+    assert note["content_version"] == 1
+    assert [e["content"] for e in QuickNoteStore.history(quick_note, "u1")] == ["one"]
+    assert _page_all(quick_note, 10) == ["one"]
+
+
+def test_legacy_endpoint_appends_captures_read_only(quick_note):
+    _capture(quick_note, "older", days_ago=1)
+    _capture(quick_note, "newer")
+    content, _, _ = WritingService.get_quick_note(quick_note, "u1", {"note_id": "q1"})
+    parts = content.split("\n\n---\n")
+    assert parts[0] == "typed"
+    assert [p.split("] ", 1)[1] for p in parts[1:]] == ["older", "newer"]
+    assert quick_note.quick_note_entries.count_documents({}) == 2
+    assert quick_note.notes.find_one({"note_id": "q1"})["content"] == "typed"
+
+
+def test_compaction_keeps_order_and_history(quick_note):
+    for i in range(5):
+        _capture(quick_note, f"old{i}", days_ago=10 + i)
+    _capture(quick_note, "new")
+    assert QuickNoteStore.compact(quick_note, "u1") == 5
+    assert quick_note.quick_note_segments.count_documents({}) == 3
+    assert _page_all(quick_note, 2) == ["new", "old0", "old1", "old2", "old3", "old4"]
+    assert [e["content"] for e in QuickNoteStore.history(quick_note, "u1")][-1] == "new"
+
+
+def test_claimed_entries_are_not_moved_twice(quick_note):
+    _capture(quick_note, "old", days_ago=10)
+    quick_note.quick_note_entries.update_many({}, {"$set": {"claim": "other", "claimed_at": datetime.now()}})
+    assert QuickNoteStore.compact(quick_note, "u1") == 0
+    assert quick_note.quick_note_segments.count_documents({}) == 0
+
+
+def test_interrupted_compaction_is_taken_over_without_duplicates(quick_note):
+    _capture(quick_note, "old", days_ago=10)
+    # A run that copied the entry into a segment, then died before deleting it
+    entry = quick_note.quick_note_entries.find_one({}, {"_id": 0, "user_id": 0})
+    quick_note.quick_note_segments.insert_one({"segment_id": "s1", "user_id": "u1", "start": entry["created_at"],
+                                               "end": entry["created_at"], "count": 1, "entries": [entry]})
+    quick_note.quick_note_entries.update_many(
+        {}, {"$set": {"claim": "dead", "claimed_at": datetime.now() - timedelta(hours=1)}})
+    assert _page_all(quick_note, 10) == ["old"]
+    assert [e["content"] for e in QuickNoteStore.history(quick_note, "u1")] == ["old"]
+
+    assert QuickNoteStore.compact(quick_note, "u1") == 1
+    assert quick_note.quick_note_entries.count_documents({}) == 0
+    assert quick_note.quick_note_segments.count_documents({}) == 1
+    assert _page_all(quick_note, 10) == ["old"]
@@ -0,0 +1,81 @@
+"""core/ranking.py — fractional orders for drag-and-drop moves."""
+
+import pytest
+
+from core import ranking
+from core.ranking import move_between, rank_between, rebalance
+
+SCOPE = {"user_id": "u1"}
+
+
+@pytest.fixture
+def tasks(db):
+    db.tasks.insert_many([{"user_id": "u1", "task_id": f"t{i}", "order": i} for i in range(4)])
+    return db.tasks
+
+
+def _ids(tasks):
+    return [d["task_id"] for d in tasks.find(SCOPE).sort([("order", 1), ("task_id", 1)])]
+
+
+def _rebalance(tasks, calls):
+    def fn():
+        calls.append(1)
+        return rebalance(tasks, SCOPE, "task_id")
+    return fn
+
+
+def test_rank_between():
+    assert rank_between() == 0
+    assert rank_between(None, 3) == 2
+    assert rank_between(3, None) == 4
+    assert rank_between(1, 2) == 1.5
+    assert rank_between(1, 1) is None
+
+
+def test_move_writes_only_the_moved_item(tasks):
+    order, error = move_between(tasks, SCOPE, "task_id", "t3", "t0", "t1")
+    assert (order, error) == (0.5, None)
+    assert _ids(tasks) == ["t0", "t3", "t1", "t2"]
+    assert [d["order"] for d in tasks.find({"task_id": {"$ne": "t3"}}).sort("order", 1)] == [0, 1, 2]
+
+
+def test_move_to_top_and_bottom(tasks):
+    move_between(tasks, SCOPE, "task_id", "t2", None, "t0")
+    move_between(tasks, SCOPE, "task_id", "t1", "t3", None)
+    assert _ids(tasks) == ["t2", "t0", "t3", "t1"]
+
+
+def test_tied_neighbours_rebalance_first(tasks):
+    tasks.update_many(SCOPE, {"$set": {"order": 0}})
+    calls = []
+    order, error = move_between(tasks, SCOPE, "task_id", "t3", "t0", "t1", _rebalance(tasks, calls))
+    assert error is None and calls == [1]
+    assert _ids(tasks) == ["t0", "t3", "t1", "t2"]
+
+
+def test_inverted_neighbours_are_rejected_without_rebalance(tasks):
+    calls = []
+    order, error = move_between(tasks, SCOPE, "task_id", "t0", "t3", "t1", _rebalance(tasks, calls))
+    assert order is None and error == "prev_id must come before next_id"
+    assert calls == []
+    assert _ids(tasks) == ["t0", "t1", "t2", "t3"]
+
+
+def test_unknown_neighbour(tasks):
+    assert move_between(tasks, SCOPE, "task_id", "t0", "nope", None) == (None, "Neighbour not found")
+
+
+def test_dense_gap_schedules_background_rebalance(tasks, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(ranking, "run_in_background", lambda key, fn, *args: scheduled.append(key))
+    tasks.update_one({"task_id": "t1"}, {"$set": {"order": 1e-7}})
+    order, error = move_between(tasks, SCOPE, "task_id", "t3", "t0", "t1", lambda: None)
+    assert error is None and 0 < order < 1e-7
+    assert scheduled == ["tasks:user_id=u1"]
+
+
+def test_rebalance_renumbers_in_sequence(tasks):
+    tasks.update_one({"task_id": "t3"}, {"$set": {"order": 0.5}})
+    assert rebalance(tasks, SCOPE, "task_id") == {"t3": 1, "t1": 2, "t2": 3}
+    assert _ids(tasks) == ["t0", "t3", "t1", "t2"]
@@ -0,0 +1,35 @@
+"""Every blueprint registers on a bare app (endpoint names must be unique)."""
+
+import importlib
+
+import pytest
+from flask import Flask
+
+BLUEPRINTS = [
+    ("routes.auth",      "auth_bp"),
+    ("routes.tasks",     "tasks_bp"),
+    ("routes.writing",   "writing_bp"),
+    ("routes.settings",  "settings_bp"),
+    ("routes.archive",   "archive_bp"),
+    ("routes.templates", "templates_bp"),
+    ("routes.ai",        "ai_bp"),
+    ("routes.dashboard", "dashboard_bp"),
+]
+
+
+@pytest.mark.parametrize("module_path, bp_name", BLUEPRINTS)
+def test_blueprint_registers(module_path, bp_name):
+    app = Flask(__name__)
+    app.register_blueprint(getattr(importlib.import_module(module_path), bp_name), url_prefix="/api")
+
+
+def test_note_content_endpoints_are_distinct():
+    from routes.writing import writing_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(writing_bp, url_prefix="/api")
+    endpoints = {(rule.rule, method): rule.endpoint
+                 for rule in app.url_map.iter_rules() for method in rule.methods}
+    assert endpoints[("/api/notes/content", "GET")] == "writing.get_note_content"
+    assert endpoints[("/api/notes/<string:note_id>/content", "GET")] == "writing.get_note_content_range"
+    assert endpoints[("/api/notes/<string:note_id>/content", "PATCH")] == "writing.patch_note_content"
@@ -0,0 +1,11 @@
+"""core/schema_factory.py — sequence counters."""
+
+from core.schema_factory import _sequence_key
+
+
+def test_sequence_keys_do_not_collide_across_scopes():
+    a = _sequence_key("note", "order", {"project_id": "p1|user_id=u2", "user_id": "u1"})
+    b = _sequence_key("note", "order", {"project_id": "p1", "user_id": "u2|user_id=u1"})
+    assert a != b
+    assert _sequence_key("note", "order", {"user_id": "u1", "project_id": "p1"}) == \
+        _sequence_key("note", "order", {"project_id": "p1", "user_id": "u1"})
@@ -0,0 +1,156 @@
+"""core/search_index.py (BM25) and core/trigram_index.py — ranking, sync and build lock."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.search_index import NoteSearchIndex, tokenize
+from core.trigram_index import TrigramIndex, substring_distance
+
+
+def _note(note_id, title="", content="", tags=(), description=""):
+    return {"user_id": "u1", "note_id": note_id, "title": title, "content": content,
+            "tags": list(tags), "description": description}
+
+
+@pytest.fixture
+def notes(db, perf_config):
+    perf_config("search_index", enabled=True)
+    perf_config("trigram_index", enabled=True)
+    NoteSearchIndex.ensure_indexes(db)
+    TrigramIndex.ensure_indexes(db)
+    db.notes.insert_many([
+        _note("n1", title="Budget plan", content="<p>Monthly budget and savings</p>"),
+        _note("n2", title="Groceries", content="milk, bread", tags=["budget"]),
+        _note("n3", title="Travel", content="Visit Lisbon in spring"),
+    ])
+    return db
+
+
+def test_tokenize():
+    assert tokenize("Hello, wORLD a 7 x") == ["hello", "world", "7"]
+
+
+def test_bm25_ranks_title_matches_first(notes):
+    ranked = NoteSearchIndex.search(notes, "u1", "budget ")
+    assert [nid for nid, _ in ranked] == ["n1", "n2"]
+    assert ranked[0][1] > ranked[1][1] > 0
+
+
+def test_last_term_matches_as_prefix(notes):
+    assert [nid for nid, _ in NoteSearchIndex.search(notes, "u1", "lisb")] == ["n3"]
+    assert NoteSearchIndex.search(notes, "u1", "lisb ") == []
+
+
+def test_incremental_updates(notes):
+    NoteSearchIndex.search(notes, "u1", "budget")
+    NoteSearchIndex.index_note(notes, "u1", _note("n3", title="Travel budget", content="Lisbon"))
+    NoteSearchIndex.remove_notes(notes, "u1", ["n2"])
+    assert {nid for nid, _ in NoteSearchIndex.search(notes, "u1", "budget ")} == {"n1", "n3"}
+    stats = notes.search_stats.find_one({"user_id": "u1"})
+    assert stats["doc_count"] == 2 and stats["state"] == "ready"
+
+
+def test_snippet_is_escaped_and_highlighted():
+    note = _note("n", content="<p>a &lt;b&gt; budget line</p>")
+    assert NoteSearchIndex.snippet(note, "budget") == "a &lt;b&gt; <mark>budget</mark> line"
+
+
+def test_search_waits_for_a_running_build(notes):
+    notes.search_stats.insert_one({"user_id": "u1", "state": "building",
+                                   "build_started": datetime.now(timezone.utc)})
+    assert NoteSearchIndex.search(notes, "u1", "budget") is None
+    assert NoteSearchIndex.build(notes, "u1") is None
+    assert notes.search_postings.count_documents({}) == 0
+
+
+def test_stale_build_lock_is_taken_over(notes):
+    notes.search_stats.insert_one({"user_id": "u1", "state": "building",
+                                   "build_started": datetime.now(timezone.utc) - timedelta(hours=1)})
+    assert [nid for nid, _ in NoteSearchIndex.search(notes, "u1", "budget ")] == ["n1", "n2"]
+
+
+def test_only_one_lazy_build_claims_the_lock(notes):
+    assert NoteSearchIndex._claim_build(notes, "u1", rebuild=False)
+    assert not NoteSearchIndex._claim_build(notes, "u1", rebuild=False)
+    NoteSearchIndex._build(notes, "u1")
+    assert not NoteSearchIndex._claim_build(notes, "u1", rebuild=False)
+    assert NoteSearchIndex.build(notes, "u1") == 3
+
+
+def test_query_without_indexed_words_falls_back_to_regex(notes, perf_config):
+    from core.writing import WritingService
+
+    perf_config("trigram_index", enabled=False)
+    assert NoteSearchIndex.search(notes, "u1", "t p") is None
+    assert [n["note_id"] for n in WritingService.search_notes(notes, "u1", "t p")] == ["n1"]
+
+
+def test_note_search_falls_back_while_index_builds(notes):
+    from core.writing import WritingService
+
+    notes.search_stats.insert_one({"user_id": "u1", "state": "building",
+                                   "build_started": datetime.now(timezone.utc)})
+    notes.trigram_built.insert_one({"user_id": "u1", "kind": "note", "state": "building",
+                                    "build_started": datetime.now(timezone.utc)})
+    assert [n["note_id"] for n in WritingService.search_notes(notes, "u1", "Groceries")] == ["n2"]
+
+
+def test_substring_distance():
+    assert substring_distance("budget", "my budget plan", 2) == 0
+    assert substring_distance("budgte", "my budget plan", 2) == 1
+    assert substring_distance("xyzzy", "budget", 1) == 2
+
+
+def test_trigram_substring_and_typos(notes):
+    assert TrigramIndex.search(notes, "u1", "note", "udge") == [("n1", 0), ("n2", 0)]
+    assert TrigramIndex.search(notes, "u1", "note", "grocieres") == [("n2", 2)]
+    assert TrigramIndex.search(notes, "u1", "note", "zz") is None
+
+
+def test_trigram_fuzzy_needs_two_shared_trigrams_and_caps_candidates(notes, perf_config):
+    notes.notes.insert_one(_note("n4", title="Plan abcx"))
+    TrigramIndex.build(notes, "u1", "note")
+    # "abcx" is one edit from "abcd" but shares only "abc"
+    assert TrigramIndex.search(notes, "u1", "note", "abcd") == []
+    assert TrigramIndex.search(notes, "u1", "note", "budgte") == [("n1", 1), ("n2", 1)]
+    perf_config("trigram_index", fuzzy_candidates=1)
+    assert TrigramIndex.search(notes, "u1", "note", "budgte") == [("n1", 1)]
+
+
+def test_trigram_build_lock(notes):
+    notes.trigram_built.insert_one({"user_id": "u1", "kind": "note", "state": "building",
+                                    "build_started": datetime.now(timezone.utc)})
+    assert TrigramIndex.search(notes, "u1", "note", "budget") is None
+    assert TrigramIndex.build(notes, "u1", "note") is None
+    assert TrigramIndex.search(notes, "u1", "task", "budget") == []
+
+
+def test_note_list_search_is_limited_and_loads_only_returned_bodies(notes, monkeypatch):
+    from core.note_bodies import NoteBodyStore
+    from core.write_buffer import NoteWriteBuffer
+    from core.writing import WritingService
+
+    monkeypatch.setattr(NoteWriteBuffer, "flush_user", staticmethod(lambda user_id: None))
+    notes.notes.insert_many([_note(f"b{i}", title=f"budget {i}") for i in range(30)])
+    NoteSearchIndex.build(notes, "u1")
+    loaded = []
+    load_many = NoteBodyStore.load_many
+    monkeypatch.setattr(NoteBodyStore, "load_many",
+                        staticmethod(lambda db, user_id, batch: loaded.extend(batch) or load_many(db, user_id, batch)))
+
+    results = WritingService.get_notes(notes, "u1", search="budget ", limit=5)
+    assert len(results) == 5
+    assert len(loaded) == 5
+    assert all("snippet" in n and "content" not in n for n in results)
+
+
+def test_trigram_finds_text_past_the_indexed_prefix(notes, perf_config):
+    perf_config("trigram_index", max_text_chars=50)
+    notes.tasks.insert_many([
+        {"user_id": "u1", "task_id": "t1", "title": "Long task", "description": "filler " * 20 + "needle   in text"},
+        {"user_id": "u1", "task_id": "t2", "title": "needle early", "description": ""},
+    ])
+    assert TrigramIndex.search(notes, "u1", "task", "needle in") == [("t1", 0), ("t2", 2)]
+    row = notes.trigram_docs.find_one({"doc_id": "t1"})
+    assert row["truncated"] and len(row["text"]) == 50
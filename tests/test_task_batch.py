@@ -0,0 +1,40 @@
+"""core/task.py — POST /api/tasks/batch (TaskService.create_tasks)."""
+
+import copy
+
+import pytest
+
+from core import config_loader
+from core.schema_factory import build_documents, validate_document
+from core.task import TaskService
+
+
+@pytest.fixture
+def schemas(monkeypatch):
+    """Task schema with a required `area` field, for one test."""
+    schemas = copy.deepcopy(config_loader.load_yaml("schemas.yaml"))
+    schemas["task"]["fields"]["area"] = {"type": "string", "required": True}
+    monkeypatch.setitem(config_loader._yaml_cache, "schemas.yaml", schemas)
+    return schemas
+
+
+def test_invalid_items_fail_alone(db, perf_config, schemas):
+    perf_config("occurrence_store", enabled=False)
+    perf_config("trigram_index", enabled=False)
+    items = [{"title": "A", "area": "home"}, {"title": "B"}, "C", {"title": "D", "area": "work"}]
+    result, error = TaskService.create_tasks(db, "u1", items)
+
+    assert error is None and (result["created"], result["failed"]) == (2, 2)
+    assert [(e["index"], e["error"]) for e in result["errors"]] == [
+        (1, "Required field 'area' is missing for entity 'task'."),
+        (2, "Task must be an object"),
+    ]
+    assert sorted(t["title"] for t in db.tasks.find({"user_id": "u1"})) == ["A", "D"]
+
+
+def test_build_documents_checks_every_item_before_reserving(db, schemas):
+    assert validate_document("task", {"title": "A"}, user_id="u1") is not None
+    assert validate_document("task", {"title": "A", "area": "x"}, user_id="u1") is None
+    with pytest.raises(ValueError, match="Item 1"):
+        build_documents("task", [{"title": "A", "area": "x"}, {"title": "B"}], db=db, user_id="u1")
+    assert db.counters.count_documents({}) == 0
@@ -0,0 +1,65 @@
+"""core/task.py — keyset pagination of the task list."""
+
+from datetime import date
+
+import pytest
+
+from core.task import TaskService, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def tasks(db, perf_config):
+    perf_config("occurrence_store", enabled=False)
+    perf_config("trigram_index", enabled=False)
+    docs = [{"user_id": "u1", "task_id": f"t{i}", "title": f"Task {i}", "order": i % 3, "recurrence": "none",
+             "status": "pending", "isArchived": False} for i in range(7)]
+    docs += [{"user_id": "u1", "task_id": "z1", "title": "Null order", "order": None, "recurrence": "none",
+              "status": "pending", "isArchived": False},
+             {"user_id": "u1", "task_id": "z0", "title": "No order", "recurrence": "none",
+              "status": "pending", "isArchived": False}]
+    db.tasks.insert_many(docs)
+    return db
+
+
+def _walk(db, limit):
+    ids, cursor = [], None
+    while True:
+        page, error = TaskService.get_tasks_page(db, "u1", limit=limit, cursor=cursor)
+        assert error is None
+        ids += [t["task_id"] for t in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_list_order_matches_mongo(tasks):
+    ids = [t["task_id"] for t in TaskService.get_tasks(tasks, "u1")]
+    mongo = [t["task_id"] for t in tasks.tasks.find({}).sort([("order", 1), ("task_id", 1)])]
+    assert ids == mongo
+    assert ids[:2] == ["z0", "z1"]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4, 100])
+def test_pages_cover_every_task_once(tasks, limit):
+    assert _walk(tasks, limit) == [t["task_id"] for t in TaskService.get_tasks(tasks, "u1")]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor((1.5, "t1"))) == (1.5, "t1")
+    assert decode_cursor(encode_cursor((None, "t1"))) == (None, "t1")
+    assert decode_cursor("not a cursor") is None
+    assert decode_cursor(encode_cursor(("x", "t1"))) is None
+
+
+def test_invalid_input(tasks):
+    assert TaskService.get_tasks_page(tasks, "u1", cursor="garbage") == (None, "Invalid cursor")
+    assert TaskService.get_tasks_page(tasks, "u1", limit="many")[1] == "limit must be an integer"
+
+
+def test_search_and_date_window_combine_without_a_second_or():
+    search = [{"title": {"$regex": "plan"}}, {"description": {"$regex": "plan"}}]
+    query = TaskService._one_off_query({"user_id": "u1", "$or": search},
+                                       window_start=date(2026, 5, 1), window_end=date(2026, 5, 31))
+    assert "$or" not in query
+    assert query["$and"][0] == {"$or": search}
+    assert {"start_date": {"$gte": "2026-05-01", "$lte": "2026-05-31"}} in query["$and"][1]["$or"]
@@ -0,0 +1,63 @@
+"""core/templates.py — importing built-in templates."""
+
+import pytest
+
+from core.task import TaskService
+from core.templates import TemplateService
+
+
+@pytest.fixture
+def data():
+    return {
+        "type": "project_with_tasks",
+        "project": {"name": "Launch", "color": "#000"},
+        "tasks": [{"title": "Plan"}, {"priority": "high"}],
+    }
+
+
+def test_project_with_tasks(db, data):
+    result, error = TemplateService._import_project_with_tasks(db, "u1", data)
+    assert error is None
+    assert [t["title"] for t in result["tasks"]] == ["Plan", "New Task"]
+    project_id = result["project"]["project_id"]
+    assert db.tasks.count_documents({"user_id": "u1", "project_id": project_id}) == 2
+
+
+def test_failed_task_batch_leaves_no_project(db, data, monkeypatch):
+    monkeypatch.setattr(TaskService, "create_tasks", staticmethod(lambda db, user_id, items: (None, "boom")))
+    assert TemplateService._import_project_with_tasks(db, "u1", data) == (None, "boom")
+    assert db.projects.count_documents({"user_id": "u1"}) == 0
+
+
+def test_crash_midway_removes_what_was_created(db, data, monkeypatch):
+    create_tasks = TaskService.create_tasks
+
+    def crash(db, user_id, items):
+        create_tasks(db, user_id, items)
+        raise RuntimeError("counter update failed")
+
+    monkeypatch.setattr(TaskService, "create_tasks", staticmethod(crash))
+    with pytest.raises(RuntimeError):
+        TemplateService._import_project_with_tasks(db, "u1", data)
+    assert db.projects.count_documents({"user_id": "u1"}) == 0
+    assert db.tasks.count_documents({"user_id": "u1"}) == 0
+
+
+def test_writing_note_goes_through_create_note(db, perf_config, monkeypatch):
+    from core.search_index import NoteSearchIndex
+    from core.writing import WritingService
+
+    perf_config("search_index", enabled=True)
+    perf_config("note_bodies", enabled=True)
+    NoteSearchIndex.build(db, "u1")
+    created = []
+    create_note = WritingService.create_note
+    monkeypatch.setattr(WritingService, "create_note",
+                        staticmethod(lambda *args: created.append(args) or create_note(*args)))
+
+    result, error = TemplateService.import_template(db, "u1", "book_review")
+    assert error is None and len(created) == 1
+    stored = db.notes.find_one({"note_id": result["note"]["note_id"]})
+    assert stored["body_rev"] and stored["word_count"] > 0
+    assert db.search_docs.count_documents({"note_id": stored["note_id"]}) == 1
+    assert TemplateService.import_template(db, "u1", "book_review")[0]["note"]["filename"] != stored["filename"]
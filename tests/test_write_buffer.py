@@ -0,0 +1,98 @@
+"""core/write_buffer.py — buffered autosaves and flush ordering."""
+
+import pytest
+
+from core import write_buffer
+from core.write_buffer import NoteWriteBuffer
+
+
+@pytest.fixture
+def buffer(db, perf_config, monkeypatch):
+    perf_config("note_write_buffer", enabled=True)
+    perf_config("note_bodies", enabled=False)
+    monkeypatch.setattr(write_buffer, "_entries", {})
+    monkeypatch.setattr(write_buffer, "_ensure_worker", lambda: None)
+    db.notes.insert_one({"user_id": "u1", "note_id": "n1", "content": "old", "content_version": 1})
+    return db
+
+
+def _edit(version, content):
+    return {"content": content, "content_version": version, "word_count": 1}
+
+
+def test_put_is_visible_before_flush(buffer):
+    NoteWriteBuffer.put(buffer, "u1", "n1", _edit(2, "new"))
+    assert NoteWriteBuffer.get("u1", "n1")["content"] == "new"
+    assert buffer.notes.find_one({"note_id": "n1"})["content"] == "old"
+
+
+def test_put_with_a_stale_base_version_is_refused(buffer):
+    assert NoteWriteBuffer.put(buffer, "u1", "n1", _edit(2, "a"), base_version=1)
+    assert not NoteWriteBuffer.put(buffer, "u1", "n1", _edit(2, "b"), base_version=1)
+    assert NoteWriteBuffer.put(buffer, "u1", "n1", _edit(3, "c"), base_version=2)
+
+
+def test_flush_writes_and_clears(buffer):
+    NoteWriteBuffer.put(buffer, "u1", "n1", _edit(2, "new"))
+    NoteWriteBuffer.flush("u1", "n1")
+    stored = buffer.notes.find_one({"note_id": "n1"})
+    assert (stored["content"], stored["content_version"]) == ("new", 2)
+    assert NoteWriteBuffer.get("u1", "n1") is None
+
+
+def test_entry_stays_readable_while_it_is_written(buffer, monkeypatch):
+    seen = []
+    write = write_buffer._write
+    monkeypatch.setattr(write_buffer, "_write",
+                        lambda *args: seen.append(NoteWriteBuffer.get("u1", "n1")) or write(*args))
+    NoteWriteBuffer.put(buffer, "u1", "n1", _edit(2, "new"))
+    NoteWriteBuffer.flush("u1", "n1")
+    assert seen[0]["content"] == "new"
+
+
+def test_newer_put_during_the_write_is_kept(buffer, monkeypatch):
+    write = write_buffer._write
+
+    def racing_write(user_id, note_id, entry):
+        write(user_id, note_id, entry)
+        NoteWriteBuffer.put(buffer, user_id, note_id, _edit(3, "newer"))
+
+    monkeypatch.setattr(write_buffer, "_write", racing_write)
+    NoteWriteBuffer.put(buffer, "u1", "n1", _edit(2, "new"))
+    NoteWriteBuffer.flush("u1", "n1")
+    assert NoteWriteBuffer.get("u1", "n1")["content"] == "newer"
+
+
+def test_failed_write_keeps_the_entry(buffer, monkeypatch):
+    def failing(*args):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(write_buffer, "_write", failing)
+    NoteWriteBuffer.put(buffer, "u1", "n1", _edit(2, "new"))
+    with pytest.raises(RuntimeError):
+        NoteWriteBuffer.flush("u1", "n1")
+    assert NoteWriteBuffer.get("u1", "n1")["content"] == "new"
+
+
+def test_discard(buffer):
+    NoteWriteBuffer.put(buffer, "u1", "n1", _edit(2, "new"))
+    NoteWriteBuffer.discard("u1", "n1")
+    NoteWriteBuffer.flush("u1", "n1")
+    assert buffer.notes.find_one({"note_id": "n1"})["content"] == "old"
+
+
+def test_note_list_flushes_only_for_a_search(buffer, monkeypatch):
+    from core.writing import WritingService
+
+    flushed = []
+    monkeypatch.setattr(NoteWriteBuffer, "flush_user", staticmethod(flushed.append))
+    assert WritingService.get_notes(buffer, "u1")[0]["content_version"] == 1
+    NoteWriteBuffer.put(buffer, "u1", "n1", _edit(2, "new words"))
+
+    listed = WritingService.get_notes(buffer, "u1")
+    assert (flushed, listed[0]["content_version"], listed[0]["word_count"]) == ([], 2, 1)
+    assert "content" not in listed[0]
+    WritingService.get_notes(buffer, "u2", search="new")
+    assert flushed == []
+    WritingService.get_notes(buffer, "u1", search="new")
+    assert flushed == ["u1"]
@@ -5,7 +5,7 @@
  *  - FAB toggle (open/close mini-widget)
  *  - Mode switching (clears per-mode conversation)
  *  - Message rendering (user + AI bubbles, action chips, typing indicator)
- *  - API calls to POST /api/ai/chat
+ *  - API calls to POST /api/ai/chat?stream=1 (reply rendered as it streams in)
  *  - Full AI Chat page (separate message list, same API)
  *  - Auto-resize textarea
  *
@@ -300,7 +300,8 @@
     state.widgetLoading = true;
 
     try {
-      const data = await callAI(state.widgetMode, state.widgetMessages[state.widgetMode]);
+      const onText = streamInto('ai-widget-messages', () => showWidgetTyping(false));
+      const data = await callAI(state.widgetMode, state.widgetMessages[state.widgetMode], onText);
       state.widgetMessages[state.widgetMode].push({ role: 'assistant', content: data.reply });
       renderWidgetMessages();
       renderWidgetActions(data.actions_taken || []);
@@ -492,7 +493,8 @@
     state.chatPageLoading = true;
 
     try {
-      const data = await callAI(state.chatPageMode, state.chatPageMessages[state.chatPageMode]);
+      const onText = streamInto('ai-chat-messages', () => showChatPageTyping(false));
+      const data = await callAI(state.chatPageMode, state.chatPageMessages[state.chatPageMode], onText);
       state.chatPageMessages[state.chatPageMode].push({ role: 'assistant', content: data.reply });
       renderChatPage();
       renderChatPageActions(data.actions_taken || []);
@@ -568,8 +570,14 @@
      SHARED API CALL
   ════════════════════════════════════════════════════════════════════ */
 
-  async function callAI(mode, messages) {
-    const resp = await window.LifeOSApi.apiFetch(`${API_URL}/ai/chat`, {
+  /**
+   * POST /api/ai/chat. With onText, the reply is streamed (SSE) and
+   * onText(textSoFar) runs on every token; resolves with the final
+   * {reply, actions_taken} either way.
+   */
+  async function callAI(mode, messages, onText) {
+    const url = onText ? `${API_URL}/ai/chat?stream=1` : `${API_URL}/ai/chat`;
+    const resp = await window.LifeOSApi.apiFetch(url, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ mode, messages }),
@@ -584,7 +592,68 @@
       throw new Error(errMsg);
     }
 
-    return resp.json();
+    return onText ? readChatStream(resp, onText) : resp.json();
+  }
+
+  /** Parse the SSE body of a streamed chat (token / action / done / error events). */
+  async function readChatStream(resp, onText) {
+    const reader  = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text   = '';
+    let result = null;
+
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let sep;
+      while ((sep = buffer.indexOf('\n\n')) >= 0) {
+        const frame = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+
+        let event = 'message';
+        let data  = '';
+        frame.split('\n').forEach((line) => {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        });
+        if (!data) continue;
+
+        const payload = JSON.parse(data);
+        if (event === 'token') {
+          text += payload.text;
+          onText(text);
+        } else if (event === 'done') {
+          result = payload;
+        } else if (event === 'error') {
+          throw new Error(payload.error);
+        }
+      }
+    }
+
+    if (!result) throw new Error('Connection closed before the reply finished.');
+    return result;
+  }
+
+  /**
+   * onText callback for callAI: shows the partial reply in a live bubble at
+   * the end of `containerId` (replaced by the normal render once done).
+   */
+  function streamInto(containerId, onFirstToken) {
+    let bubble = null;
+    return (text) => {
+      const container = document.getElementById(containerId);
+      if (!container) return;
+      if (!bubble) {
+        onFirstToken();
+        bubble = buildBubble('model', '');
+        container.appendChild(bubble);
+      }
+      bubble.querySelector('.ai-msg-bubble').innerHTML = markdownLite(text);
+      scrollToBottom(container);
+    };
   }
 
   /* ════════════════════════════════════════════════════════════════════
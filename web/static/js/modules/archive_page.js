@@ -77,37 +77,61 @@ const Archive = {
         if (searchInput) {
             searchInput.addEventListener('input', (e) => {
                 const q = (e.target.value || '').toLowerCase().trim();
-                if (!q) {
-                    this.filtered.tasks = [...this.data.tasks];
-                    this.filtered.notes = [...this.data.notes];
-                    this.filtered.note_projects = [...this.data.note_projects];
-                } else {
-                    const projNames = {};
-                    this.data.task_projects.forEach(p => { projNames[p.project_id] = (p.name || '').toLowerCase(); });
-                    
-                    this.filtered.tasks = this.data.tasks.filter(t =>
-                        (t.title || '').toLowerCase().includes(q) ||
-                        (t.description || '').toLowerCase().includes(q) ||
-                        (t.tags || []).some(tag => tag.toLowerCase().includes(q)) ||
-                        projNames[t.project_id]?.includes(q)
-                    );
-                    
-                    this.filtered.notes = this.data.notes.filter(n =>
-                        (n.title || '').toLowerCase().includes(q) ||
-                        (n.content || '').toLowerCase().includes(q) ||
-                        (n.description || '').toLowerCase().includes(q) ||
-                        (n.tags || []).some(tag => tag.toLowerCase().includes(q))
-                    );
-                    
-                    this.filtered.note_projects = this.data.note_projects.filter(p =>
-                        (p.name || '').toLowerCase().includes(q)
-                    );
+                this.applySearch(q, null);
+                // Note bodies are not in the list payload — ask the server for content matches
+                clearTimeout(this._searchTimer);
+                if (q.length >= 2) {
+                    this._searchTimer = setTimeout(() => this.searchNoteContent(q), 250);
                 }
-                this.render();
             });
         }
     },
 
+    async searchNoteContent(q) {
+        this._contentQuery = q;
+        try {
+            const res = await this._fetch(`${window.API_URL}/archive/notes/search?q=${encodeURIComponent(q)}`);
+            if (!res.ok) throw new Error('Archive search failed');
+            const json = await res.json();
+            // Ignore answers to a query the user has already changed
+            if (this._contentQuery !== q) return;
+            this.applySearch(q, new Set(json.note_ids || []));
+        } catch (e) {
+            console.warn('[Archive]', e);
+        }
+    },
+
+    applySearch(q, contentMatches) {
+        if (!q) {
+            this.filtered.tasks = [...this.data.tasks];
+            this.filtered.notes = [...this.data.notes];
+            this.filtered.note_projects = [...this.data.note_projects];
+        } else {
+            const projNames = {};
+            this.data.task_projects.forEach(p => { projNames[p.project_id] = (p.name || '').toLowerCase(); });
+
+            this.filtered.tasks = this.data.tasks.filter(t =>
+                (t.title || '').toLowerCase().includes(q) ||
+                (t.description || '').toLowerCase().includes(q) ||
+                (t.tags || []).some(tag => tag.toLowerCase().includes(q)) ||
+                projNames[t.project_id]?.includes(q)
+            );
+
+            this.filtered.notes = this.data.notes.filter(n =>
+                (n.title || '').toLowerCase().includes(q) ||
+                (n.description || '').toLowerCase().includes(q) ||
+                (n.tags || []).some(tag => tag.toLowerCase().includes(q)) ||
+                (n.excerpt || '').toLowerCase().includes(q) ||
+                (contentMatches?.has(n.note_id) ?? false)
+            );
+
+            this.filtered.note_projects = this.data.note_projects.filter(p =>
+                (p.name || '').toLowerCase().includes(q)
+            );
+        }
+        this.render();
+    },
+
     render() {
         this.renderTasks();
         this.renderWriting();
@@ -254,7 +278,8 @@ const Archive = {
     },
 
     _noteCard(note) {
-        const raw = (note.content || '').replace(/<[^>]+>/g, ' ').trim();
+        // List payloads carry a plain-text excerpt instead of the body
+        const raw = (note.excerpt || '').trim();
         const snippet = raw ? raw.substring(0, 100) + (raw.length > 100 ? '...' : '') : 'No content';
         const tags = (note.tags || []).slice(0, 4);
         return `
@@ -57,6 +57,15 @@ TS.api = {
     });
   },
 
+  async moveProject(id, prevId, nextId) {
+    const r = await _fetch(`${API}/projects/${id}/move`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ prev_id: prevId, next_id: nextId }),
+    });
+    return r.json();
+  },
+
   // ── Tasks ─────────────────────────────────────────────
   async getTasks(params = {}) {
     const q = new URLSearchParams();
@@ -66,6 +75,8 @@ TS.api = {
     if (params.search)     q.set('search',     params.search);
     if (params.sort)       q.set('sort',       params.sort);
     if (params.archived)   q.set('archived',   '1');
+    if (params.start)      q.set('start',      params.start);
+    if (params.end)        q.set('end',        params.end);
     const r = await _fetch(`${API}/tasks?${q}`);
     if (!r.ok) {
       console.error('[API] Failed to fetch tasks:', await r.text());
@@ -126,4 +137,12 @@ TS.api = {
       body: JSON.stringify({ ordered_ids: orderedIds }),
     });
   },
+  async moveTask(id, prevId, nextId) {
+    const r = await _fetch(`${API}/tasks/${id}/move`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ prev_id: prevId, next_id: nextId }),
+    });
+    return r.json();
+  },
 };
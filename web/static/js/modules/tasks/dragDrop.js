@@ -46,12 +46,18 @@ TS.dnd = {
             }
           }
 
-          // Save new order of all tasks in the destination list
-          const orderedIds = [...evt.to.querySelectorAll('[data-task-id]')]
-            .map(el => el.dataset.taskId);
-
           try {
-            await TS.api.reorderTasks(orderedIds);
+            if (TS.state.sortBy === 'order') {
+              // Save only the moved task's position between its new neighbours
+              const prevId = evt.item.previousElementSibling?.dataset.taskId || null;
+              const nextId = evt.item.nextElementSibling?.dataset.taskId || null;
+              await TS.api.moveTask(taskId, prevId, nextId);
+            } else {
+              // Sorted by another field: neighbours are not order neighbours — save the list
+              const orderedIds = [...evt.to.querySelectorAll('[data-task-id]')]
+                .map(el => el.dataset.taskId);
+              await TS.api.reorderTasks(orderedIds);
+            }
           } catch(e) {
             console.warn('[DnD] reorder save failed:', e);
           }
@@ -74,11 +80,11 @@ TS.dnd = {
         filter:      '.ts-project-body, .ts-project-quick-add',
         preventOnFilter: true,
 
-        onEnd: async () => {
-          const orderedIds = [...projContainer.querySelectorAll('.ts-project-card')]
-            .map(el => el.dataset.projectId);
+        onEnd: async (evt) => {
+          const prevId = evt.item.previousElementSibling?.dataset.projectId || null;
+          const nextId = evt.item.nextElementSibling?.dataset.projectId || null;
           try {
-            await TS.api.reorderProjects(orderedIds);
+            await TS.api.moveProject(evt.item.dataset.projectId, prevId, nextId);
             await TS.core.loadData();
           } catch(e) {
             console.warn('[DnD] project reorder failed:', e);
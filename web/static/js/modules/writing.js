@@ -8,6 +8,9 @@
 
   const getBase = () => (window.API_URL || (window.location.origin + '/api'));
   const SYSTEM_PROJECT_ID = 'system';
+  // Large notes: first screen in GET /notes/:id, the rest in ranges of this size
+  const FIRST_SCREEN_CHARS = 20000;
+  const CONTENT_RANGE_CHARS = 262144;
 
   function _notesFetch(url, opts = {}) {
     const token = window.LifeOSApi?.getToken?.();
@@ -156,11 +159,49 @@
   //  PROJECTS
   // ══════════════════════════════════════════════
 
+  // Sync token from the last structure fetch — later fetches only ask for changes
+  let structureSyncToken = null;
+
+  function _treeNoteSortKey(a, b) {
+    if (!!a.pinned !== !!b.pinned) return a.pinned ? -1 : 1;
+    if ((a.order ?? 999) !== (b.order ?? 999)) return (a.order ?? 999) - (b.order ?? 999);
+    return new Date(b.last_updated || 0) - new Date(a.last_updated || 0);
+  }
+
+  function applyStructureDelta(delta) {
+    const structure = window.state.projectsStructure;
+    const dropNote = (noteId) => Object.values(structure).forEach(entry => {
+      entry.notes = (entry.notes || []).filter(n => n.note_id !== noteId);
+    });
+
+    delta.deleted.projects.forEach(pid => { delete structure[pid]; });
+    delta.projects.forEach(project => {
+      if (project.archived) { delete structure[project.project_id]; return; }
+      const entry = structure[project.project_id];
+      structure[project.project_id] = { project, notes: entry ? entry.notes : [] };
+    });
+
+    delta.deleted.notes.forEach(dropNote);
+    const touched = new Set();
+    delta.notes.forEach(({ archived, ...note }) => {
+      dropNote(note.note_id);
+      if (archived || !structure[note.project_id]) return;
+      structure[note.project_id].notes.push(note);
+      touched.add(note.project_id);
+    });
+    touched.forEach(pid => structure[pid].notes.sort(_treeNoteSortKey));
+  }
+
   async function fetchProjectsStructure() {
     try {
-      const res = await _notesFetch(`${getBase()}/notes/structure`);
+      const since = structureSyncToken ? `?since=${encodeURIComponent(structureSyncToken)}` : '';
+      const res = await _notesFetch(`${getBase()}/notes/structure${since}`);
       if (res.ok) {
-        window.state.projectsStructure = await res.json();
+        const data = await res.json();
+        if (!since) window.state.projectsStructure = data;
+        else if (data.full) window.state.projectsStructure = data.structure;
+        else applyStructureDelta(data);
+        structureSyncToken = res.headers.get('X-Sync-Token');
         renderProjects();
         if (window.state.currentProject && window.state.projectsStructure[window.state.currentProject]) {
           renderNotes(window.state.projectsStructure[window.state.currentProject].notes || []);
@@ -618,7 +659,8 @@
     };
 
     try {
-      const res = await _notesFetch(`${getBase()}/notes/${note.note_id}`);
+      // First screen only — large notes stream the rest in below
+      const res = await _notesFetch(`${getBase()}/notes/${note.note_id}?content_limit=${FIRST_SCREEN_CHARS}`);
       const data = await res.json();
 
       if (!window.state.currentNote || window.state.currentNote.note_id !== note.note_id) return;
@@ -626,6 +668,18 @@
       if (editor) editor.innerHTML = sanitizeRichHtml(data.content || '<p></p>');
       if (titleInput) titleInput.value = data.title || (data.filename || '').replace(/\.[^/.]+$/, "");
 
+      let content = data.content || '';
+      let version = data.content_version ?? 0;
+      if (data.next_offset != null) {
+        const rest = await loadRemainingContent(note.note_id, content, data.next_offset, version, editor);
+        if (!rest) return;
+        ({ content, version } = rest);
+      }
+      // Base for op-based autosave (PATCH /notes/:id/content)
+      window.state.currentNote.savedContent = content;
+      window.state.currentNote.contentVersion = version;
+
+      showQuickCaptures(window.state.currentNote);
       restoreToolbarFromCache(window.state.currentNote);
       setSaveStatus('saved');
       updateWordCount();  // F1: show word count immediately
@@ -637,9 +691,85 @@
     }
   }
 
+  /**
+   * Append the rest of a large note, range by range, after its first screen.
+   * The editor stays read-only (and autosave off) until the whole content is
+   * in; if the note changes meanwhile (409) it is reopened from the start.
+   * Returns { content, version }, or null if the note was closed / reopened.
+   */
+  async function loadRemainingContent(noteId, content, offset, version, editor) {
+    const current = window.state.currentNote;
+    // Stays set if a range fails, so a partial note is never saved over the full one
+    current.loading = true;
+    if (editor) editor.contentEditable = "false";
+    while (offset != null) {
+      const res = await _notesFetch(
+        `${getBase()}/notes/${noteId}/content?offset=${offset}&limit=${CONTENT_RANGE_CHARS}&version=${version}`
+      );
+      if (window.state.currentNote !== current) return null;
+      if (res.status === 409) {
+        window.state.currentNote = null;
+        await openNote({ note_id: noteId, title: current.title, filename: current.filename });
+        return null;
+      }
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const range = await res.json();
+      content += range.content;
+      offset = range.next_offset;
+      if (editor) editor.innerHTML = sanitizeRichHtml(content);
+    }
+    current.loading = false;
+    if (editor) editor.contentEditable = "true";
+    return { content, version };
+  }
+
+  function isQuickNote(note) {
+    return note?.project_id === SYSTEM_PROJECT_ID && note?.filename === 'QuickNote.txt';
+  }
+
+  /**
+   * QuickNote.txt: captures are never merged into the note — they are
+   * listed below it, newest first, one page per "Load older" click.
+   */
+  function showQuickCaptures(note) {
+    const box = document.getElementById('quick-captures');
+    const list = document.getElementById('quick-captures-list');
+    const more = document.getElementById('quick-captures-more');
+    if (!box || !list || !more) return;
+    list.innerHTML = '';
+    more.style.display = 'none';
+    box.style.display = isQuickNote(note) ? '' : 'none';
+    if (!isQuickNote(note)) return;
+
+    let cursor = null;
+    const loadPage = async () => {
+      more.disabled = true;
+      try {
+        const url = `${getBase()}/notes/quick` + (cursor ? `?cursor=${encodeURIComponent(cursor)}` : '');
+        const res = await _notesFetch(url);
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const page = await res.json();
+        if (window.state.currentNote !== note) return;
+        list.insertAdjacentHTML('beforeend', page.items.map(item => `
+          <div class="quick-capture">
+            <span class="quick-capture-time">${escapeHtml(String(item.created_at || '').slice(0, 16).replace('T', ' '))}</span>${escapeHtml(item.content)}
+          </div>`).join(''));
+        cursor = page.next_cursor;
+        more.style.display = cursor ? '' : 'none';
+      } catch (e) {
+        console.error('Failed to load quick captures:', e);
+      } finally {
+        more.disabled = false;
+      }
+    };
+    more.onclick = loadPage;
+    loadPage();
+  }
+
   function closeNote() {
     saveCurrentFileFormattingToCache();
     window.state.currentNote = null;
+    showQuickCaptures(null);
     resetToolbarToDefaults();
     resetEditorBackground();
 
@@ -724,31 +854,67 @@
     showToast(`Exported as .${format}`, 'success', 2000);
   };
 
+  // One replace op covering what changed between two strings (code-point offsets)
+  function diffToOps(before, after) {
+    const a = Array.from(before), b = Array.from(after);
+    let start = 0;
+    while (start < a.length && start < b.length && a[start] === b[start]) start++;
+    let endA = a.length, endB = b.length;
+    while (endA > start && endB > start && a[endA - 1] === b[endB - 1]) { endA--; endB--; }
+    return [{ op: 'replace', pos: start, count: endA - start, text: b.slice(start, endB).join('') }];
+  }
+
+  function showSavedStats(stats = {}) {
+    const wcEl = document.getElementById('word-count-indicator');
+    if (wcEl) wcEl.textContent = `${stats.word_count || 0} words · ${stats.read_time_min || 1} min read`;
+  }
+
   async function saveCurrentNote() {
-    if (!window.state.currentNote) return;
+    const note = window.state.currentNote;
+    // Nothing to save while a large note is still streaming in
+    if (!note || note.loading) return;
     const editor = document.querySelector('.rich-editor');
     const content = editor ? sanitizeRichHtml(editor.innerHTML) : '';
     const titleInput = document.querySelector('.note-title-input');
     const title = titleInput ? titleInput.value.trim() : '';
+    const noteUrl = `${getBase()}/notes/${note.note_id}`;
 
     setSaveStatus('saving');
     try {
-      const res = await _notesFetch(`${getBase()}/notes/${window.state.currentNote.note_id}`, {
-        method: 'PUT',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ content, title })
-      });
-      if (res.ok) {
+      // Content: send only the changed span when we know the stored version
+      let contentSaved = content === note.savedContent;
+      if (!contentSaved && note.savedContent != null) {
+        const res = await _notesFetch(`${noteUrl}/content`, {
+          method: 'PATCH',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ base_version: note.contentVersion, ops: diffToOps(note.savedContent, content) })
+        });
+        if (res.ok) {
+          const patched = await res.json();
+          note.savedContent = content;
+          note.contentVersion = patched.content_version;
+          showSavedStats(patched.stats);
+          contentSaved = true;
+        }
+      }
+
+      // Full PUT when the title changed or the patch was refused (e.g. 409)
+      if (!contentSaved || (title && title !== note.title)) {
+        const body = contentSaved ? { title } : { content, title };
+        const res = await _notesFetch(noteUrl, {
+          method: 'PUT',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify(body)
+        });
+        if (!res.ok) { setSaveStatus('error'); return; }
         const updated = await res.json();
-        window.state.currentNote.title = updated.title;
-        setSaveStatus('saved');
+        note.title = updated.title;
+        note.savedContent = updated.content ?? content;
+        note.contentVersion = updated.content_version ?? note.contentVersion;
         // F1: update word count
-        const stats = updated.stats || {};
-        const wcEl = document.getElementById('word-count-indicator');
-        if (wcEl) wcEl.textContent = `${stats.word_count || 0} words · ${stats.read_time_min || 1} min read`;
-      } else {
-        setSaveStatus('error');
+        showSavedStats(updated.stats);
       }
+      setSaveStatus('saved');
     } catch (e) {
       console.error(e);
       setSaveStatus('error');